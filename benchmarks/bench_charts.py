@@ -0,0 +1,59 @@
+"""Chart render time and output size of analysis.py's profiles and formats.
+
+Renders all ten charts in one process (per-student for the 8-row sample,
+cohort views for synthetic cohorts), best of --repeat runs. Usage:
+    python benchmarks/bench_charts.py --rows 8 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import aggregates  # noqa: E402
+import analysis  # noqa: E402
+import schema  # noqa: E402
+import synthetic_data  # noqa: E402
+from data_preprocessing import preprocess  # noqa: E402
+from paths import RAW_CSV  # noqa: E402
+
+CASES = [("full", "png"), ("fast", "png"), ("fast", "svg"), ("fast", "webp")]
+
+
+def cohort(rows, seed=42):
+    # --rows 8 (or fewer) is the bundled sample dataset
+    raw = schema.read_csv(RAW_CSV) if rows <= 8 else synthetic_data.generate(rows, seed)
+    df = preprocess(raw)
+    return df.assign(Average=df["Total"] / 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[8, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    analysis.setup_style()
+    print(f"{'cohort':>10}  {'profile':<12}{'render':>9}{'output':>11}")
+    for rows in args.rows:
+        df = cohort(rows)
+        summary = aggregates.AggregateStore.from_frame(df).chart_summary()
+        for profile, fmt in CASES:
+            opts = analysis.RenderOptions(aggregate=len(df) > 50, fmt=fmt, **analysis.PROFILES[profile])
+            best = float("inf")
+            with tempfile.TemporaryDirectory() as tmp:
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    for _ in analysis.render_charts(df, list(analysis.CHARTS), opts, 1, tmp, summary):
+                        pass
+                    best = min(best, time.perf_counter() - start)
+                size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+            print(f"{len(df):>10,}  {profile + ' ' + fmt:<12}{best:>8.2f}s{size / 2**20:>9.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
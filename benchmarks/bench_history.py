@@ -0,0 +1,102 @@
+"""Per-student history and term-over-term drop queries: TermHistory vs pandas scan-and-merge.
+
+Builds a synthetic multi-term history (the same cohort every term, marks
+drifting between terms, a few students missing from each term) and times
+both ways of answering the dashboard's questions. Usage:
+    python benchmarks/bench_history.py --rows 1000000 --terms 6
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import history  # noqa: E402
+import synthetic_data  # noqa: E402
+from data_preprocessing import add_features  # noqa: E402
+
+LOOKUPS = 200
+THRESHOLD = 10
+
+
+def write_terms(directory, rows, terms, seed=42):
+    rng = np.random.default_rng(seed)
+    cohort = synthetic_data.generate(rows, seed)
+    marks = cohort[["Maths", "Science", "English", "Attendance"]].to_numpy(dtype="float64")
+    for t in range(terms):
+        marks = np.clip(marks + rng.normal(0, 5, marks.shape).round(), 0, 100)
+        term = cohort.assign(**dict(zip(["Maths", "Science", "English", "Attendance"], marks.T.astype("uint8"))))
+        present = rng.random(rows) > 0.03
+        history.add_term(f"T{t + 1}", add_features(term[present]), directory)
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Students per term")
+    parser.add_argument("--terms", type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"⏳ Writing {args.terms} terms of {args.rows:,} students...")
+        write_terms(tmp, args.rows, args.terms)
+
+        load_seconds, index = best_of(lambda: history.load(tmp), repeat=1)
+        # Baseline: the same rows in one frame, answered with boolean scans and a merge
+        frame = pd.concat([history.read_term(e, tmp).assign(Term=e["term"]) for e in history.load_manifest(tmp)],
+                          ignore_index=True)
+        latest, previous = index.terms[-1], index.terms[-2]
+
+        rolls = np.random.default_rng(0).choice(index.rolls, LOOKUPS)
+
+        def scan_lookups():
+            return [frame[frame["RollNo"] == r] for r in rolls]
+
+        def index_lookups():
+            return [index.student(r) for r in rolls]
+
+        def merge_drops():
+            before = frame[frame["Term"] == previous][["RollNo", "Percentage"]]
+            after = frame[frame["Term"] == latest][["RollNo", "Name", "Percentage"]]
+            merged = after.merge(before, on="RollNo", suffixes=("", "_prev"))
+            delta = (merged["Percentage"].astype("float64") - merged["Percentage_prev"]).round(history.DELTA_DECIMALS)
+            return merged[delta < -THRESHOLD].assign(Delta=delta).sort_values("Delta", kind="stable")
+
+        first_seconds, _ = best_of(lambda: index.drops(THRESHOLD), repeat=1)  # builds the delta index
+        scan_seconds, scanned = best_of(scan_lookups, repeat=1)
+        index_seconds, indexed = best_of(index_lookups)
+        merge_seconds, merged = best_of(merge_drops)
+        drop_seconds, drops = best_of(lambda: index.drops(THRESHOLD))
+
+        assert all(len(a) == len(b) for a, b in zip(scanned, indexed))
+        assert np.array_equal(np.sort(merged["RollNo"].to_numpy()), np.sort(drops["RollNo"].to_numpy()))
+
+        print(f"\n📚 {len(index):,} rows, {index.students:,} students, {len(index.terms)} terms "
+              f"(index load {load_seconds:.2f}s)\n")
+        print(f"{'query':<44}{'scan/merge':>12}{'index':>12}{'speedup':>10}")
+        rows = [
+            (f"student history (per lookup, {LOOKUPS} lookups)", scan_seconds / LOOKUPS, index_seconds / LOOKUPS),
+            (f"dropped > {THRESHOLD} points, first query", merge_seconds, first_seconds),
+            (f"dropped > {THRESHOLD} points, repeated ({len(drops):,} rows)", merge_seconds, drop_seconds),
+        ]
+        for label, baseline, indexed_seconds in rows:
+            print(f"{label:<44}{baseline * 1000:>10.2f}ms{indexed_seconds * 1000:>10.2f}ms"
+                  f"{baseline / indexed_seconds:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
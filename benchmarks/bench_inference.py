@@ -0,0 +1,79 @@
+"""Risk model inference latency: compiled flat-array forest vs the sklearn pipeline.
+
+Trains the dashboard's risk model on a synthetic cohort, checks that the
+compiled forest returns the same probabilities, then times single-row
+predictions (as the Predictions tab makes them) and batches. Usage:
+    python benchmarks/bench_inference.py --rows 200000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import compiled_forest  # noqa: E402
+import model_registry  # noqa: E402
+import synthetic_data  # noqa: E402
+from data_preprocessing import preprocess  # noqa: E402
+from risk_pipeline import RAW_FEATURES  # noqa: E402
+
+SINGLE_ROWS = 200
+BATCH_SIZES = [100, 10_000, 100_000]
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Training rows")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"⏳ Training the risk model on {args.rows:,} synthetic rows...")
+    df = preprocess(synthetic_data.generate(args.rows, args.seed))
+    pipeline = model_registry.train_risk_model(df)["pipeline"]
+    compile_seconds, forest = best_of(lambda: compiled_forest.compile_model(pipeline), repeat=1)
+
+    rng = np.random.default_rng(args.seed)
+    X = rng.integers(0, 101, size=(max(BATCH_SIZES), 4)).astype("float64")
+    X[rng.random(X.shape) < 0.01] = np.nan  # the forest routes missing values too
+    expected = pipeline.predict_proba(pd.DataFrame(X, columns=RAW_FEATURES))
+    assert np.array_equal(forest.predict_proba(X), expected), "compiled forest disagrees with sklearn"
+
+    rows = [tuple(x) for x in X[:SINGLE_ROWS]]
+
+    def sklearn_single():
+        return [pipeline.predict_proba(pd.DataFrame([row], columns=RAW_FEATURES)) for row in rows]
+
+    def compiled_single():
+        return [forest.predict_proba(row) for row in rows]
+
+    print(f"\n🌲 {len(forest.roots)} trees, {forest.nodes:,} nodes (compiled in {compile_seconds * 1000:.0f}ms)\n")
+    print(f"{'case':<28}{'sklearn':>12}{'compiled':>12}{'speedup':>10}")
+    cases = [("single row (per call)", SINGLE_ROWS, sklearn_single, compiled_single)]
+    for size in BATCH_SIZES:
+        batch = X[:size]
+        cases.append((f"batch of {size:,}", 1,
+                      lambda b=batch: pipeline.predict_proba(pd.DataFrame(b, columns=RAW_FEATURES)),
+                      lambda b=batch: forest.predict_proba(b)))
+    for label, calls, baseline, compiled in cases:
+        baseline_seconds, _ = best_of(baseline)
+        compiled_seconds, _ = best_of(compiled)
+        print(f"{label:<28}{baseline_seconds / calls * 1000:>10.2f}ms{compiled_seconds / calls * 1000:>10.2f}ms"
+              f"{baseline_seconds / compiled_seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
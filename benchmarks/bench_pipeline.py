@@ -0,0 +1,220 @@
+"""Time and memory-profile every pipeline stage on synthetic cohorts.
+
+Linux only (samples RSS from /proc). Usage:
+    python benchmarks/bench_pipeline.py --rows 1000 100000 1000000
+    python benchmarks/bench_pipeline.py --rows 100000 --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+import analysis  # noqa: E402
+import batch_score  # noqa: E402
+import dashboard_data  # noqa: E402  (imported up front so streamlit's import is not timed)
+import model_registry  # noqa: E402
+import schema  # noqa: E402
+import storage  # noqa: E402
+import synthetic_data  # noqa: E402
+from data_preprocessing import add_features, validate  # noqa: E402
+from grading import classify  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# The chart titles use emoji the default font lacks; that warning is not what we measure
+warnings.filterwarnings("ignore", message="Glyph .* missing from font")
+
+# ---------------- Measurement ---------------- #
+
+def _rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE / 2**20
+
+
+class StageTimer:
+    """Wall/CPU time and peak RSS (sampled every few ms) of each stage."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name, rows):
+        start_rss = peak = _rss_mb()
+        done = threading.Event()
+
+        def sample():
+            nonlocal peak
+            while not done.wait(self.interval):
+                peak = max(peak, _rss_mb())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            done.set()
+            sampler.join()
+            peak = max(peak, _rss_mb())
+            self.stages[name] = {
+                "rows": rows,
+                "wall_seconds": round(wall, 4),
+                "cpu_seconds": round(cpu, 4),
+                "rows_per_second": round(rows / wall) if wall > 0 else None,
+                "peak_rss_mb": round(peak, 1),
+                "peak_rss_increase_mb": round(peak - start_rss, 1),
+            }
+            print(f"   {name:<18}{wall:>9.2f}s{cpu:>9.2f}s{peak - start_rss:>10.1f} MB")
+
+# ---------------- Stages ---------------- #
+
+def run_pipeline(rows, tmp, args):
+    timer = StageTimer()
+    raw_csv = os.path.join(tmp, "raw.csv")
+    processed_csv = os.path.join(tmp, "processed.csv")
+    processed_parquet = os.path.join(tmp, "processed.parquet")
+
+    print(f"\n📏 {rows:,} rows")
+    print(f"   {'stage':<18}{'wall':>10}{'cpu':>10}{'peak +RSS':>13}")
+
+    with timer.stage("generate", rows):
+        synthetic_data.write_csv(raw_csv, rows, args.seed, args.missing_rate)
+
+    with timer.stage("load", rows):
+        df = schema.read_csv(raw_csv)
+
+    with timer.stage("clean", rows):
+        float_cols = schema.float_columns(df)
+        df, _ = validate(df, df.mean(numeric_only=True))
+        df = schema.cast_marks(df, float_cols)
+
+    with timer.stage("features", rows):  # includes grading, as in preprocessing
+        df = add_features(df)
+
+    with timer.stage("grading", rows):
+        classify(df[["Percentage", "Attendance"]])
+
+    with timer.stage("save", rows):
+        df.to_csv(processed_csv, index=False)
+        storage.write_processed(df, processed_parquet)
+    del df
+
+    with timer.stage("dashboard_load", rows):
+        # Same work as the dashboard's first get_dataset() for a new file version
+        dashboard_data.build_view(processed_csv, dashboard_data.dataset_version(processed_csv))
+
+    train_rows = min(rows, args.train_rows)
+    train = storage.load_processed(columns=model_registry.RAW_FEATURES + [model_registry.TARGET],
+                                   csv_path=processed_csv, parquet_path=processed_parquet)
+    train = train.sample(n=train_rows, random_state=args.seed)
+    with timer.stage("train", train_rows):
+        bundle = model_registry.train_risk_model(train)
+    del train
+
+    with timer.stage("batch_inference", rows):
+        batch_score.score_file(processed_parquet, os.path.join(tmp, "scored.parquet"), bundle=bundle)
+
+    data = analysis.load_data(processed_csv)
+    opts = analysis.RenderOptions(dpi=args.dpi, aggregate=len(data) > 50)
+    with timer.stage("chart_render", rows):
+        for _ in analysis.render_charts(data, list(analysis.CHARTS), opts, workers=1,
+                                        chart_dir=os.path.join(tmp, "charts")):
+            pass
+
+    return timer.stages
+
+# ---------------- Reporting ---------------- #
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import sklearn
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "git_commit": _git_commit(),
+    }
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\n📊 Compared with {baseline_path} (wall time ratio, <1 is faster)")
+    for rows, stages in current["runs"].items():
+        old = baseline["runs"].get(rows)
+        if old is None:
+            continue
+        print(f"\n   {int(rows):,} rows")
+        for name, s in stages.items():
+            if name in old and old[name]["wall_seconds"] > 0:
+                ratio = s["wall_seconds"] / old[name]["wall_seconds"]
+                print(f"   {name:<18}{old[name]['wall_seconds']:>9.2f}s →{s['wall_seconds']:>9.2f}s"
+                      f"{ratio:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000],
+                        help="Cohort sizes to run (e.g. 1000 100000 10000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--missing-rate", type=float, default=0.01)
+    parser.add_argument("--train-rows", type=int, default=200_000,
+                        help="Rows sampled for the training stage")
+    parser.add_argument("--dpi", type=int, default=100, help="DPI for the chart render stage")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    results = {
+        "started": started.isoformat(timespec="seconds"),
+        "environment": environment(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "runs": {},
+    }
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            results["runs"][str(rows)] = run_pipeline(rows, tmp, args)
+
+    output = Path(args.output or RESULTS_DIR / f"pipeline-{started:%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\n📂 Results saved at: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
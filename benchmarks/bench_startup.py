@@ -0,0 +1,120 @@
+"""Startup budget: import cost of each entry point, measured with `python -X importtime`.
+
+Only the module-level imports of each script are timed (the same statements,
+run in a fresh interpreter), so the dashboard is measured without starting
+Streamlit. The time budgets are report-only (they depend on the machine);
+tests/test_startup.py enforces the lazy-import lists of the same BUDGETS. Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py app analysis --repeat 5
+"""
+import argparse
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+
+PLOTTING = ("matplotlib", "seaborn")
+UI = ("altair", "streamlit", "PIL")
+
+# entry point -> (seconds of module-level imports, top-level packages that must
+# not be imported at startup). Budgets are ~1.5x the time measured on one CPU
+# with warm file caches; pandas alone accounts for ~0.4s of every script that uses it.
+BUDGETS = {
+    "app": (1.5, PLOTTING + ("sklearn", "scipy", "joblib", "PIL")),
+    "analysis": (1.1, PLOTTING + UI + ("sklearn", "scipy")),
+    "data_preprocessing": (1.1, PLOTTING + UI + ("sklearn", "scipy")),
+    "aggregates": (1.0, PLOTTING + UI + ("sklearn", "scipy")),
+    "synthetic_data": (1.0, PLOTTING + UI + ("sklearn", "scipy")),
+    "batch_score": (1.0, PLOTTING + UI + ("sklearn", "scipy")),
+    "decision_surface": (1.0, PLOTTING + UI + ("sklearn", "scipy")),
+    "compiled_forest": (1.0, PLOTTING + UI + ("sklearn", "scipy")),
+    "history": (1.0, PLOTTING + UI + ("sklearn", "scipy")),
+    "rain_model": (2.5, PLOTTING + UI),
+    "model": (3.5, PLOTTING + UI),
+    "pipeline": (0.25, PLOTTING + UI + ("numpy", "pandas", "sklearn")),
+}
+
+# ---------------- Measurement ---------------- #
+
+def startup_imports(entry):
+    """The import statements at the top level of an entry script, as source."""
+    tree = ast.parse((SRC / f"{entry}.py").read_text())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def importtime(code):
+    """({module: cumulative seconds}, {top-level import: cumulative seconds}) from one interpreter."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=SRC, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    modules, direct = {}, {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        modules[name.strip()] = int(cumulative) / 1e6
+        if not name[1:].startswith(" "):  # nested imports are indented
+            direct[name.strip()] = int(cumulative) / 1e6
+    return modules, direct
+
+
+def measure(entry, repeat):
+    code = startup_imports(entry)
+    interpreter, _ = importtime("pass")  # site, encodings, ...: paid by every script
+    runs = []
+    for _ in range(repeat):
+        modules, direct = importtime(code)
+        runs.append((modules, {m: s for m, s in direct.items() if m not in interpreter}))
+    return min(runs, key=lambda run: sum(run[1].values()))  # least disturbed run
+
+
+def check(entry, modules, direct):
+    """(seconds of top-level imports, lazy packages that were loaded anyway) of one measurement."""
+    _, lazy = BUDGETS[entry]
+    return sum(direct.values()), sorted({name.split(".")[0] for name in modules} & set(lazy))
+
+# ---------------- Main ---------------- #
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("entries", nargs="*", metavar="ENTRY", help=f"Entry points (default: {', '.join(BUDGETS)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Interpreters started per entry point")
+    args = parser.parse_args()
+
+    entries = args.entries or list(BUDGETS)
+    unknown = [e for e in entries if e not in BUDGETS]
+    if unknown:
+        parser.error(f"unknown entry point(s): {', '.join(unknown)}")
+
+    print(f"\n🚀 Startup imports (best of {args.repeat})")
+    print(f"   {'entry':<20}{'imports':>9}{'budget':>9}   slowest top-level imports")
+    failures = []
+    for entry in entries:
+        budget, _ = BUDGETS[entry]
+        modules, direct = measure(entry, args.repeat)
+        total, loaded = check(entry, modules, direct)
+        slowest = sorted(((s, m) for m, s in direct.items()), reverse=True)[:3]
+
+        ok = total <= budget and not loaded
+        print(f"{'✅' if ok else '❌'} {entry:<20}{total:>8.2f}s{budget:>8.2f}s   "
+              + ", ".join(f"{m} {s:.2f}s" for s, m in slowest))
+        if loaded:
+            print(f"   ⚠ imported at startup (should be lazy): {', '.join(loaded)}")
+        if not ok:
+            failures.append(entry)
+
+    if failures:
+        print(f"\n❌ Over budget: {', '.join(failures)}")
+    else:
+        print("\n✅ All entry points within their startup budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare load time and memory of the processed CSV vs the Parquet artifact.
+
+"untyped csv" is a plain pd.read_csv (int64/float64 marks, string labels),
+the baseline for the declared dtypes in schema.py.
+
+Linux only (reads peak RSS from /proc). Usage:
+    python benchmarks/bench_storage.py --rows 5000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import storage  # noqa: E402
+import synthetic_data  # noqa: E402
+from data_preprocessing import preprocess  # noqa: E402
+
+CONSUMER_COLUMNS = ["Maths", "Science", "English", "Attendance",
+                    "Percentage", "AttendanceImpact", "RiskLevel"]
+
+# Runs in a fresh interpreter so every case reports its own peak RSS
+LOAD_SNIPPET = """
+import sys, time
+sys.path.insert(0, {src!r})
+import storage
+columns = {columns!r}
+start = time.perf_counter()
+if {fmt!r} == "untyped csv":
+    import pandas as pd
+    df = pd.read_csv({csv!r}, usecols=columns)
+elif {fmt!r} == "csv":
+    df = storage.load_processed(columns, csv_path={csv!r}, parquet_path="")
+else:
+    df = storage.load_processed(columns, csv_path={csv!r}, parquet_path={parquet!r})
+elapsed = time.perf_counter() - start
+# VmHWM (unlike ru_maxrss) is not inherited from the parent across exec
+peak = next(int(l.split()[1]) for l in open("/proc/self/status") if l.startswith("VmHWM"))
+print(elapsed, peak / 1024, df.memory_usage(deep=True).sum() / 2**20)
+"""
+
+
+def run_case(fmt, columns, csv_path, parquet_path):
+    code = LOAD_SNIPPET.format(src=str(SRC), columns=columns, fmt=fmt,
+                               csv=csv_path, parquet=parquet_path)
+    out = subprocess.run([sys.executable, "-c", code], check=True,
+                         capture_output=True, text=True).stdout
+    seconds, rss_mb, frame_mb = map(float, out.split())
+    return seconds, rss_mb, frame_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "processed.csv")
+        parquet_path = os.path.join(tmp, "processed.parquet")
+
+        print(f"⏳ Building {args.rows:,} synthetic rows...")
+        df = preprocess(synthetic_data.generate(args.rows))
+        df.to_csv(csv_path, index=False)
+        storage.write_processed(df, parquet_path)
+        del df
+
+        print(f"CSV size:     {os.path.getsize(csv_path) / 2**20:8.1f} MB")
+        print(f"Parquet size: {os.path.getsize(parquet_path) / 2**20:8.1f} MB\n")
+
+        print(f"{'case':<34}{'load (s)':>10}{'peak RSS (MB)':>15}{'frame (MB)':>12}")
+        for label, columns in [("all columns", None), ("model columns", CONSUMER_COLUMNS)]:
+            for fmt in ["untyped csv", "csv", "parquet"]:
+                seconds, rss, frame = run_case(fmt, columns, csv_path, parquet_path)
+                print(f"{fmt + ' / ' + label:<34}{seconds:>10.2f}{rss:>15.1f}{frame:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
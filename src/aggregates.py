@@ -0,0 +1,316 @@
+import argparse
+import json
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+import schema
+from schema import CATEGORY_COLUMNS
+from storage import PROCESSED_CSV
+
+SUBJECTS = ["Maths", "Science", "English"]
+NUMERIC_COLUMNS = SUBJECTS + ["Attendance", "Total", "Percentage", "AttendanceImpact"]
+UPPER_BOUNDS = {"Total": 300}  # every other column is on a 0–100 scale
+RESOLUTION = 0.01              # histogram bin width behind the quartiles
+BUILD_CHUNKSIZE = 500_000
+
+# ---------------- Mergeable Summary State ---------------- #
+
+def _bins(column):
+    return int(round(UPPER_BOUNDS.get(column, 100) / RESOLUTION)) + 1
+
+
+def _with_derived(df):
+    # Same formulas as data_preprocessing.add_features
+    if "Total" not in df:
+        df = df.assign(Total=df[SUBJECTS].sum(axis=1))
+    if "Percentage" not in df:
+        df = df.assign(Percentage=df["Total"] / 300 * 100)
+    if "AttendanceImpact" not in df:
+        df = df.assign(AttendanceImpact=df["Attendance"] * 0.3 + df["Percentage"] * 0.7)
+    return df
+
+
+@dataclass
+class AggregateStore:
+    """Counts, sums, sums of squares/cross-products and label counts of the
+    processed dataset.
+
+    Every field is additive, so a new batch is folded in with `update` in
+    O(batch) time, and means, standard deviations, correlations, quartiles
+    (from RESOLUTION-wide histograms) and pass counts are read off the state
+    without touching the rows again.
+    """
+    count: int = 0
+    sums: np.ndarray = field(default_factory=lambda: np.zeros(len(NUMERIC_COLUMNS)))
+    cross: np.ndarray = field(default_factory=lambda: np.zeros((len(NUMERIC_COLUMNS),) * 2))
+    mins: np.ndarray = field(default_factory=lambda: np.full(len(NUMERIC_COLUMNS), np.inf))
+    maxs: np.ndarray = field(default_factory=lambda: np.full(len(NUMERIC_COLUMNS), -np.inf))
+    histograms: dict = field(
+        default_factory=lambda: {col: np.zeros(_bins(col), dtype="int64") for col in NUMERIC_COLUMNS})
+    label_counts: dict = field(default_factory=dict)  # column -> {label: rows}
+    label_sums: dict = field(default_factory=dict)    # column -> {label: sums vector}
+    source: tuple = ()  # (size, mtime_ns) of the processed CSV this state describes
+
+    @classmethod
+    def from_frame(cls, df):
+        """Summary state of one batch of processed rows."""
+        df = _with_derived(df)
+        X = df[NUMERIC_COLUMNS].to_numpy(dtype="float64")
+        if np.isnan(X).any():
+            raise ValueError("aggregate store expects processed rows (missing values already filled)")
+
+        state = cls(count=len(X), sums=X.sum(axis=0), cross=X.T @ X)
+        if len(X):
+            state.mins = X.min(axis=0)
+            state.maxs = X.max(axis=0)
+        for i, col in enumerate(NUMERIC_COLUMNS):
+            upper = UPPER_BOUNDS.get(col, 100)
+            idx = np.rint(np.clip(X[:, i], 0, upper) / RESOLUTION).astype("int64")
+            state.histograms[col] = np.bincount(idx, minlength=_bins(col))
+
+        for col in CATEGORY_COLUMNS:
+            if col not in df:
+                continue
+            # Rows without a label count in the totals above but in no label group
+            present = df[col].notna().to_numpy()
+            labels = df[col][present].astype(str).to_numpy()
+            groups = pd.DataFrame(X[present]).groupby(labels, sort=True)
+            state.label_counts[col] = {k: int(v) for k, v in groups.size().items()}
+            state.label_sums[col] = {k: row.to_numpy() for k, row in groups.sum().iterrows()}
+        return state
+
+    def merge(self, other):
+        """Fold another state into this one (in place) and return self."""
+        self.count += other.count
+        self.sums = self.sums + other.sums
+        self.cross = self.cross + other.cross
+        self.mins = np.minimum(self.mins, other.mins)
+        self.maxs = np.maximum(self.maxs, other.maxs)
+        for col in NUMERIC_COLUMNS:
+            self.histograms[col] = self.histograms[col] + other.histograms[col]
+        for col, counts in other.label_counts.items():
+            mine = self.label_counts.setdefault(col, {})
+            sums = self.label_sums.setdefault(col, {})
+            for label, n in counts.items():
+                mine[label] = mine.get(label, 0) + n
+                sums[label] = sums.get(label, 0) + other.label_sums[col][label]
+        return self
+
+    def update(self, df):
+        return self.merge(AggregateStore.from_frame(df))
+
+    # ---------------- Derived Statistics ---------------- #
+
+    def _position(self, column):
+        return NUMERIC_COLUMNS.index(column)
+
+    def mean(self):
+        return pd.Series(self.sums / max(self.count, 1), index=NUMERIC_COLUMNS)
+
+    def covariance(self):
+        n = self.count
+        cov = (self.cross - np.outer(self.sums, self.sums) / max(n, 1)) / max(n - 1, 1)
+        return pd.DataFrame(cov, index=NUMERIC_COLUMNS, columns=NUMERIC_COLUMNS)
+
+    def std(self):
+        return pd.Series(np.sqrt(np.clip(np.diag(self.covariance()), 0, None)), index=NUMERIC_COLUMNS)
+
+    def corr(self, columns=NUMERIC_COLUMNS):
+        cov = self.covariance().loc[columns, columns]
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return cov / np.outer(std, std)
+
+    def quantile(self, column, q):
+        """Linear-interpolated quantile (as pandas computes it), to RESOLUTION."""
+        if self.count == 0:
+            return np.nan
+        cumulative = np.cumsum(self.histograms[column])
+        h = q * (self.count - 1)
+        lo = int(np.floor(h))
+        ranks = [lo, min(lo + 1, self.count - 1)]
+        low, high = np.searchsorted(cumulative, ranks, side="right") * RESOLUTION
+        i = self._position(column)
+        low, high = np.clip([low, high], self.mins[i], self.maxs[i])
+        return low + (h - lo) * (high - low)
+
+    def describe(self):
+        """Same layout as DataFrame.describe() for the numeric columns."""
+        rows = {
+            "count": np.full(len(NUMERIC_COLUMNS), float(self.count)),
+            "mean": self.mean().to_numpy(),
+            "std": self.std().to_numpy(),
+            "min": self.mins,
+        }
+        for q in (0.25, 0.5, 0.75):
+            rows[f"{q:.0%}"] = [self.quantile(col, q) for col in NUMERIC_COLUMNS]
+        rows["max"] = self.maxs
+        return pd.DataFrame(rows, index=NUMERIC_COLUMNS).T
+
+    def counts(self, column):
+        """Label counts, most frequent first (like value_counts)."""
+        counts = pd.Series(self.label_counts.get(column, {}), dtype="int64")
+        return counts.sort_values(ascending=False, kind="stable")
+
+    def group_mean(self, column, value):
+        sums = self.label_sums.get(column, {})
+        i = self._position(value)
+        return pd.Series({label: s[i] / self.label_counts[column][label] for label, s in sorted(sums.items())},
+                         dtype="float64")
+
+    def metrics(self):
+        """Overview tab metrics."""
+        n = self.count
+        means = self.mean()
+        return {
+            "total_students": n,
+            "pass_rate": self.label_counts.get("Result", {}).get("Pass", 0) / n * 100 if n else 0.0,
+            "avg_percentage": means["Percentage"],
+            "avg_attendance": means["Attendance"],
+        }
+
+    def chart_summary(self):
+        """Inputs of the subject-average, correlation and summary charts (02/07/10)."""
+        total = self._position("Total")
+        correlation = self.corr(SUBJECTS + ["Attendance", "Total"]).rename(
+            index={"Total": "Average"}, columns={"Total": "Average"})  # Average = Total / 3
+        results = self.label_counts.get("Result", {})
+        return {
+            "students": self.count,
+            "subject_means": self.mean()[SUBJECTS],
+            "correlation": correlation,
+            "result_avg": self.group_mean("Result", "Total") / 3,
+            "pass": results.get("Pass", 0),
+            "fail": results.get("Fail", 0),
+            "average_mean": self.sums[total] / max(self.count, 1) / 3,
+            "average_max": self.maxs[total] / 3,
+            "average_min": self.mins[total] / 3,
+            "attendance_mean": self.mean()["Attendance"],
+        }
+
+# ---------------- Persistence ---------------- #
+
+def store_path(csv_path=PROCESSED_CSV):
+    """Aggregate store kept next to a processed CSV."""
+    return os.path.splitext(csv_path)[0] + ".aggregates.npz"
+
+
+AGGREGATE_PATH = store_path(PROCESSED_CSV)
+
+
+def dataset_source(csv_path=PROCESSED_CSV):
+    stat = os.stat(csv_path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def save(store, path):
+    meta = {
+        "count": store.count,
+        "source": list(store.source),
+        "label_counts": store.label_counts,
+        "label_sums": {col: {k: v.tolist() for k, v in sums.items()} for col, sums in store.label_sums.items()},
+    }
+    arrays = {f"hist_{col}": hist for col, hist in store.histograms.items()}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, meta=np.array(json.dumps(meta)), sums=store.sums, cross=store.cross,
+                            mins=store.mins, maxs=store.maxs, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load(path):
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        return AggregateStore(
+            count=meta["count"],
+            sums=data["sums"],
+            cross=data["cross"],
+            mins=data["mins"],
+            maxs=data["maxs"],
+            histograms={col: data[f"hist_{col}"] for col in NUMERIC_COLUMNS},
+            label_counts=meta["label_counts"],
+            label_sums={col: {k: np.asarray(v) for k, v in sums.items()}
+                        for col, sums in meta["label_sums"].items()},
+            source=tuple(meta["source"]),
+        )
+
+
+def build(csv_path=PROCESSED_CSV, chunksize=BUILD_CHUNKSIZE, progress=None):
+    """Full rebuild from the processed CSV, one chunk at a time.
+
+    `progress`, if given, is called with the rows folded in so far after each chunk.
+    """
+    store = AggregateStore()
+    columns = NUMERIC_COLUMNS + CATEGORY_COLUMNS
+    for chunk in schema.read_csv(csv_path, columns=lambda c: c in columns, chunksize=chunksize):
+        store.update(chunk)
+        if progress is not None:
+            progress(store.count)
+    store.source = dataset_source(csv_path)
+    return store
+
+
+def load_or_build(csv_path=PROCESSED_CSV, path=None, df=None):
+    """Stored state when it matches the processed CSV, otherwise rebuilt and saved.
+
+    Pass `df` when the processed rows are already in memory to skip re-reading them.
+    """
+    path = path or store_path(csv_path)
+    source = dataset_source(csv_path)
+    if os.path.exists(path):
+        store = load(path)
+        if store.source == source:
+            return store
+
+    if df is not None:
+        store = AggregateStore.from_frame(df)
+        store.source = source
+    else:
+        store = build(csv_path)
+    save(store, path)
+    return store
+
+
+def append_rows(df, csv_path=PROCESSED_CSV, path=None, store=None):
+    """Append processed rows to the CSV and fold them into the stored state.
+
+    Pass `store` when it was already loaded (load_or_build) for this CSV.
+    """
+    path = path or store_path(csv_path)
+    if store is None:
+        store = load_or_build(csv_path, path)
+    header = pd.read_csv(csv_path, nrows=0).columns
+    df[list(header)].to_csv(csv_path, mode="a", header=False, index=False)
+    store.update(df)
+    store.source = dataset_source(csv_path)
+    save(store, path)
+    return store
+
+# ---------------- Main ---------------- #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild or inspect the aggregate store of the processed dataset.")
+    parser.add_argument("--input", default=PROCESSED_CSV, help="Processed dataset (CSV path)")
+    parser.add_argument("--store", help="Store file (default: next to the processed CSV)")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute from the processed CSV")
+    args = parser.parse_args(argv)
+
+    path = args.store or store_path(args.input)
+    if args.rebuild:
+        store = build(args.input)
+        save(store, path)
+    else:
+        store = load_or_build(args.input, path)
+
+    print(f"\n✅ Aggregate store covers {store.count:,} rows ({path})")
+    print("\n📊 Summary Statistics:\n")
+    print(store.describe())
+
+
+if __name__ == "__main__":
+    main()
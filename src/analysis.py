@@ -1,207 +1,647 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, NamedTuple
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-# Load dataset
-df = pd.read_csv("data/student_performance.csv")
+import aggregates
+import instrumentation
+from instrumentation import stage
+from paths import OUTPUT_DIR
+from storage import PROCESSED_CSV, load_processed
+
+CHART_DIR = os.path.join(OUTPUT_DIR, "charts")
+REPORT_PATH = os.path.join(OUTPUT_DIR, "performance_report.csv")
+MANIFEST_NAME = "manifest.json"
+
+# Plotting libraries are imported on first render (see setup_style), so a run
+# where every chart is up to date never pays for matplotlib. seaborn (≈1.8s of
+# imports, mostly scipy) is only loaded by the heatmap, the one chart using it.
+plt = None
+
+# seaborn.axes_style("whitegrid"), minus its own default colormap
+WHITEGRID = {
+    "figure.facecolor": "white",
+    "axes.labelcolor": ".15",
+    "xtick.direction": "out",
+    "ytick.direction": "out",
+    "xtick.color": ".15",
+    "ytick.color": ".15",
+    "axes.axisbelow": True,
+    "grid.linestyle": "-",
+    "text.color": ".15",
+    "font.family": ["sans-serif"],
+    "font.sans-serif": ["Arial", "DejaVu Sans", "Liberation Sans", "Bitstream Vera Sans", "sans-serif"],
+    "lines.solid_capstyle": "round",
+    "patch.edgecolor": "w",
+    "patch.force_edgecolor": True,
+    "xtick.top": False,
+    "ytick.right": False,
+    "axes.grid": True,
+    "axes.facecolor": "white",
+    "axes.edgecolor": ".8",
+    "grid.color": ".8",
+    "axes.spines.left": True,
+    "axes.spines.bottom": True,
+    "axes.spines.right": True,
+    "axes.spines.top": True,
+    "xtick.bottom": False,
+    "ytick.left": False,
+}
+
+
+def load_data(path=PROCESSED_CSV):
+    # Load dataset (raw student columns from the processed artifact)
+    df = load_processed(
+        columns=["RollNo", "Name", "Maths", "Science", "English", "Attendance", "Result"],
+        csv_path=path,
+        parquet_path=os.path.splitext(path)[0] + ".parquet",
+    )
+
+    # Calculate total and average
+    df["Total"] = df[["Maths", "Science", "English"]].sum(axis=1)
+    df["Average"] = df["Total"] / 3
+    return df
+
+
+def setup_style():
+    global plt
+    if plt is None:
+        import matplotlib
+        matplotlib.use("Agg")  # headless: charts are only ever saved to disk
+        import matplotlib.pyplot as plt
+
+    # Set style for better-looking charts
+    plt.rcParams.update(WHITEGRID)
+
+# ============ Render Options ============
+
+class RenderOptions(NamedTuple):
+    dpi: int = 300
+    aggregate: bool = False  # cohort views instead of one bar/label per student
+    top_n: int = 10          # students shown at each end of top/bottom-N bars
+    fmt: str = "png"         # png, svg or webp
+    tight_bbox: bool = True  # crop to the drawn content (costs a second draw per chart)
+    png_compression: int = 6  # zlib level of PNG output (PIL's default)
+
+
+# --profile presets; --dpi and --format still apply on top
+PROFILES = {
+    "full": {"dpi": 300, "tight_bbox": True, "png_compression": 6},
+    "fast": {"dpi": 100, "tight_bbox": False, "png_compression": 1},
+}
+
+SUBJECTS = ["Maths", "Science", "English"]
+SUBJECT_COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1']
+MARK_BINS = np.arange(0, 105, 5)
+SUBPLOT_PARAMS = ("left", "bottom", "right", "top", "wspace", "hspace")
+
+
+def new_figure(figsize):
+    # One figure per size, cleared and reused by every chart of that size.
+    # Clearing keeps the last chart's tight_layout margins: reset them, so the
+    # output matches a freshly created figure pixel for pixel
+    fig = plt.figure(num=f"analysis {figsize[0]}x{figsize[1]}", figsize=figsize, clear=True)
+    fig.subplots_adjust(**{k: plt.rcParams[f"figure.subplot.{k}"] for k in SUBPLOT_PARAMS})
+    return fig
+
+
+def save_figure(fig, path, opts):
+    fig.tight_layout()
+    kwargs = {"bbox_inches": "tight"} if opts.tight_bbox else {}
+    if opts.fmt == "png":
+        kwargs["pil_kwargs"] = {"compress_level": opts.png_compression}
+    fig.savefig(path, dpi=opts.dpi, **kwargs)
+
+
+def top_bottom(df, column, n):
+    # Best n and worst n students by `column`, best first
+    top = df.nlargest(n, column)
+    bottom = df.nsmallest(n, column)
+    bottom = bottom[~bottom.index.isin(top.index)]
+    return pd.concat([top, bottom.iloc[::-1]])
 
-# Calculate total and average
-df["Total"] = df[["Maths", "Science", "English"]].sum(axis=1)
-df["Average"] = df["Total"] / 3
 
-# Sort by average
-top_students = df.sort_values(by="Average", ascending=False)
+def box_stats(df, columns):
+    # matplotlib.cbook.boxplot_stats (whis=1.5) for every column, with one
+    # percentile call over all of them
+    X = df[columns].to_numpy(dtype="float64")
+    q1, med, q3 = np.percentile(X, [25, 50, 75], axis=0)
+    stats = []
+    for i, column in enumerate(columns):
+        x = X[:, i]
+        iqr = q3[i] - q1[i]
+        high = x[x <= q3[i] + 1.5 * iqr]
+        low = x[x >= q1[i] - 1.5 * iqr]
+        whishi = q3[i] if len(high) == 0 or high.max() < q3[i] else high.max()
+        whislo = q1[i] if len(low) == 0 or low.min() > q1[i] else low.min()
+        stats.append({
+            "label": column, "mean": x.mean(), "iqr": iqr, "q1": q1[i], "med": med[i], "q3": q3[i],
+            "whislo": whislo, "whishi": whishi, "fliers": np.concatenate([x[x < whislo], x[x > whishi]]),
+        })
+    return stats
 
-print("\n📊 Student Performance Summary:\n")
-print(top_students[["RollNo", "Name", "Average"]])
 
-# Save result
-top_students.to_csv("outputs/performance_report.csv", index=False)
+def chart_data(df, keys, opts, summary):
+    """Everything the selected charts draw, computed once before rendering.
 
-# Set style for better-looking charts
-sns.set_style("whitegrid")
-plt.rcParams['figure.facecolor'] = 'white'
+    Starts from the aggregate-store summary (means, correlations, pass
+    counts) and adds top/bottom rows, histogram counts and box statistics,
+    or the per-student rows when the cohort is drawn per student. Renderers
+    (and pool workers) get this instead of the dataset.
+    """
+    data = dict(summary)
+    keys = set(keys)
+    if not opts.aggregate:
+        data["per_student"] = df[["Name", "Attendance", "Total", "Average"] + SUBJECTS]
+        data["by_attendance"] = data["per_student"].sort_values("Attendance", ascending=False)
+    else:
+        if "01" in keys:
+            data["by_average"] = top_bottom(df, "Average", opts.top_n)[["Name", "Average"]]
+        if "09" in keys:
+            data["by_total"] = top_bottom(df, "Total", opts.top_n)[["Name", "Total"]].iloc[::-1]
+        if "03" in keys:
+            data["points"] = df[["Attendance", "Average"]]
+        histogram_columns = (SUBJECTS if "05" in keys else []) + (["Attendance"] if keys & {"06", "10"} else [])
+        # Equal-width bins over a fixed range: numpy's fast path instead of a binary search per value
+        data["histograms"] = {col: np.histogram(df[col].to_numpy(), bins=len(MARK_BINS) - 1, range=(0, 100))[0]
+                              for col in histogram_columns}
+    if "08" in keys:
+        data["box_stats"] = box_stats(df, SUBJECTS)
+    return data
+
+
+def label_bars(ax, bars, fmt, **kwargs):
+    # One vectorized call instead of a plt.text per bar
+    ax.bar_label(bars, fmt=fmt, padding=3, fontweight='bold', **kwargs)
+
+
+def hist_counts(ax, counts, **kwargs):
+    # ax.hist of precomputed MARK_BINS counts (one weighted sample per bin)
+    return ax.hist(MARK_BINS[:-1], bins=MARK_BINS, weights=counts, **kwargs)
 
 # ============ Chart 1: Average Performance by Student ============
-fig1 = plt.figure(figsize=(12, 6))
-plt.bar(df["Name"], df["Average"], color='skyblue', edgecolor='navy')
-plt.xlabel("Students", fontsize=12, fontweight='bold')
-plt.ylabel("Average Marks", fontsize=12, fontweight='bold')
-plt.title("📊 Student Average Performance", fontsize=14, fontweight='bold')
-plt.xticks(rotation=45)
-plt.ylim(0, 100)
-for i, v in enumerate(df["Average"]):
-    plt.text(i, v + 2, f'{v:.1f}', ha='center', fontweight='bold')
-plt.tight_layout()
-plt.savefig("outputs/charts/01_average_performance.png", dpi=300, bbox_inches='tight')
-print("✅ Chart 1 saved: Average Performance by Student")
+def chart_average_performance(data, path, opts):
+    fig = new_figure((12, 6))
+    ax = fig.subplots()
+    if opts.aggregate:
+        shown = data["by_average"]
+        colors = ['skyblue'] * min(opts.top_n, len(shown)) + ['#E74C3C'] * max(len(shown) - opts.top_n, 0)
+        bars = ax.bar(np.arange(len(shown)), shown["Average"], color=colors, edgecolor='navy')
+        ax.set_xticks(np.arange(len(shown)), shown["Name"])
+        ax.set_title(f"📊 Top & Bottom {opts.top_n} Students by Average ({data['students']:,} students)",
+                     fontsize=14, fontweight='bold')
+    else:
+        df = data["per_student"]
+        bars = ax.bar(df["Name"], df["Average"], color='skyblue', edgecolor='navy')
+        ax.set_title("📊 Student Average Performance", fontsize=14, fontweight='bold')
+    ax.set_xlabel("Students", fontsize=12, fontweight='bold')
+    ax.set_ylabel("Average Marks", fontsize=12, fontweight='bold')
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.set_ylim(0, 100)
+    label_bars(ax, bars, '{:.1f}')
+    save_figure(fig, path, opts)
+
 
 # ============ Chart 2: Subject-wise Performance Comparison ============
-fig2 = plt.figure(figsize=(12, 6))
-subjects = ["Maths", "Science", "English"]
-subject_averages = [df["Maths"].mean(), df["Science"].mean(), df["English"].mean()]
-colors = ['#FF6B6B', '#4ECDC4', '#45B7D1']
-bars = plt.bar(subjects, subject_averages, color=colors, edgecolor='black', linewidth=2)
-plt.ylabel("Average Marks", fontsize=12, fontweight='bold')
-plt.title("📚 Subject-wise Average Performance", fontsize=14, fontweight='bold')
-plt.ylim(0, 100)
-for bar, avg in zip(bars, subject_averages):
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2., height + 2,
-            f'{avg:.1f}', ha='center', fontweight='bold')
-plt.tight_layout()
-plt.savefig("outputs/charts/02_subject_wise_performance.png", dpi=300, bbox_inches='tight')
-print("✅ Chart 2 saved: Subject-wise Performance Comparison")
+def chart_subject_wise_performance(data, path, opts):
+    fig = new_figure((12, 6))
+    ax = fig.subplots()
+    subject_averages = data["subject_means"][SUBJECTS]
+    bars = ax.bar(SUBJECTS, subject_averages, color=SUBJECT_COLORS, edgecolor='black', linewidth=2)
+    ax.set_ylabel("Average Marks", fontsize=12, fontweight='bold')
+    ax.set_title("📚 Subject-wise Average Performance", fontsize=14, fontweight='bold')
+    ax.set_ylim(0, 100)
+    label_bars(ax, bars, '{:.1f}')
+    save_figure(fig, path, opts)
+
 
 # ============ Chart 3: Attendance vs Average Performance ============
-fig3 = plt.figure(figsize=(12, 6))
-plt.scatter(df["Attendance"], df["Average"], s=200, alpha=0.6, c=df["Average"], cmap='viridis', edgecolor='black', linewidth=2)
-plt.xlabel("Attendance (%)", fontsize=12, fontweight='bold')
-plt.ylabel("Average Marks", fontsize=12, fontweight='bold')
-plt.title("🎯 Attendance vs Average Performance", fontsize=14, fontweight='bold')
-plt.colorbar(label='Average Marks')
-for idx, row in df.iterrows():
-    plt.annotate(row['Name'], (row['Attendance'], row['Average']), fontsize=9)
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-plt.savefig("outputs/charts/03_attendance_vs_performance.png", dpi=300, bbox_inches='tight')
-print("✅ Chart 3 saved: Attendance vs Average Performance")
+def chart_attendance_vs_performance(data, path, opts):
+    fig = new_figure((12, 6))
+    ax = fig.subplots()
+    if opts.aggregate:
+        # 2D density: cost and readability no longer depend on the cohort size
+        points = data["points"]
+        hb = ax.hexbin(points["Attendance"], points["Average"], gridsize=40, cmap='viridis', mincnt=1,
+                       extent=(0, 100, 0, 100))
+        fig.colorbar(hb, ax=ax, label='Students')
+        ax.set_title(f"🎯 Attendance vs Average Performance ({data['students']:,} students)",
+                     fontsize=14, fontweight='bold')
+    else:
+        df = data["per_student"]
+        sc = ax.scatter(df["Attendance"], df["Average"], s=200, alpha=0.6, c=df["Average"], cmap='viridis', edgecolor='black', linewidth=2)
+        fig.colorbar(sc, ax=ax, label='Average Marks')
+        for name, x, y in zip(df["Name"], df["Attendance"], df["Average"]):
+            ax.annotate(name, (x, y), fontsize=9)
+        ax.set_title("🎯 Attendance vs Average Performance", fontsize=14, fontweight='bold')
+    ax.set_xlabel("Attendance (%)", fontsize=12, fontweight='bold')
+    ax.set_ylabel("Average Marks", fontsize=12, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    save_figure(fig, path, opts)
+
 
 # ============ Chart 4: Result Distribution (Pass/Fail) ============
-fig4 = plt.figure(figsize=(10, 6))
-result_counts = df["Result"].value_counts()
-colors_pie = ['#2ECC71', '#E74C3C']
-explode = (0.05,) * len(result_counts)
-plt.pie(result_counts.values, labels=result_counts.index, autopct='%1.1f%%',
-        colors=colors_pie, explode=explode, startangle=90, textprops={'fontsize': 12, 'fontweight': 'bold'})
-plt.title("Result Distribution (Pass/Fail)", fontsize=14, fontweight='bold')
-plt.tight_layout()
-plt.savefig("outputs/charts/04_result_distribution.png", dpi=300, bbox_inches='tight')
-print("✅ Chart 4 saved: Result Distribution")
+def chart_result_distribution(data, path, opts):
+    fig = new_figure((10, 6))
+    ax = fig.subplots()
+    # Most frequent first, as value_counts orders them
+    result_counts = pd.Series({"Pass": data["pass"], "Fail": data["fail"]}).sort_values(ascending=False, kind="stable")
+    result_counts = result_counts[result_counts > 0]
+    colors_pie = ['#2ECC71', '#E74C3C']
+    explode = (0.05,) * len(result_counts)
+    ax.pie(result_counts.values, labels=result_counts.index, autopct='%1.1f%%',
+           colors=colors_pie, explode=explode, startangle=90, textprops={'fontsize': 12, 'fontweight': 'bold'})
+    ax.set_title("Result Distribution (Pass/Fail)", fontsize=14, fontweight='bold')
+    save_figure(fig, path, opts)
+
 
 # ============ Chart 5: Subject Performance by Student (Grouped Bar Chart) ============
-fig5 = plt.figure(figsize=(14, 6))
-x = range(len(df))
-width = 0.25
-plt.bar([i - width for i in x], df["Maths"], width, label='Maths', color='#FF6B6B')
-plt.bar([i for i in x], df["Science"], width, label='Science', color='#4ECDC4')
-plt.bar([i + width for i in x], df["English"], width, label='English', color='#45B7D1')
-plt.xlabel("Students", fontsize=12, fontweight='bold')
-plt.ylabel("Marks", fontsize=12, fontweight='bold')
-plt.title("📖 Subject-wise Performance by Student", fontsize=14, fontweight='bold')
-plt.xticks(x, df["Name"], rotation=45)
-plt.legend(fontsize=11)
-plt.ylim(0, 105)
-plt.tight_layout()
-plt.savefig("outputs/charts/05_subject_by_student.png", dpi=300, bbox_inches='tight')
-print("✅ Chart 5 saved: Subject Performance by Student")
+def chart_subject_by_student(data, path, opts):
+    fig = new_figure((14, 6))
+    ax = fig.subplots()
+    if opts.aggregate:
+        # Mark distribution per subject instead of one bar group per student
+        for subject, color in zip(SUBJECTS, SUBJECT_COLORS):
+            hist_counts(ax, data["histograms"][subject], histtype='step', linewidth=2.5, label=subject, color=color)
+        ax.set_xlabel("Marks", fontsize=12, fontweight='bold')
+        ax.set_ylabel("Students", fontsize=12, fontweight='bold')
+        ax.set_title(f"📖 Subject-wise Mark Distribution ({data['students']:,} students)", fontsize=14, fontweight='bold')
+    else:
+        df = data["per_student"]
+        x = np.arange(len(df))
+        width = 0.25
+        for offset, subject, color in zip((-width, 0, width), SUBJECTS, SUBJECT_COLORS):
+            ax.bar(x + offset, df[subject], width, label=subject, color=color)
+        ax.set_xlabel("Students", fontsize=12, fontweight='bold')
+        ax.set_ylabel("Marks", fontsize=12, fontweight='bold')
+        ax.set_title("📖 Subject-wise Performance by Student", fontsize=14, fontweight='bold')
+        ax.set_xticks(x, df["Name"], rotation=45)
+        ax.set_ylim(0, 105)
+    ax.legend(fontsize=11)
+    save_figure(fig, path, opts)
+
 
 # ============ Chart 6: Attendance Distribution ============
-fig6 = plt.figure(figsize=(12, 6))
-plt.bar(df["Name"], df["Attendance"], color='#9B59B6', edgecolor='black', linewidth=2)
-plt.xlabel("Students", fontsize=12, fontweight='bold')
-plt.ylabel("Attendance (%)", fontsize=12, fontweight='bold')
-plt.title("📅 Student Attendance Distribution", fontsize=14, fontweight='bold')
-plt.axhline(y=75, color='r', linestyle='--', linewidth=2, label='Min. Attendance (75%)')
-plt.xticks(rotation=45)
-plt.ylim(0, 105)
-plt.legend()
-for i, v in enumerate(df["Attendance"]):
-    plt.text(i, v + 2, f'{v}%', ha='center', fontweight='bold')
-plt.tight_layout()
-plt.savefig("outputs/charts/06_attendance_distribution.png", dpi=300, bbox_inches='tight')
-print("✅ Chart 6 saved: Attendance Distribution")
+def chart_attendance_distribution(data, path, opts):
+    fig = new_figure((12, 6))
+    ax = fig.subplots()
+    if opts.aggregate:
+        hist_counts(ax, data["histograms"]["Attendance"], color='#9B59B6', edgecolor='black', linewidth=1.5)
+        ax.axvline(x=75, color='r', linestyle='--', linewidth=2, label='Min. Attendance (75%)')
+        ax.set_xlabel("Attendance (%)", fontsize=12, fontweight='bold')
+        ax.set_ylabel("Students", fontsize=12, fontweight='bold')
+        ax.set_title(f"📅 Student Attendance Distribution ({data['students']:,} students)", fontsize=14, fontweight='bold')
+    else:
+        df = data["per_student"]
+        bars = ax.bar(df["Name"], df["Attendance"], color='#9B59B6', edgecolor='black', linewidth=2)
+        ax.axhline(y=75, color='r', linestyle='--', linewidth=2, label='Min. Attendance (75%)')
+        ax.set_xlabel("Students", fontsize=12, fontweight='bold')
+        ax.set_ylabel("Attendance (%)", fontsize=12, fontweight='bold')
+        ax.set_title("📅 Student Attendance Distribution", fontsize=14, fontweight='bold')
+        ax.tick_params(axis='x', labelrotation=45)
+        ax.set_ylim(0, 105)
+        label_bars(ax, bars, '{:g}%')
+    ax.legend()
+    save_figure(fig, path, opts)
+
 
 # ============ Chart 7: Correlation Heatmap ============
-fig7 = plt.figure(figsize=(10, 8))
-numeric_cols = ["Maths", "Science", "English", "Attendance", "Average"]
-correlation = df[numeric_cols].corr()
-sns.heatmap(correlation, annot=True, cmap='coolwarm', center=0, square=True, 
-            linewidths=2, cbar_kws={"shrink": 0.8}, fmt='.2f', annot_kws={'size': 10})
-plt.title("🔗 Correlation Heatmap", fontsize=14, fontweight='bold')
-plt.tight_layout()
-plt.savefig("outputs/charts/07_correlation_heatmap.png", dpi=300, bbox_inches='tight')
-print("✅ Chart 7 saved: Correlation Heatmap")
+def chart_correlation_heatmap(data, path, opts):
+    import seaborn as sns
+
+    fig = new_figure((10, 8))
+    ax = fig.subplots()
+    sns.heatmap(data["correlation"], annot=True, cmap='coolwarm', center=0, square=True, ax=ax,
+                linewidths=2, cbar_kws={"shrink": 0.8}, fmt='.2f', annot_kws={'size': 10})
+    ax.set_title("🔗 Correlation Heatmap", fontsize=14, fontweight='bold')
+    save_figure(fig, path, opts)
+
 
 # ============ Chart 8: Box Plot for Subject Scores ============
-fig8 = plt.figure(figsize=(12, 6))
-data_to_plot = [df["Maths"], df["Science"], df["English"]]
-bp = plt.boxplot(data_to_plot, labels=["Maths", "Science", "English"], patch_artist=True)
-for patch, color in zip(bp['boxes'], ['#FF6B6B', '#4ECDC4', '#45B7D1']):
-    patch.set_facecolor(color)
-plt.ylabel("Marks", fontsize=12, fontweight='bold')
-plt.title("📦 Subject Score Distribution (Box Plot)", fontsize=14, fontweight='bold')
-plt.grid(axis='y', alpha=0.3)
-plt.tight_layout()
-plt.savefig("outputs/charts/08_subject_boxplot.png", dpi=300, bbox_inches='tight')
-print("✅ Chart 8 saved: Subject Box Plot")
+def chart_subject_boxplot(data, path, opts):
+    fig = new_figure((12, 6))
+    ax = fig.subplots()
+    bp = ax.bxp(data["box_stats"], patch_artist=True)
+    for patch, color in zip(bp['boxes'], SUBJECT_COLORS):
+        patch.set_facecolor(color)
+    ax.set_ylabel("Marks", fontsize=12, fontweight='bold')
+    ax.set_title("📦 Subject Score Distribution (Box Plot)", fontsize=14, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    save_figure(fig, path, opts)
+
 
 # ============ Chart 9: Total Marks Distribution ============
-fig9 = plt.figure(figsize=(12, 6))
-plt.barh(df["Name"], df["Total"], color='#F39C12', edgecolor='black', linewidth=2)
-plt.xlabel("Total Marks", fontsize=12, fontweight='bold')
-plt.title("🏆 Student Total Marks Distribution", fontsize=14, fontweight='bold')
-for i, v in enumerate(df["Total"]):
-    plt.text(v + 5, i, f'{v}', va='center', fontweight='bold')
-plt.xlim(0, 310)
-plt.tight_layout()
-plt.savefig("outputs/charts/09_total_marks.png", dpi=300, bbox_inches='tight')
-print("✅ Chart 9 saved: Total Marks Distribution")
+def chart_total_marks(data, path, opts):
+    fig = new_figure((12, 6))
+    ax = fig.subplots()
+    if opts.aggregate:
+        shown = data["by_total"]  # worst first: barh draws bottom-up
+        bars = ax.barh(np.arange(len(shown)), shown["Total"], color='#F39C12', edgecolor='black', linewidth=2)
+        ax.set_yticks(np.arange(len(shown)), shown["Name"])
+        ax.set_title(f"🏆 Top & Bottom {opts.top_n} Students by Total Marks ({data['students']:,} students)",
+                     fontsize=14, fontweight='bold')
+    else:
+        df = data["per_student"]
+        bars = ax.barh(df["Name"], df["Total"], color='#F39C12', edgecolor='black', linewidth=2)
+        ax.set_title("🏆 Student Total Marks Distribution", fontsize=14, fontweight='bold')
+    ax.set_xlabel("Total Marks", fontsize=12, fontweight='bold')
+    label_bars(ax, bars, '{:g}')
+    ax.set_xlim(0, 310)
+    save_figure(fig, path, opts)
+
 
 # ============ Chart 10: Performance Summary Statistics ============
-fig10, axes = plt.subplots(2, 2, figsize=(14, 10))
-
-# Average by Result
-ax1 = axes[0, 0]
-result_avg = df.groupby("Result")["Average"].mean()
-result_avg.plot(kind='bar', ax=ax1, color=['#2ECC71', '#E74C3C'], edgecolor='black')
-ax1.set_title("Average Performance by Result", fontweight='bold')
-ax1.set_ylabel("Average Marks")
-ax1.set_xticklabels(ax1.get_xticklabels(), rotation=0)
-for i, v in enumerate(result_avg):
-    ax1.text(i, v + 1, f'{v:.1f}', ha='center', fontweight='bold')
-
-# Attendance comparison
-ax2 = axes[0, 1]
-df.sort_values('Attendance', ascending=False).plot(x='Name', y='Attendance', ax=ax2, kind='barh', color='#9B59B6', edgecolor='black', legend=False)
-ax2.set_title("Attendance Comparison", fontweight='bold')
-ax2.set_xlabel("Attendance (%)")
-
-# Statistics text
-ax3 = axes[1, 0]
-ax3.axis('off')
-stats_text = f"""
-📊 PERFORMANCE STATISTICS
-
-Total Students: {len(df)}
-Pass: {(df['Result'] == 'Pass').sum()}
-Fail: {(df['Result'] == 'Fail').sum()}
-
-Average Marks: {df['Average'].mean():.2f}
-Highest Score: {df['Average'].max():.2f}
-Lowest Score: {df['Average'].min():.2f}
-
-Avg Attendance: {df['Attendance'].mean():.2f}%
-"""
-ax3.text(0.1, 0.5, stats_text, fontsize=11, family='monospace', 
-         bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5), verticalalignment='center')
-
-# Subject average comparison
-ax4 = axes[1, 1]
-subject_data = {'Maths': df['Maths'].mean(), 'Science': df['Science'].mean(), 'English': df['English'].mean()}
-ax4.bar(subject_data.keys(), subject_data.values(), color=['#FF6B6B', '#4ECDC4', '#45B7D1'], edgecolor='black')
-ax4.set_title("Subject Average Comparison", fontweight='bold')
-ax4.set_ylabel("Average Marks")
-ax4.set_ylim(0, 100)
-for i, (k, v) in enumerate(subject_data.items()):
-    ax4.text(i, v + 1, f'{v:.1f}', ha='center', fontweight='bold')
-
-plt.tight_layout()
-plt.savefig("outputs/charts/10_performance_summary.png", dpi=300, bbox_inches='tight')
-print("✅ Chart 10 saved: Performance Summary")
-
-print("\n" + "="*50)
-print("📈 Analysis Complete!")
-print("="*50)
-print("All charts have been saved to outputs/charts/")
-print("="*50)
+def chart_performance_summary(data, path, opts):
+    fig = new_figure((14, 10))
+    axes = fig.subplots(2, 2)
+
+    # Average by Result
+    ax1 = axes[0, 0]
+    result_avg = data["result_avg"]
+    result_avg.plot(kind='bar', ax=ax1, color=['#2ECC71', '#E74C3C'], edgecolor='black')
+    ax1.set_title("Average Performance by Result", fontweight='bold')
+    ax1.set_ylabel("Average Marks")
+    ax1.tick_params(axis='x', labelrotation=0)
+    label_bars(ax1, ax1.containers[0], '{:.1f}')
+
+    # Attendance comparison
+    ax2 = axes[0, 1]
+    if opts.aggregate:
+        hist_counts(ax2, data["histograms"]["Attendance"], orientation='horizontal', color='#9B59B6', edgecolor='black')
+        ax2.set_title("Attendance Distribution", fontweight='bold')
+        ax2.set_xlabel("Students")
+        ax2.set_ylabel("Attendance (%)")
+    else:
+        data["by_attendance"].plot(x='Name', y='Attendance', ax=ax2, kind='barh', color='#9B59B6', edgecolor='black', legend=False)
+        ax2.set_title("Attendance Comparison", fontweight='bold')
+        ax2.set_xlabel("Attendance (%)")
+
+    # Statistics text
+    ax3 = axes[1, 0]
+    ax3.axis('off')
+    stats_text = "\n".join([
+        "",
+        "📊 PERFORMANCE STATISTICS",
+        "",
+        f"Total Students: {data['students']}",
+        f"Pass: {data['pass']}",
+        f"Fail: {data['fail']}",
+        "",
+        f"Average Marks: {data['average_mean']:.2f}",
+        f"Highest Score: {data['average_max']:.2f}",
+        f"Lowest Score: {data['average_min']:.2f}",
+        "",
+        f"Avg Attendance: {data['attendance_mean']:.2f}%",
+        "",
+    ])
+    ax3.text(0.1, 0.5, stats_text, fontsize=11, family='monospace',
+             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5), verticalalignment='center')
+
+    # Subject average comparison
+    ax4 = axes[1, 1]
+    subject_data = data["subject_means"]
+    bars = ax4.bar(subject_data.index, subject_data.values, color=SUBJECT_COLORS, edgecolor='black')
+    ax4.set_title("Subject Average Comparison", fontweight='bold')
+    ax4.set_ylabel("Average Marks")
+    ax4.set_ylim(0, 100)
+    label_bars(ax4, bars, '{:.1f}')
+
+    save_figure(fig, path, opts)
+
+# ============ Chart Registry ============
+
+class Chart(NamedTuple):
+    filename: str
+    label: str
+    render: Callable
+    columns: tuple  # input columns the chart reads (used for change detection)
+
+
+SUBJECT_COLUMNS = ("Maths", "Science", "English")
+
+CHARTS = {
+    "01": Chart("01_average_performance.png", "Average Performance by Student",
+                chart_average_performance, ("Name", "Average")),
+    "02": Chart("02_subject_wise_performance.png", "Subject-wise Performance Comparison",
+                chart_subject_wise_performance, SUBJECT_COLUMNS),
+    "03": Chart("03_attendance_vs_performance.png", "Attendance vs Average Performance",
+                chart_attendance_vs_performance, ("Name", "Attendance", "Average")),
+    "04": Chart("04_result_distribution.png", "Result Distribution",
+                chart_result_distribution, ("Result",)),
+    "05": Chart("05_subject_by_student.png", "Subject Performance by Student",
+                chart_subject_by_student, ("Name",) + SUBJECT_COLUMNS),
+    "06": Chart("06_attendance_distribution.png", "Attendance Distribution",
+                chart_attendance_distribution, ("Name", "Attendance")),
+    "07": Chart("07_correlation_heatmap.png", "Correlation Heatmap",
+                chart_correlation_heatmap, SUBJECT_COLUMNS + ("Attendance", "Average")),
+    "08": Chart("08_subject_boxplot.png", "Subject Box Plot",
+                chart_subject_boxplot, SUBJECT_COLUMNS),
+    "09": Chart("09_total_marks.png", "Total Marks Distribution",
+                chart_total_marks, ("Name", "Total")),
+    "10": Chart("10_performance_summary.png", "Performance Summary",
+                chart_performance_summary,
+                ("Name", "Result", "Attendance", "Average") + SUBJECT_COLUMNS),
+}
+
+
+def chart_filename(key, fmt="png"):
+    # Registry names are the PNG files; other formats swap the extension
+    return f"{os.path.splitext(CHARTS[key].filename)[0]}.{fmt}"
+
+# ============ Incremental Regeneration ============
+
+@functools.cache
+def code_digest():
+    """Digest of this module's source.
+
+    Renderers share helpers (chart_data, box_stats, new_figure, save_figure,
+    ...) and style (WHITEGRID), so an edit anywhere in the file may change
+    a chart; hashing only the render function would miss it.
+    """
+    with open(__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def chart_hash(key, df, params):
+    """Hash of the chart's input columns, render parameters and the module's code."""
+    chart = CHARTS[key]
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df[list(chart.columns)], index=False).values.tobytes())
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    digest.update(code_digest().encode())
+    return digest.hexdigest()
+
+
+def load_manifest(chart_dir):
+    path = os.path.join(chart_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(chart_dir, manifest):
+    path = os.path.join(chart_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def stale_charts(df, keys, params, chart_dir, manifest):
+    """Return {key: hash} for charts whose inputs changed or whose file is missing."""
+    stale = {}
+    for key in keys:
+        digest = chart_hash(key, df, params)
+        filename = chart_filename(key, params["fmt"])
+        up_to_date = (
+            manifest.get(filename, {}).get("hash") == digest
+            and os.path.exists(os.path.join(chart_dir, filename))
+        )
+        if not up_to_date:
+            stale[key] = digest
+    return stale
+
+# ============ Parallel Rendering ============
+
+_worker_data = None
+
+
+def _init_worker(data):
+    # Each worker receives the chart data once instead of once per chart
+    global _worker_data
+    _worker_data = data
+    setup_style()
+
+
+def render_chart(key, opts, chart_dir, data=None):
+    start = time.perf_counter()
+    CHARTS[key].render(_worker_data if data is None else data, os.path.join(chart_dir, chart_filename(key, opts.fmt)), opts)
+    return key, time.perf_counter() - start
+
+
+def render_charts(df, keys, opts=RenderOptions(), workers=1, chart_dir=CHART_DIR, summary=None):
+    """Render the selected charts, in a process pool when workers > 1.
+
+    `summary` is AggregateStore.chart_summary() for df (computed from df when
+    omitted). Yields (key, seconds) as each chart finishes.
+    """
+    os.makedirs(chart_dir, exist_ok=True)
+    if summary is None:
+        summary = aggregates.AggregateStore.from_frame(df).chart_summary()
+    with stage("analysis.chart_data", rows=len(df), memory=True):
+        data = chart_data(df, keys, opts, summary)
+
+    if workers <= 1 or len(keys) <= 1:
+        setup_style()
+        for key in keys:
+            yield render_chart(key, opts, chart_dir, data)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as pool:
+        futures = [pool.submit(render_chart, key, opts, chart_dir) for key in keys]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def parse_chart_keys(values):
+    if not values:
+        return list(CHARTS)
+    keys = [v.zfill(2) for v in values]
+    unknown = [k for k in keys if k not in CHARTS]
+    if unknown:
+        raise SystemExit(f"Unknown chart(s): {', '.join(unknown)} (choose from {', '.join(CHARTS)})")
+    return keys
+
+# ============ Main ============
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the student performance report and charts.")
+    parser.add_argument("--charts", nargs="+", metavar="N", help="Charts to render, e.g. --charts 1 3 10 (default: all)")
+    parser.add_argument("--profile", choices=list(PROFILES), default="full",
+                        help="full: 300 DPI, cropped to content; fast: 100 DPI, fixed bounding box, light PNG compression")
+    parser.add_argument("--dpi", type=int, help="Override the profile's resolution")
+    parser.add_argument("--format", choices=["png", "svg", "webp"], default="png",
+                        help="Chart file format (the dashboard shows PNG charts)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes used for rendering (1 = render in this process)")
+    parser.add_argument("--chart-dir", default=CHART_DIR)
+    parser.add_argument("--input", default=PROCESSED_CSV, help="Processed dataset (CSV path)")
+    parser.add_argument("--mode", choices=["auto", "per-student", "aggregate"], default="auto",
+                        help="Per-student bars/labels or cohort views (auto: decided by --max-students)")
+    parser.add_argument("--max-students", type=int, default=50,
+                        help="Largest cohort drawn per student in auto mode")
+    parser.add_argument("--top-n", type=int, default=10,
+                        help="Students shown at each end of top/bottom-N charts")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-render charts even when their inputs are unchanged")
+    args = parser.parse_args(argv)
+
+    keys = parse_chart_keys(args.charts)
+    with stage("analysis.load", memory=True) as s:
+        df = load_data(args.input)
+        s.rows = len(df)
+
+    # Sort by average
+    with stage("analysis.report", rows=len(df), memory=True):
+        top_students = df.sort_values(by="Average", ascending=False)
+
+        print("\n📊 Student Performance Summary:\n")
+        print(top_students[["RollNo", "Name", "Average"]])
+
+        # Save result
+        top_students.to_csv(REPORT_PATH, index=False)
+
+    # Skip charts whose inputs and render parameters match the manifest
+    aggregate = args.mode == "aggregate" or (args.mode == "auto" and len(df) > args.max_students)
+    profile = dict(PROFILES[args.profile], **({"dpi": args.dpi} if args.dpi else {}))
+    opts = RenderOptions(aggregate=aggregate, top_n=args.top_n, fmt=args.format, **profile)
+    params = opts._asdict()
+    manifest = load_manifest(args.chart_dir)
+    with stage("analysis.change_detection", rows=len(df)):
+        stale = stale_charts(df, keys, params, args.chart_dir, {} if args.force else manifest)
+    for key in keys:
+        if key not in stale:
+            print(f"⏭ Chart {int(key)} up to date: {CHARTS[key].label}")
+
+    timings = {}
+    start = time.perf_counter()
+    if stale:
+        workers = min(args.workers, len(stale))
+        view = "aggregated" if opts.aggregate else "per-student"
+        print(f"\n🎨 Rendering {len(stale)} {view} chart(s) as {opts.fmt.upper()} at {opts.dpi} DPI "
+              f"({args.profile} profile) with {workers} worker(s)\n")
+
+        with stage("analysis.render", rows=len(df), memory=True):
+            # Means, correlations and pass counts (charts 2/4/7/10) come from the aggregate store
+            summary = aggregates.load_or_build(args.input).chart_summary() if os.path.exists(args.input) else None
+            for key, seconds in render_charts(df, list(stale), opts, workers, args.chart_dir, summary):
+                timings[key] = seconds
+                instrumentation.record(f"analysis.chart_{key}", seconds, rows=len(df))
+                manifest[chart_filename(key, opts.fmt)] = {"hash": stale[key], "params": params}
+                print(f"✅ Chart {int(key)} saved: {CHARTS[key].label} ({seconds:.2f}s)")
+            save_manifest(args.chart_dir, manifest)
+    total = time.perf_counter() - start
+
+    if timings:
+        print("\n⏱ Per-chart render time (slowest first):")
+        for key, seconds in sorted(timings.items(), key=lambda kv: kv[1], reverse=True):
+            print(f"   {chart_filename(key, opts.fmt):<36}{seconds:>7.2f}s")
+        print(f"   {'wall time':<36}{total:>7.2f}s")
+
+    print("\n" + "="*50)
+    print("📈 Analysis Complete!")
+    print("="*50)
+    print(f"All charts have been saved to {args.chart_dir}/")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
-from PIL import Image
+import functools
 import os
 
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.ensemble import RandomForestClassifier
+import compiled_forest
+import decision_surface
+import instrumentation
+import jobs
+import model_registry
+from analysis import CHART_DIR
+from dashboard_charts import build_charts, build_trend_chart
+from dashboard_data import DataFilter, get_dataset, get_history
 
 # ---------------- Page Setup ---------------- #
 st.set_page_config(page_title="Student Performance Dashboard", layout="wide")
@@ -24,8 +30,122 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# ---------------- Cached Resources ---------------- #
+
+JOB_POLL_SECONDS = 1
+
+
+@st.cache_resource
+def get_job_manager():
+    # Worker processes shared by every session: training and scoring run there
+    return jobs.JobManager()
+
+@st.cache_resource(show_spinner="Loading risk model...", max_entries=2)
+def get_risk_model(model_version):
+    # model_version (dataset hash, file mtimes) is the cache key: a new dataset
+    # or a retrain means a new model
+    with instrumentation.stage("dashboard.load_model", memory=True):
+        return model_registry.load_model(model_registry.model_path(model_version[0]))
+
+@st.cache_resource(max_entries=2)
+def get_risk_predictor(model_version):
+    # Flat-array copy of the forest: exact predictions without sklearn's per-call overhead
+    with instrumentation.stage("dashboard.compile_model", memory=True):
+        return compiled_forest.compile_model(get_risk_model(model_version)["pipeline"])
+
+@st.cache_resource(show_spinner="Loading risk lookup table...", max_entries=2)
+def get_risk_surface(model_version):
+    with instrumentation.stage("dashboard.load_surface", memory=True):
+        return decision_surface.load_surface(decision_surface.surface_path(model_version[0]))
+
+# ---------------- Background Jobs ---------------- #
+
+def show_job(job):
+    """Status line of a background job: a progress bar while it runs."""
+    if job.status == "done":
+        st.success(f"✅ {job.name}: finished in {job.seconds:.1f}s")
+    elif job.status == "failed":
+        st.error(f"❌ {job.name}: {job.error}")
+    elif job.status == "cancelled":
+        st.warning(f"⏹ {job.name}: cancelled")
+    else:
+        state = "waiting for a worker" if job.status == "queued" else job.message
+        st.progress(job.progress, text=f"⏳ {job.name}: {state} ({job.seconds:.0f}s)")
+
+
+def _read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def wait_for_job(job_id):
+    # Polls without rerunning the page; the page reruns once the job has finished
+    job = get_job_manager().get(job_id)
+    if job is not None:
+        show_job(job)
+        if job.done:
+            st.rerun()
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def scoring_status(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return
+    show_job(job)
+    if job.status == "done":
+        rows, seconds, output_path = job.result
+        st.caption(f"{rows:,} rows scored in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+        st.download_button("📥 Download Predictions", data=functools.partial(_read_bytes, output_path),
+                           file_name="predictions.csv", mime="text/csv")
+
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def jobs_panel():
+    job_manager = get_job_manager()
+    if st.button("🔁 Retrain risk model", use_container_width=True):
+        job_manager.submit("Retrain risk model", jobs.train_risk_model, force=True,
+                           key=("train", model_registry.dataset_hash()))
+    if st.button("📈 Rebuild aggregate store", use_container_width=True):
+        job_manager.submit("Rebuild aggregates", jobs.rebuild_aggregates, key=("aggregates",))
+
+    job_list = job_manager.jobs()
+    for job in job_list[:5]:
+        show_job(job)
+    if not job_list:
+        st.caption(f"No jobs yet ({job_manager.workers} worker process(es)).")
+
+    # A job that finished since the last poll may have replaced the model: rerun the page
+    finished = {job.id for job in job_list if job.status == "done"}
+    seen = st.session_state.setdefault("finished_jobs", finished)
+    st.session_state["finished_jobs"] = finished
+    if finished - seen:
+        st.rerun()
+
+
+def show_prediction(classes, probability):
+    risk_label = classes[probability.argmax()]
+    
+    # Display prediction with color coding
+    if risk_label == "Low Risk":
+        st.success(f"**Predicted Risk Level: {risk_label}**", icon="✅")
+    elif risk_label == "Medium Risk":
+        st.warning(f"**Predicted Risk Level: {risk_label}**", icon="⚠️")
+    else:
+        st.error(f"**Predicted Risk Level: {risk_label}**", icon="❌")
+    
+    # Show confidence scores
+    st.markdown("### Confidence Scores:")
+    for class_name, prob in zip(classes, probability):
+        st.progress(float(prob), text=f"{class_name}: {prob*100:.2f}%")
+
+with st.sidebar:
+    st.markdown("### ⚙️ Background Jobs")
+    jobs_panel()
+
 # Create tabs for different sections
-tabs = st.tabs(["📊 Overview", "📈 Visualizations", "🤖 Predictions", "📋 Data"])
+tabs = st.tabs(["📊 Overview", "📈 Visualizations", "🤖 Predictions", "📋 Data", "🧑‍🎓 Student History"])
 
 # ================== TAB 1: Overview ================== #
 with tabs[0]:
@@ -41,165 +161,255 @@ with tabs[0]:
     """)
     
     # Load and display dataset summary
-    df = pd.read_csv("outputs/processed_student_data.csv")
+    data = get_dataset()
+    metrics = data.metrics
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Students", len(df))
+        st.metric("Total Students", metrics["total_students"])
     with col2:
-        st.metric("Pass Rate", f"{(df['Result'] == 'Pass').sum() / len(df) * 100:.1f}%")
+        st.metric("Pass Rate", f"{metrics['pass_rate']:.1f}%")
     with col3:
-        st.metric("Avg Performance", f"{df['Percentage'].mean():.1f}%")
+        st.metric("Avg Performance", f"{metrics['avg_percentage']:.1f}%")
     with col4:
-        st.metric("Avg Attendance", f"{df['Attendance'].mean():.1f}%")
+        st.metric("Avg Attendance", f"{metrics['avg_attendance']:.1f}%")
 
 # ================== TAB 2: Visualizations ================== #
 with tabs[1]:
     st.subheader("📊 Performance Visualizations")
     
-    # Define chart directory
-    chart_dir = "outputs/charts"
+    view_mode = st.radio("Chart mode", ["Interactive (live)", "Static images (analysis.py)"], horizontal=True)
     
-    # Check if charts exist
-    if os.path.exists(chart_dir):
-        charts = sorted([f for f in os.listdir(chart_dir) if f.startswith(('01_', '02_', '03_', '04_', '05_', '06_', '07_', '08_', '09_', '10_')) and f.endswith('.png')])
+    if view_mode == "Interactive (live)":
+        # Rendered in the browser from small cached aggregates of the current dataset
+        data = get_dataset()
+        index = data.index
         
-        if len(charts) > 0:
-            st.success(f"✅ Found {len(charts)} visualizations")
-            
-            # Create 2-column layout for charts
+        fcol1, fcol2, fcol3 = st.columns(3)
+        with fcol1:
+            chart_grades = st.multiselect("Grade", index.options("Grade"), key="chart_grades")
+        with fcol2:
+            chart_risks = st.multiselect("Risk Level", index.options("RiskLevel"), key="chart_risks")
+        with fcol3:
+            chart_results = st.multiselect("Result", index.options("Result"), key="chart_results")
+        
+        chart_filter = DataFilter(grades=tuple(chart_grades), risks=tuple(chart_risks), results=tuple(chart_results))
+        
+        if len(data.query(chart_filter)) == 0:
+            st.warning("⚠️ No students match the selected filters.")
+        else:
+            live_charts = build_charts(data.chart_tables(chart_filter))
             col1, col2 = st.columns(2)
+            for idx, (name, chart) in enumerate(live_charts.items()):
+                with (col1 if idx % 2 == 0 else col2):
+                    st.markdown(f"**Chart {idx + 1}: {name[3:].replace('_', ' ')}**")
+                    st.altair_chart(chart, use_container_width=True)
+    else:
+        from PIL import Image
+
+        # Define chart directory
+        chart_dir = CHART_DIR
+    
+        # Check if charts exist
+        if os.path.exists(chart_dir):
+            charts = sorted([f for f in os.listdir(chart_dir) if f.startswith(('01_', '02_', '03_', '04_', '05_', '06_', '07_', '08_', '09_', '10_')) and f.endswith('.png')])
+        
+            if len(charts) > 0:
+                st.success(f"✅ Found {len(charts)} visualizations")
+            
+                # Create 2-column layout for charts
+                col1, col2 = st.columns(2)
             
-            for idx, chart_file in enumerate(charts):
-                chart_path = os.path.join(chart_dir, chart_file)
+                for idx, chart_file in enumerate(charts):
+                    chart_path = os.path.join(chart_dir, chart_file)
                 
-                # Clean up the filename for display
-                display_name = chart_file.replace('_', ' ').replace('.png', '').replace('01 ', '').replace('02 ', '').replace('03 ', '').replace('04 ', '').replace('05 ', '').replace('06 ', '').replace('07 ', '').replace('08 ', '').replace('09 ', '').replace('10 ', '')
+                    # Clean up the filename for display
+                    display_name = chart_file.replace('_', ' ').replace('.png', '').replace('01 ', '').replace('02 ', '').replace('03 ', '').replace('04 ', '').replace('05 ', '').replace('06 ', '').replace('07 ', '').replace('08 ', '').replace('09 ', '').replace('10 ', '')
                 
-                try:
-                    img = Image.open(chart_path)
+                    try:
+                        img = Image.open(chart_path)
                     
-                    # Alternate between columns
-                    if idx % 2 == 0:
-                        with col1:
-                            st.markdown(f"**Chart {idx + 1}: {display_name}**")
-                            st.image(img, use_container_width=True)
-                    else:
-                        with col2:
-                            st.markdown(f"**Chart {idx + 1}: {display_name}**")
-                            st.image(img, use_container_width=True)
-                except Exception as e:
-                    st.error(f"Error loading {chart_file}: {e}")
+                        # Alternate between columns
+                        if idx % 2 == 0:
+                            with col1:
+                                st.markdown(f"**Chart {idx + 1}: {display_name}**")
+                                st.image(img, use_container_width=True)
+                        else:
+                            with col2:
+                                st.markdown(f"**Chart {idx + 1}: {display_name}**")
+                                st.image(img, use_container_width=True)
+                    except Exception as e:
+                        st.error(f"Error loading {chart_file}: {e}")
+            else:
+                st.warning("⚠️ No charts found. Please run analysis.py first.")
         else:
-            st.warning("⚠️ No charts found. Please run analysis.py first.")
-    else:
-        st.error("❌ Charts directory not found. Please generate charts first.")
+            st.error("❌ Charts directory not found. Please generate charts first.")
 
 # ================== TAB 3: Predictions ================== #
 with tabs[2]:
     st.subheader("🤖 Predict Student Risk Level")
     
-    # Load data for training
-    df = pd.read_csv("outputs/processed_student_data.csv")
-    
-    # Model Training
-    features = [
-        "Maths",
-        "Science",
-        "English",
-        "Attendance",
-        "Percentage",
-        "AttendanceImpact"
-    ]
-    
-    X = df[features]
-    y = df["RiskLevel"]
-    
-    encoder = LabelEncoder()
-    y_encoded = encoder.fit_transform(y)
-    
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X_scaled, y_encoded)
-    
-    st.markdown("### Enter Student Marks:")
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        maths = st.slider("Maths Marks", 0, 100, 70)
-    
-    with col2:
-        science = st.slider("Science Marks", 0, 100, 70)
-    
-    with col3:
-        english = st.slider("English Marks", 0, 100, 70)
-    
-    col4, col5 = st.columns(2)
-    
-    with col4:
-        attendance = st.slider("Attendance (%)", 0, 100, 80)
-    
-    # Calculate derived metrics
-    percentage = (maths + science + english) / 300 * 100
-    attendance_impact = attendance * 0.3 + percentage * 0.7
-    
-    # Display calculated metrics
-    st.markdown("### Calculated Metrics:")
-    col_metrics1, col_metrics2 = st.columns(2)
-    
-    with col_metrics1:
-        st.info(f"📌 **Percentage**: {percentage:.2f}%")
-    
-    with col_metrics2:
-        st.info(f"📌 **Attendance Impact**: {attendance_impact:.2f}")
-    
-    # Prediction button
-    if st.button("🔮 Predict Risk Level", key="predict_btn"):
+    # Trained once per dataset version in a worker process, shared by every session
+    model_version = jobs.risk_model_version()
+    if model_version is None:
+        job_manager = get_job_manager()
+        training_key = ("train", model_registry.dataset_hash())
+        training = job_manager.latest(training_key)
+        if training is not None and training.status in ("failed", "cancelled"):
+            # Not resubmitted on every rerun: a failing fit would just fail again
+            show_job(training)
+            if st.button("🔁 Retry training", key="retry_train_btn"):
+                job_manager.submit("Train risk model", jobs.train_risk_model, key=training_key)
+                st.rerun()
+        else:
+            if training is None or training.done:
+                training = job_manager.submit("Train risk model", jobs.train_risk_model, key=training_key)
+            st.info("🏋️ The risk model for this dataset version is being trained in the background. "
+                    "The other tabs stay usable; predictions appear here when it is ready.")
+            wait_for_job(training.id)
+    else:
+        st.markdown("### Enter Student Marks:")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            maths = st.slider("Maths Marks", 0, 100, 70)
+        
+        with col2:
+            science = st.slider("Science Marks", 0, 100, 70)
+        
+        with col3:
+            english = st.slider("English Marks", 0, 100, 70)
+        
+        col4, col5 = st.columns(2)
+        
+        with col4:
+            attendance = st.slider("Attendance (%)", 0, 100, 80)
+        
+        # Calculate derived metrics
+        percentage = (maths + science + english) / 300 * 100
+        attendance_impact = attendance * 0.3 + percentage * 0.7
+        
+        # Display calculated metrics
+        st.markdown("### Calculated Metrics:")
+        col_metrics1, col_metrics2 = st.columns(2)
+        
+        with col_metrics1:
+            st.info(f"📌 **Percentage**: {percentage:.2f}%")
+        
+        with col_metrics2:
+            st.info(f"📌 **Attendance Impact**: {attendance_impact:.2f}")
+        
+        # Instant mode answers from the precomputed decision surface as the sliders move.
+        # Off by default: between grid points the lookup can disagree with the model.
+        instant = st.toggle(
+            "⚡ Instant prediction (precomputed lookup)",
+            value=False,
+            help=f"Looks up the model's answer at the nearest {decision_surface.GRID_STEP}-mark grid point. "
+                 "Turn off to run the full model on the exact slider values.",
+        )
+        if instant:
+            st.caption(f"≈ Approximate: the model's answer at the nearest {decision_surface.GRID_STEP}-mark "
+                       "grid point, not at the exact slider values.")
+        
         try:
-            input_data = [[maths, science, english, attendance, percentage, attendance_impact]]
-            input_scaled = scaler.transform(input_data)
-            prediction = model.predict(input_scaled)
-            probability = model.predict_proba(input_scaled)
-            risk_label = encoder.inverse_transform(prediction)[0]
-            
-            # Display prediction with color coding
-            if risk_label == "Low Risk":
-                st.success(f"✅ **Predicted Risk Level: {risk_label}**", icon="✓")
-            elif risk_label == "Medium Risk":
-                st.warning(f"⚠️ **Predicted Risk Level: {risk_label}**", icon="⚠")
-            else:
-                st.error(f"❌ **Predicted Risk Level: {risk_label}**", icon="✕")
-            
-            # Show confidence scores
-            st.markdown("### Confidence Scores:")
-            risk_classes = encoder.classes_
-            for class_name, prob in zip(risk_classes, probability[0]):
-                st.progress(prob, text=f"{class_name}: {prob*100:.2f}%")
-                
+            if instant:
+                surface = get_risk_surface(model_version)
+                with instrumentation.timed("dashboard.predict_lookup", rows=1):
+                    probability = surface.predict_proba(maths, science, english, attendance)
+                show_prediction(surface.classes, probability)
+            elif st.button("🔮 Predict Risk Level", key="predict_btn"):
+                # Same probabilities as the pipeline's predict_proba (features derived and scaled too)
+                predictor = get_risk_predictor(model_version)
+                with instrumentation.timed("dashboard.predict_model", rows=1):
+                    probability = predictor.predict_proba([maths, science, english, attendance])[0]
+                show_prediction(predictor.classes, probability)
         except Exception as e:
             st.error(f"Error making prediction: {e}")
+        
+        # Whole files are scored in a worker; the page keeps responding meanwhile
+        st.markdown("### 📦 Score a Whole File")
+        upload = st.file_uploader("Term upload (CSV or Parquet with Maths, Science, English, Attendance)",
+                                  type=["csv", "parquet"])
+        if upload is not None and st.button("🚀 Score in Background", key="score_btn"):
+            os.makedirs(jobs.JOBS_DIR, exist_ok=True)
+            input_path = os.path.join(jobs.JOBS_DIR, upload.file_id + os.path.splitext(upload.name)[1])
+            with open(input_path, "wb") as f:
+                f.write(upload.getbuffer())
+            output_path = os.path.join(jobs.JOBS_DIR, f"{upload.file_id}_predictions.csv")
+            scoring = get_job_manager().submit(f"Score {upload.name}", jobs.score_file, input_path, output_path,
+                                               key=("score", upload.file_id), files=(output_path,),
+                                               delete_input=True)
+            st.session_state["score_job"] = scoring.id
+        if "score_job" in st.session_state:
+            scoring_status(st.session_state["score_job"])
 
 # ================== TAB 4: Data ================== #
 with tabs[3]:
     st.subheader("📋 Student Dataset")
     
     # Load data
-    df = pd.read_csv("outputs/processed_student_data.csv")
-    
-    # Display full dataset
-    st.dataframe(df, use_container_width=True, height=400)
-    
-    # Download button for data
-    csv = df.to_csv(index=False)
-    st.download_button(
-        label="📥 Download Data as CSV",
-        data=csv,
-        file_name="student_performance_data.csv",
-        mime="text/csv"
+    data = get_dataset()
+    index = data.index
+    
+    # Filters (applied server-side; only the visible page is sent to the browser)
+    f_col1, f_col2, f_col3 = st.columns(3)
+    with f_col1:
+        grades = st.multiselect("Grade", index.options("Grade"))
+    with f_col2:
+        risks = st.multiselect("Risk Level", index.options("RiskLevel"))
+    with f_col3:
+        results = st.multiselect("Result", index.options("Result"))
+    
+    f_col4, f_col5 = st.columns(2)
+    with f_col4:
+        attendance_range = st.slider("Attendance range (%)", 0.0, 100.0, (0.0, 100.0), step=1.0)
+    with f_col5:
+        name_query = st.text_input("Search by name")
+    
+    s_col1, s_col2, s_col3 = st.columns(3)
+    with s_col1:
+        sort_by = st.selectbox("Sort by", [None] + list(data.df.columns),
+                               format_func=lambda c: "(file order)" if c is None else c)
+    with s_col2:
+        ascending = st.radio("Order", ["Ascending", "Descending"], horizontal=True) == "Ascending"
+    with s_col3:
+        page_size = st.selectbox("Rows per page", [25, 50, 100, 500], index=2)
+    
+    data_filter = DataFilter(
+        grades=tuple(grades),
+        risks=tuple(risks),
+        results=tuple(results),
+        attendance=tuple(attendance_range),
+        name_query=name_query.strip(),
+        sort_by=sort_by,
+        ascending=ascending,
     )
+    matches = len(data.query(data_filter))
+    pages = max((matches - 1) // page_size + 1, 1)
+    
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+    st.caption(f"{matches:,} of {len(data.df):,} students match · page {page} of {pages}")
+    
+    # Display only the current page
+    st.dataframe(data.page(data_filter, page - 1, page_size), use_container_width=True, height=400)
+    
+    # Download buttons: files are built on click (in chunks) and cached per filter state
+    d_col1, d_col2 = st.columns(2)
+    with d_col1:
+        st.download_button(
+            label="📥 Download Data as CSV",
+            data=functools.partial(data.export, data_filter, "csv"),
+            file_name="student_performance_data.csv",
+            mime="text/csv"
+        )
+    with d_col2:
+        st.download_button(
+            label="📥 Download Data as Parquet",
+            data=functools.partial(data.export, data_filter, "parquet"),
+            file_name="student_performance_data.parquet",
+            mime="application/vnd.apache.parquet"
+        )
     
     # Data Statistics
     st.subheader("📊 Data Statistics")
@@ -208,17 +418,69 @@ with tabs[3]:
     
     with col1:
         st.write("**Numerical Summary:**")
-        st.dataframe(df.describe(), use_container_width=True)
+        st.dataframe(data.describe, use_container_width=True)
     
     with col2:
         st.write("**Risk Level Distribution:**")
-        risk_dist = df["RiskLevel"].value_counts()
+        risk_dist = data.risk_counts
         st.bar_chart(risk_dist)
     
     st.write("**Result Distribution:**")
-    result_dist = df["Result"].value_counts()
+    result_dist = data.result_counts
     st.bar_chart(result_dist)
 
+# ================== TAB 5: Student History ================== #
+with tabs[4]:
+    st.subheader("🧑‍🎓 Student History Across Terms")
+    
+    # Indexed once per store version: lookups are binary searches, not scans
+    term_history = get_history()
+    
+    if term_history is None:
+        st.info("No term history stored yet. Add each term's export with "
+                "`python src/history.py add 2025-T1 data/student_performance.csv`.")
+    else:
+        st.caption(f"{len(term_history.terms)} term(s): {', '.join(term_history.terms)} · "
+                   f"{term_history.students:,} students")
+        
+        roll_no = st.number_input("Roll number", min_value=0, value=int(term_history.rolls[0]), step=1)
+        with instrumentation.timed("dashboard.student_history", rows=1):
+            student_rows = term_history.student(roll_no)
+        
+        if student_rows.empty:
+            st.warning(f"⚠️ No student with RollNo {roll_no}.")
+            st.altair_chart(build_trend_chart(term_history.trend), use_container_width=True)
+        else:
+            latest = student_rows.iloc[-1]
+            previous = student_rows.iloc[-2] if len(student_rows) > 1 else None
+            st.markdown(f"### {latest['Name']} · {latest['Term']}")
+            
+            metric_cols = st.columns(5)
+            for col, measure in zip(metric_cols, ["Maths", "Science", "English", "Attendance", "Percentage"]):
+                delta = None if previous is None else f"{float(latest[measure]) - float(previous[measure]):+.1f}"
+                with col:
+                    st.metric(measure, f"{float(latest[measure]):.1f}", delta)
+            
+            st.altair_chart(build_trend_chart(term_history.trend, student_rows), use_container_width=True)
+            st.dataframe(student_rows.drop(columns=["RollNo", "Name"]), hide_index=True, use_container_width=True)
+        
+        if len(term_history.terms) > 1:
+            st.markdown("### 📉 Biggest Drops Since the Previous Term")
+            d_col1, d_col2, d_col3 = st.columns(3)
+            with d_col1:
+                drop_term = st.selectbox("Term", term_history.terms[:0:-1])
+            with d_col2:
+                drop_measure = st.selectbox("Measure", ["Percentage", "Maths", "Science", "English", "Attendance"])
+            with d_col3:
+                threshold = st.slider("Dropped by more than (points)", 0, 50, 10)
+            
+            with instrumentation.timed("dashboard.term_drops") as s:
+                drops = term_history.drops(threshold, drop_term, drop_measure)
+                s.rows = len(drops)
+            st.caption(f"{len(drops):,} students lost more than {threshold} {drop_measure} points "
+                       f"from {term_history.previous_term(drop_term)} to {drop_term}")
+            st.dataframe(drops.head(500), hide_index=True, use_container_width=True)
+
 # ================== FOOTER ================== #
 st.markdown("---")
 st.markdown("""
@@ -231,3 +493,25 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# ================== Diagnostics (hidden: open the app with ?diagnostics=1) ================== #
+if st.query_params.get("diagnostics") == "1":
+    with st.expander("🩺 Diagnostics: recent stage timings", expanded=True):
+        st.caption(f"Stage records from every script and dashboard process "
+                   f"({instrumentation.METRICS_DIR}/{instrumentation.STAGES_FILE}), newest first.")
+        instrumentation.flush()
+        records = instrumentation.read_recent() or instrumentation.recent()
+        if records:
+            timings = pd.DataFrame(records).iloc[::-1]
+            st.dataframe(timings, hide_index=True, use_container_width=True)
+            slowest = timings.groupby("stage")["wall_seconds"].agg(["count", "mean", "max"])
+            st.markdown("**Per stage (seconds)**")
+            st.dataframe(slowest.sort_values("max", ascending=False), use_container_width=True)
+            st.code(instrumentation.prometheus_text(), language="text")
+        else:
+            st.info("No stage timings recorded yet.")
+        # Per-interaction timers (predictions, history lookups) stay in this process's memory
+        interactions = [r for r in instrumentation.recent() if "cpu_seconds" not in r]
+        if interactions:
+            st.markdown("**Interactions in this dashboard process (seconds)**")
+            st.dataframe(pd.DataFrame(interactions).groupby("stage")["wall_seconds"].agg(["count", "mean", "max"]),
+                         use_container_width=True)
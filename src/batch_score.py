@@ -0,0 +1,115 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import model_registry
+import schema
+from data_preprocessing import validate
+from risk_pipeline import RAW_FEATURES, add_derived_features
+
+ID_COLUMNS = ["RollNo", "Name"]
+
+# ---------------- Input ---------------- #
+
+def read_batches(path, batch_size):
+    """Yield DataFrames of at most batch_size rows from a CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield schema.conform(batch.to_pandas())
+    else:
+        yield from schema.read_csv(path, chunksize=batch_size)
+
+# ---------------- Scoring ---------------- #
+
+def score_batch(df, bundle):
+    df, _ = validate(df)  # out-of-range marks are clipped, as in preprocessing
+    pipeline = bundle["pipeline"]
+    X = df[RAW_FEATURES].astype("float64")
+
+    # Rows with missing marks cannot be scored; they keep empty predictions
+    valid = X.notna().all(axis=1).to_numpy()
+    classes = pipeline.classes_
+
+    probabilities = np.full((len(df), len(classes)), np.nan)
+    if valid.any():
+        probabilities[valid] = pipeline.predict_proba(X[valid])
+
+    out = df[[c for c in ID_COLUMNS if c in df.columns]].copy()
+    derived = add_derived_features(X)
+    out["Percentage"] = derived["Percentage"]
+    out["AttendanceImpact"] = derived["AttendanceImpact"]
+    predicted = np.where(valid, classes[np.nan_to_num(probabilities).argmax(axis=1)], None)
+    out["PredictedRisk"] = pd.Categorical(predicted, categories=classes)
+    for i, class_name in enumerate(classes):
+        out[f"P({class_name})"] = probabilities[:, i]
+    return out
+
+
+def score_file(input_path, output_path, batch_size=100_000, bundle=None, progress=None):
+    """Score every row of input_path and write predictions to output_path.
+
+    Returns (rows, seconds). Output format follows the output file extension.
+    `progress`, if given, is called with the rows scored so far after each batch.
+    """
+    bundle = bundle or model_registry.load_or_train()
+    parquet_writer = None
+    parquet_schema = None
+    rows = 0
+    start = time.perf_counter()
+
+    try:
+        for i, batch in enumerate(read_batches(input_path, batch_size)):
+            scored = score_batch(batch, bundle)
+            if output_path.endswith(".parquet"):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(scored, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_schema = table.schema
+                    parquet_writer = pq.ParquetWriter(output_path, parquet_schema)
+                parquet_writer.write_table(table.cast(parquet_schema))
+            else:
+                scored.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(scored)
+            if progress is not None:
+                progress(rows)
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+    return rows, time.perf_counter() - start
+
+# ---------------- Main ---------------- #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a whole cohort file with the persisted risk model.")
+    parser.add_argument("input", help="CSV or Parquet file with Maths, Science, English, Attendance")
+    parser.add_argument("output", help="Where to write predictions (.csv or .parquet)")
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--model", help="Saved model bundle (default: registry model for the current dataset)")
+    parser.add_argument("--jobs", type=int, default=-1, help="Cores used by the classifier (-1 = all)")
+    args = parser.parse_args(argv)
+
+    if args.model:
+        bundle = model_registry.load_model(args.model)
+    else:
+        bundle = model_registry.load_or_train()
+    classifier = bundle["pipeline"].named_steps["model"]
+    if "n_jobs" in classifier.get_params():
+        classifier.set_params(n_jobs=args.jobs)
+    print(f"\n✅ Risk model loaded (dataset version {bundle['data_hash']})")
+
+    rows, seconds = score_file(args.input, args.output, args.batch_size, bundle)
+
+    print(f"\n🚀 Scored {rows:,} rows in {seconds:.2f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+    print(f"📂 Predictions saved at: {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import model_registry
+from risk_pipeline import RAW_FEATURES
+
+LEAF = -1           # sklearn's TREE_LEAF marker in children_left/right
+CHUNK_ROWS = 1024   # rows traversed at once: keeps the (row, tree) working set in cache
+
+# ---------------- Flattened Forest ---------------- #
+
+class CompiledForest:
+    """A fitted risk pipeline as flat NumPy arrays, for low-latency predict_proba.
+
+    Every tree's nodes are concatenated into one set of arrays (children
+    re-indexed into the shared arrays, leaves marked LEAF), and `roots` holds
+    each tree's first node. Prediction derives the features and scales them
+    with the pipeline's fitted statistics, casts to float32 as sklearn's trees
+    do, and walks all (row, tree) pairs one level at a time, dropping pairs as
+    they reach a leaf. Leaf class fractions are summed in tree order and
+    divided by the number of trees, so the result equals the estimator's
+    predict_proba bit for bit.
+    """
+
+    def __init__(self, classes, roots, feature, threshold, children, missing_left, value,
+                 mean=None, scale=None, derive=False):
+        self.classes = classes
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children        # (nodes, 2): left and right child
+        self.missing_left = missing_left
+        self.value = value              # (nodes, classes) class fractions of each node
+        self.mean = mean                # StandardScaler statistics (None: no scaling)
+        self.scale = scale
+        self.derive = derive            # inputs are RAW_FEATURES, Percentage/AttendanceImpact derived here
+
+    @property
+    def nodes(self):
+        return len(self.feature)
+
+    def _features(self, X):
+        X = np.asarray(X, dtype="float64")
+        if X.ndim == 1:
+            X = X[None, :]
+        if self.derive:
+            # Same formulas (and summation order) as risk_pipeline.add_derived_features,
+            # whose pandas sum skips missing marks
+            subjects = np.where(np.isnan(X[:, :3]), 0.0, X[:, :3])
+            percentage = (subjects[:, 0] + subjects[:, 1] + subjects[:, 2]) / 300 * 100
+            X = np.column_stack([X, percentage, X[:, 3] * 0.3 + percentage * 0.7])
+        if self.mean is not None:
+            X = (X - self.mean) / self.scale
+        return X.astype("float32")
+
+    def leaves(self, X):
+        """Leaf reached in every tree, shape (rows, trees), for already-derived float32 features."""
+        trees, width = len(self.roots), X.shape[1]
+        nodes = np.tile(self.roots, len(X))
+        offsets = np.repeat(np.arange(len(X)) * width, trees)  # row starts in the flattened X
+        X = X.ravel()
+        missing = np.isnan(X).any()
+        active = np.flatnonzero(self.children[nodes, 0] != LEAF)
+        while active.size:
+            node = nodes[active]
+            x = X[offsets[active] + self.feature[node]]
+            go_left = x <= self.threshold[node]
+            if missing:
+                go_left |= np.isnan(x) & self.missing_left[node]
+            node = self.children[node, (~go_left).view(np.int8)]
+            nodes[active] = node
+            active = active[self.children[node, 0] != LEAF]
+        return nodes.reshape(-1, trees)
+
+    def predict_proba(self, X):
+        """Class probabilities for rows of X (RAW_FEATURES order), like the pipeline's predict_proba."""
+        X = self._features(X)
+        probabilities = np.empty((len(X), len(self.classes)))
+        for start in range(0, len(X), CHUNK_ROWS):
+            leaves = self.leaves(X[start:start + CHUNK_ROWS])
+            # (trees, rows, classes) summed over the first axis: one tree after
+            # another, the order in which the forest accumulates them
+            probabilities[start:start + CHUNK_ROWS] = self.value[leaves.T].sum(axis=0) / len(self.roots)
+        return probabilities
+
+    def predict(self, X):
+        return self.classes[self.predict_proba(X).argmax(axis=1)]
+
+
+def compile_model(model):
+    """CompiledForest of a fitted risk pipeline (make_pipeline), forest or single tree."""
+    mean = scale = None
+    derive = False
+    steps = getattr(model, "named_steps", None)
+    if steps is not None:
+        derive = "features" in steps
+        scaler = steps.get("scale")
+        if scaler is not None:
+            n = scaler.n_features_in_
+            mean = scaler.mean_ if scaler.with_mean else np.zeros(n)
+            scale = scaler.scale_ if scaler.with_std else np.ones(n)
+        model = steps["model"]
+
+    estimators = getattr(model, "estimators_", [model])
+    if not all(hasattr(e, "tree_") for e in estimators):
+        raise TypeError(f"{type(model).__name__} is not a tree ensemble: nothing to compile")
+    if estimators[0].n_outputs_ != 1:
+        raise ValueError("only single-output classifiers can be compiled")
+
+    roots, feature, threshold, left, right, missing_left, value = [], [], [], [], [], [], []
+    offset = 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        leaf = tree.children_left == LEAF
+        roots.append(offset)
+        feature.append(tree.feature)
+        threshold.append(tree.threshold)
+        left.append(np.where(leaf, LEAF, tree.children_left + offset))
+        right.append(np.where(leaf, LEAF, tree.children_right + offset))
+        missing_left.append(tree.missing_go_to_left.astype(bool))
+        value.append(tree.value[:, 0, :len(model.classes_)])
+        offset += tree.node_count
+
+    return CompiledForest(
+        classes=np.asarray(model.classes_),
+        roots=np.array(roots, dtype=np.intp),
+        feature=np.concatenate(feature).astype(np.intp),
+        threshold=np.concatenate(threshold),
+        children=np.column_stack([np.concatenate(left), np.concatenate(right)]).astype(np.intp),
+        missing_left=np.concatenate(missing_left),
+        value=np.ascontiguousarray(np.concatenate(value), dtype="float64"),
+        mean=mean,
+        scale=scale,
+        derive=derive,
+    )
+
+# ---------------- Verification ---------------- #
+
+def verify(forest, pipeline, samples=2000, seed=42):
+    """Compare the compiled forest with the pipeline's own predict_proba on random inputs."""
+    rng = np.random.default_rng(seed)
+    points = {
+        "integer": rng.integers(0, 101, size=(samples, 4)).astype("float64"),
+        "fractional": rng.uniform(0, 100, size=(samples, 4)),
+    }
+    report = {}
+    for name, X in points.items():
+        expected = pipeline.predict_proba(pd.DataFrame(X, columns=RAW_FEATURES))
+        actual = forest.predict_proba(X)
+        report[name] = {
+            "identical": bool(np.array_equal(expected, actual)),
+            "max_abs_diff": float(np.abs(expected - actual).max()),
+        }
+    return report
+
+# ---------------- Main ---------------- #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile the risk model into flat arrays and check it against sklearn.")
+    parser.add_argument("--samples", type=int, default=2000, help="Random inputs checked against the pipeline")
+    args = parser.parse_args(argv)
+
+    bundle = model_registry.load_or_train()
+    start = time.perf_counter()
+    forest = compile_model(bundle["pipeline"])
+    print(f"\n✅ {len(forest.roots)} trees, {forest.nodes:,} nodes compiled in "
+          f"{(time.perf_counter() - start) * 1000:.1f}ms")
+
+    for name, r in verify(forest, bundle["pipeline"], args.samples).items():
+        status = "identical" if r["identical"] else f"max |Δp| = {r['max_abs_diff']:.2e}"
+        print(f"🔍 {name:<10} inputs: {status}")
+
+    point = [70, 70, 70, 80]
+    start = time.perf_counter()
+    for _ in range(200):
+        forest.predict_proba(point)
+    compiled = (time.perf_counter() - start) / 200
+    start = time.perf_counter()
+    bundle["pipeline"].predict_proba(pd.DataFrame([point], columns=RAW_FEATURES))
+    live = time.perf_counter() - start
+    print(f"⏱ Single prediction: compiled {compiled * 1e6:.0f}µs vs sklearn pipeline {live * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
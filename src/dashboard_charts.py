@@ -0,0 +1,252 @@
+import numpy as np
+import pandas as pd
+
+from aggregates import AggregateStore
+
+SUBJECTS = ["Maths", "Science", "English"]
+SUBJECT_COLORS = ["#FF6B6B", "#4ECDC4", "#45B7D1"]
+MAX_PER_STUDENT = 50  # same switch-over point as analysis.py --max-students
+TOP_N = 10
+BIN_WIDTH = 5
+
+# ---------------- Pre-aggregated Tables ---------------- #
+
+def _histogram(values, name):
+    counts, edges = np.histogram(values, bins=np.arange(0, 100 + BIN_WIDTH, BIN_WIDTH))
+    return pd.DataFrame({name: edges[:-1], "end": edges[1:], "Students": counts})
+
+
+def chart_tables(df, summary=None):
+    """Everything the ten dashboard charts need, as small tables.
+
+    Per-student tables are only used for small cohorts; larger cohorts get
+    histograms, 2D bins and top/bottom-N rows, so the payload stays bounded.
+    Means, correlations and pass counts come from `summary`
+    (AggregateStore.chart_summary) when the caller already has it for these rows.
+    """
+    df = df.assign(Average=df["Total"] / 3)
+    per_student = len(df) <= MAX_PER_STUDENT
+    tables = {"per_student": per_student, "students": len(df)}
+
+    if summary is None:
+        summary = AggregateStore.from_frame(df).chart_summary()
+
+    tables["subject_means"] = summary["subject_means"].rename_axis("Subject").reset_index(name="Average")
+    # Missing results are left out, as in the aggregate store's label counts
+    result_counts = df["Result"].value_counts()
+    tables["result_counts"] = (result_counts[result_counts > 0].rename_axis("Result")
+                               .reset_index(name="Students").astype({"Result": str}))
+    tables["result_avg"] = summary["result_avg"].rename_axis("Result").reset_index(name="Average")
+    tables["correlation"] = (summary["correlation"].rename_axis("x").reset_index()
+                             .melt(id_vars="x", var_name="y", value_name="r"))
+
+    quartiles = df[SUBJECTS].quantile([0, 0.25, 0.5, 0.75, 1]).T
+    quartiles.columns = ["min", "q1", "median", "q3", "max"]
+    tables["subject_box"] = quartiles.rename_axis("Subject").reset_index()
+
+    tables["stats"] = {
+        "Total Students": f"{len(df):,}",
+        "Pass": f"{summary['pass']:,}",
+        "Fail": f"{summary['fail']:,}",
+        "Average Marks": f"{summary['average_mean']:.2f}",
+        "Highest Score": f"{summary['average_max']:.2f}",
+        "Lowest Score": f"{summary['average_min']:.2f}",
+        "Avg Attendance": f"{summary['attendance_mean']:.2f}%",
+    }
+
+    if per_student:
+        students = df[["Name", "Average", "Attendance", "Total"] + SUBJECTS].reset_index(drop=True)
+        tables["average"] = students
+        tables["scatter"] = students
+        tables["subjects"] = students.melt(id_vars="Name", value_vars=SUBJECTS, var_name="Subject", value_name="Marks")
+        tables["attendance"] = students
+        tables["total"] = students
+    else:
+        ranked = df.nlargest(TOP_N, "Average")
+        worst = df.nsmallest(TOP_N, "Average")
+        tables["average"] = pd.concat([ranked.assign(Group="Top"), worst.assign(Group="Bottom")])[
+            ["Name", "Average", "Group"]]
+        ranked = df.nlargest(TOP_N, "Total")
+        worst = df.nsmallest(TOP_N, "Total")
+        tables["total"] = pd.concat([ranked.assign(Group="Top"), worst.assign(Group="Bottom")])[
+            ["Name", "Total", "Group"]]
+
+        counts, xedges, yedges = np.histogram2d(
+            df["Attendance"], df["Average"], bins=20, range=[[0, 100], [0, 100]])
+        x, y = np.meshgrid(xedges[:-1], yedges[:-1], indexing="ij")
+        scatter = pd.DataFrame({"Attendance": x.ravel(), "Average": y.ravel(), "Students": counts.ravel()})
+        tables["scatter"] = scatter[scatter["Students"] > 0]
+
+        tables["subjects"] = pd.concat(
+            [_histogram(df[s], "Marks").assign(Subject=s) for s in SUBJECTS], ignore_index=True)
+        tables["attendance"] = _histogram(df["Attendance"], "Attendance")
+
+    return tables
+
+# ---------------- Vega-Lite Charts ---------------- #
+
+# Imported on the first build_charts() call: the tables above need only pandas
+alt = None
+
+
+def _subject_scale():
+    return alt.Scale(domain=SUBJECTS, range=SUBJECT_COLORS)
+
+
+def build_charts(t):
+    """Ten Altair charts mirroring analysis.py, keyed by the chart file stem."""
+    global alt
+    if alt is None:
+        import altair as alt
+
+    n = t["students"]
+    charts = {}
+
+    if t["per_student"]:
+        charts["01_average_performance"] = alt.Chart(t["average"], title="Student Average Performance").mark_bar(
+            color="skyblue", stroke="navy").encode(
+            x=alt.X("Name:N", sort=None, title="Students"),
+            y=alt.Y("Average:Q", scale=alt.Scale(domain=[0, 100]), title="Average Marks"),
+            tooltip=["Name", alt.Tooltip("Average:Q", format=".1f")])
+    else:
+        charts["01_average_performance"] = alt.Chart(
+            t["average"], title=f"Top & Bottom {TOP_N} Students by Average ({n:,} students)").mark_bar(
+            stroke="navy").encode(
+            x=alt.X("Name:N", sort="-y", title="Students"),
+            y=alt.Y("Average:Q", scale=alt.Scale(domain=[0, 100]), title="Average Marks"),
+            color=alt.Color("Group:N", scale=alt.Scale(domain=["Top", "Bottom"], range=["skyblue", "#E74C3C"])),
+            tooltip=["Name", alt.Tooltip("Average:Q", format=".1f")])
+
+    charts["02_subject_wise_performance"] = alt.Chart(
+        t["subject_means"], title="Subject-wise Average Performance").mark_bar(stroke="black").encode(
+        x=alt.X("Subject:N", sort=SUBJECTS),
+        y=alt.Y("Average:Q", scale=alt.Scale(domain=[0, 100]), title="Average Marks"),
+        color=alt.Color("Subject:N", scale=_subject_scale(), legend=None),
+        tooltip=["Subject", alt.Tooltip("Average:Q", format=".1f")])
+
+    if t["per_student"]:
+        points = alt.Chart(t["scatter"], title="Attendance vs Average Performance").mark_circle(
+            size=200, opacity=0.6, stroke="black").encode(
+            x=alt.X("Attendance:Q", title="Attendance (%)"),
+            y=alt.Y("Average:Q", title="Average Marks"),
+            color=alt.Color("Average:Q", scale=alt.Scale(scheme="viridis")),
+            tooltip=["Name", "Attendance", alt.Tooltip("Average:Q", format=".1f")])
+        charts["03_attendance_vs_performance"] = points + points.mark_text(align="left", dx=8).encode(text="Name")
+    else:
+        charts["03_attendance_vs_performance"] = alt.Chart(
+            t["scatter"], title=f"Attendance vs Average Performance ({n:,} students)").mark_rect().encode(
+            x=alt.X("Attendance:Q", bin=alt.Bin(step=5), title="Attendance (%)"),
+            y=alt.Y("Average:Q", bin=alt.Bin(step=5), title="Average Marks"),
+            color=alt.Color("Students:Q", scale=alt.Scale(scheme="viridis")),
+            tooltip=["Attendance", "Average", "Students"])
+
+    charts["04_result_distribution"] = alt.Chart(
+        t["result_counts"], title="Result Distribution (Pass/Fail)").mark_arc().encode(
+        theta="Students:Q",
+        color=alt.Color("Result:N", scale=alt.Scale(range=["#2ECC71", "#E74C3C", "#95A5A6"])),
+        tooltip=["Result", "Students"])
+
+    if t["per_student"]:
+        charts["05_subject_by_student"] = alt.Chart(
+            t["subjects"], title="Subject-wise Performance by Student").mark_bar().encode(
+            x=alt.X("Name:N", sort=None, title="Students"),
+            xOffset=alt.XOffset("Subject:N", sort=SUBJECTS),
+            y=alt.Y("Marks:Q", scale=alt.Scale(domain=[0, 105])),
+            color=alt.Color("Subject:N", scale=_subject_scale()),
+            tooltip=["Name", "Subject", "Marks"])
+    else:
+        charts["05_subject_by_student"] = alt.Chart(
+            t["subjects"], title=f"Subject-wise Mark Distribution ({n:,} students)").mark_line(
+            interpolate="step-after", strokeWidth=2.5).encode(
+            x=alt.X("Marks:Q", title="Marks"),
+            y=alt.Y("Students:Q"),
+            color=alt.Color("Subject:N", scale=_subject_scale()),
+            tooltip=["Subject", "Marks", "Students"])
+
+    threshold = alt.Chart(pd.DataFrame({"min": [75]}))
+    if t["per_student"]:
+        bars = alt.Chart(t["attendance"], title="Student Attendance Distribution").mark_bar(
+            color="#9B59B6", stroke="black").encode(
+            x=alt.X("Name:N", sort=None, title="Students"),
+            y=alt.Y("Attendance:Q", scale=alt.Scale(domain=[0, 105]), title="Attendance (%)"),
+            tooltip=["Name", "Attendance"])
+        charts["06_attendance_distribution"] = bars + threshold.mark_rule(color="red", strokeDash=[6, 4]).encode(y="min:Q")
+    else:
+        bars = alt.Chart(t["attendance"], title=f"Student Attendance Distribution ({n:,} students)").mark_bar(
+            color="#9B59B6", stroke="black").encode(
+            x=alt.X("Attendance:Q", bin="binned", title="Attendance (%)"), x2="end:Q",
+            y=alt.Y("Students:Q"),
+            tooltip=["Attendance", "Students"])
+        charts["06_attendance_distribution"] = bars + threshold.mark_rule(color="red", strokeDash=[6, 4]).encode(x="min:Q")
+
+    heat = alt.Chart(t["correlation"], title="Correlation Heatmap").encode(
+        x=alt.X("x:N", sort=None, title=None), y=alt.Y("y:N", sort=None, title=None))
+    charts["07_correlation_heatmap"] = heat.mark_rect().encode(
+        color=alt.Color("r:Q", scale=alt.Scale(scheme="redblue", domain=[-1, 1], reverse=True)),
+        tooltip=["x", "y", alt.Tooltip("r:Q", format=".2f")],
+    ) + heat.mark_text().encode(text=alt.Text("r:Q", format=".2f"))
+
+    box = alt.Chart(t["subject_box"], title="Subject Score Distribution (Box Plot)").encode(
+        x=alt.X("Subject:N", sort=SUBJECTS))
+    charts["08_subject_boxplot"] = alt.layer(
+        box.mark_rule().encode(y=alt.Y("min:Q", title="Marks"), y2="max:Q"),
+        box.mark_bar(size=40, stroke="black").encode(
+            y="q1:Q", y2="q3:Q", color=alt.Color("Subject:N", scale=_subject_scale(), legend=None),
+            tooltip=["Subject", "min", "q1", "median", "q3", "max"]),
+        box.mark_tick(color="black", size=40).encode(y="median:Q"),
+    )
+
+    title = "Student Total Marks Distribution" if t["per_student"] else \
+        f"Top & Bottom {TOP_N} Students by Total Marks ({n:,} students)"
+    charts["09_total_marks"] = alt.Chart(t["total"], title=title).mark_bar(
+        color="#F39C12", stroke="black").encode(
+        y=alt.Y("Name:N", sort="-x" if not t["per_student"] else None, title=None),
+        x=alt.X("Total:Q", scale=alt.Scale(domain=[0, 310]), title="Total Marks"),
+        tooltip=["Name", "Total"])
+
+    # Chart 10: summary panel
+    result_avg = alt.Chart(t["result_avg"], title="Average Performance by Result").mark_bar(stroke="black").encode(
+        x="Result:N", y=alt.Y("Average:Q", title="Average Marks"),
+        color=alt.Color("Result:N", scale=alt.Scale(range=["#2ECC71", "#E74C3C", "#95A5A6"]), legend=None),
+        tooltip=["Result", alt.Tooltip("Average:Q", format=".1f")])
+    stats = pd.DataFrame({"line": [f"{k}: {v}" for k, v in t["stats"].items()]}).reset_index()
+    stats_text = alt.Chart(stats, title="Performance Statistics").mark_text(
+        align="left", font="monospace", fontSize=13).encode(
+        y=alt.Y("index:O", axis=None), text="line:N")
+    charts["10_performance_summary"] = alt.vconcat(
+        alt.hconcat(result_avg.properties(width=250), charts["06_attendance_distribution"].properties(width=250)),
+        alt.hconcat(stats_text.properties(width=250), charts["02_subject_wise_performance"].properties(width=250)),
+    )
+
+    return charts
+
+
+def build_trend_chart(trend, student=None):
+    """Marks per term: the cohort averages, with one student's marks on top when given.
+
+    `trend` is TermHistory.trend (per-term means); `student` a student's rows
+    from TermHistory.student.
+    """
+    global alt
+    if alt is None:
+        import altair as alt
+
+    measures = SUBJECTS + ["Percentage"]
+    terms = list(trend.index)
+    lines = [trend[measures].rename_axis("Term").reset_index()
+             .melt(id_vars="Term", var_name="Measure", value_name="Marks").assign(Source="Cohort average")]
+    if student is not None:
+        lines.append(student[["Term"] + measures].astype({"Term": str})
+                     .melt(id_vars="Term", var_name="Measure", value_name="Marks").assign(Source=student["Name"].iloc[-1]))
+    table = pd.concat(lines, ignore_index=True).astype({"Term": str})
+    sources = list(table["Source"].unique()[::-1])  # the student (solid) first, then the cohort
+
+    title = "Term-over-term Trend" if student is None else f"{student['Name'].iloc[-1]} vs Cohort Average"
+    colors = alt.Scale(domain=measures, range=SUBJECT_COLORS + ["#2C3E50"])
+    return alt.Chart(table, title=title).mark_line(point=True).encode(
+        x=alt.X("Term:N", sort=terms),
+        y=alt.Y("Marks:Q", scale=alt.Scale(domain=[0, 100]), title="Marks / Percentage"),
+        color=alt.Color("Measure:N", scale=colors, sort=measures),
+        strokeDash=alt.StrokeDash("Source:N", title=None,
+                                  scale=alt.Scale(domain=sources, range=[[1, 0], [4, 3]][:len(sources)])),
+        tooltip=["Term", "Source", "Measure", alt.Tooltip("Marks:Q", format=".1f")])
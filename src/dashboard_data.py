@@ -0,0 +1,270 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import aggregates
+import history
+from dashboard_charts import chart_tables
+from instrumentation import stage
+from storage import PROCESSED_CSV, load_processed
+
+# Upper bound for all cached dataset versions together (least recently used
+# versions are dropped first); override with SPA_DATA_CACHE_MB.
+MAX_CACHE_BYTES = int(os.environ.get("SPA_DATA_CACHE_MB", "1024")) * 2**20
+
+FILTER_COLUMNS = ["Grade", "RiskLevel", "Result"]
+QUERY_CACHE_SIZE = 32   # filter states remembered per dataset version
+EXPORT_CACHE_SIZE = 4   # exported files remembered per dataset version
+EXPORT_CHUNK_ROWS = 100_000
+
+# ---------------- Server-side Filtering ---------------- #
+
+@dataclass(frozen=True)
+class DataFilter:
+    """Data tab filter/sort state (hashable, used as a cache key)."""
+    grades: tuple = ()
+    risks: tuple = ()
+    results: tuple = ()
+    attendance: tuple = (0.0, 100.0)
+    name_query: str = ""
+    sort_by: str = None
+    ascending: bool = True
+
+
+class DataIndex:
+    """Lookup structures built once per dataset version.
+
+    Category codes answer Grade/RiskLevel/Result filters, a sorted attendance
+    array answers range filters with binary search, and full-table sort
+    permutations (computed on first use) give sorted results of any filter
+    with a single gather instead of a re-sort.
+    """
+
+    def __init__(self, df):
+        self.n = len(df)
+        self.categoricals = {col: pd.Categorical(df[col]) for col in FILTER_COLUMNS}
+        attendance = df["Attendance"].to_numpy(dtype="float64")
+        self.attendance_order = np.argsort(attendance, kind="stable")
+        self.attendance_sorted = attendance[self.attendance_order]
+        self.names = df["Name"].astype(str).str.lower().reset_index(drop=True)
+        self._df = df
+        self._sort_orders = {}
+
+    def options(self, column):
+        return list(self.categoricals[column].categories)
+
+    def sort_order(self, column, ascending):
+        key = (column, ascending)
+        if key not in self._sort_orders:
+            # Categories sort in their declared order; missing values go last either way
+            values = self._df[column].reset_index(drop=True)
+            order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index
+            self._sort_orders[key] = order.to_numpy()
+        return self._sort_orders[key]
+
+    def query(self, f):
+        """Row positions matching the filter, in the requested order."""
+        mask = np.ones(self.n, dtype=bool)
+
+        for column, selected in zip(FILTER_COLUMNS, (f.grades, f.risks, f.results)):
+            if selected:
+                cat = self.categoricals[column]
+                mask &= np.isin(cat.codes, cat.categories.get_indexer(list(selected)))
+
+        # Attendance is clipped to 0–100 by preprocessing, so that range is "no filter"
+        low, high = f.attendance
+        if (low, high) != (0.0, 100.0):
+            start = np.searchsorted(self.attendance_sorted, low, side="left")
+            stop = np.searchsorted(self.attendance_sorted, high, side="right")
+            in_range = np.zeros(self.n, dtype=bool)
+            in_range[self.attendance_order[start:stop]] = True
+            mask &= in_range
+
+        if f.name_query:
+            mask &= self.names.str.contains(f.name_query.lower(), regex=False).to_numpy()
+
+        if f.sort_by:
+            order = self.sort_order(f.sort_by, f.ascending)
+            return order[mask[order]]
+        return np.flatnonzero(mask)
+
+
+class _LRU:
+    def __init__(self, size):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+            value = compute()
+            self._items[key] = value
+            if len(self._items) > self.size:
+                self._items.popitem(last=False)
+            return value
+
+# ---------------- Dataset Snapshot ---------------- #
+
+@dataclass(frozen=True)
+class DatasetView:
+    """One version of the processed dataset plus its precomputed summaries.
+
+    Shared by every tab and session: treat `df` as read-only (pandas
+    copy-on-write turns accidental writes into private copies).
+    """
+    version: tuple
+    df: pd.DataFrame
+    metrics: dict
+    describe: pd.DataFrame
+    risk_counts: pd.Series
+    result_counts: pd.Series
+    nbytes: int
+    index: DataIndex
+    aggregates: aggregates.AggregateStore
+    _queries: _LRU = field(default_factory=lambda: _LRU(QUERY_CACHE_SIZE), repr=False)
+    _exports: _LRU = field(default_factory=lambda: _LRU(EXPORT_CACHE_SIZE), repr=False)
+    _charts: _LRU = field(default_factory=lambda: _LRU(QUERY_CACHE_SIZE), repr=False)
+
+    def query(self, f):
+        def compute():
+            with stage("dashboard.query", rows=self.index.n):
+                return self.index.query(f)
+        return self._queries.get_or_compute(f, compute)
+
+    def page(self, f, page, page_size):
+        """Only the rows visible on one page of the filtered result."""
+        rows = self.query(f)
+        start = page * page_size
+        return self.df.iloc[rows[start:start + page_size]]
+
+    def export(self, f, fmt="csv"):
+        """Filtered rows as CSV/Parquet bytes, written chunk by chunk and cached."""
+        return self._exports.get_or_compute((f, fmt), lambda: _export(self.df, self.query(f), fmt))
+
+    def chart_tables(self, f):
+        """Pre-aggregated tables behind the live charts, computed once per filter."""
+        # The unfiltered view reads its means/correlations straight from the aggregate store
+        summary = self.aggregates.chart_summary() if f == DataFilter() else None
+
+        def compute():
+            rows = self.df.iloc[self.query(f)]
+            with stage("dashboard.chart_tables", rows=len(rows)):
+                return chart_tables(rows, summary)
+        return self._charts.get_or_compute(f, compute)
+
+
+def dataset_version(path=PROCESSED_CSV):
+    """Cheap file version key: (mtime, size) of the CSV and its Parquet copy."""
+    version = [path]
+    for candidate in (path, os.path.splitext(path)[0] + ".parquet"):
+        if os.path.exists(candidate):
+            stat = os.stat(candidate)
+            version += [stat.st_mtime_ns, stat.st_size]
+    return tuple(version)
+
+
+def build_view(path, version):
+    with stage("dashboard.load_dataset", memory=True) as s:
+        df = load_processed(csv_path=path, parquet_path=os.path.splitext(path)[0] + ".parquet")
+        s.rows = len(df)
+    # Summaries come from the incremental aggregate store (rebuilt from df if stale)
+    with stage("dashboard.summaries", rows=len(df), memory=True):
+        store = aggregates.load_or_build(path, df=df) if os.path.exists(path) else \
+            aggregates.AggregateStore.from_frame(df)
+    with stage("dashboard.index", rows=len(df), memory=True):
+        index = DataIndex(df)
+    return DatasetView(
+        version=version,
+        df=df,
+        metrics=store.metrics(),
+        describe=store.describe(),
+        risk_counts=store.counts("RiskLevel"),
+        result_counts=store.counts("Result"),
+        nbytes=int(df.memory_usage(deep=True).sum()),
+        index=index,
+        aggregates=store,
+    )
+
+
+def _export(df, rows, fmt):
+    buffer = io.BytesIO()
+    chunks = [rows[i:i + EXPORT_CHUNK_ROWS] for i in range(0, len(rows), EXPORT_CHUNK_ROWS)] or [rows]
+
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        for chunk in chunks:
+            table = pa.Table.from_pandas(df.iloc[chunk], preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                writer = pq.ParquetWriter(buffer, schema)
+            writer.write_table(table.cast(schema))
+        writer.close()
+    else:
+        for i, chunk in enumerate(chunks):
+            df.iloc[chunk].to_csv(buffer, header=i == 0, index=False, encoding="utf-8")
+
+    return buffer.getvalue()
+
+# ---------------- Shared LRU Cache ---------------- #
+
+class DatasetCache:
+    """Process-wide LRU of DatasetViews bounded by total frame memory."""
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return sum(view.nbytes for view in self._views.values())
+
+    def get(self, path, version):
+        with self._lock:
+            view = self._views.get(version)
+            if view is not None:
+                self._views.move_to_end(version)
+                return view
+
+            # Load under the lock so concurrent sessions never load the same version twice
+            view = build_view(path, version)
+            self._views[version] = view
+            # Evict the oldest versions, but always keep the one just loaded
+            while len(self._views) > 1 and self.nbytes > self.max_bytes:
+                self._views.popitem(last=False)
+            return view
+
+
+@st.cache_resource
+def _shared_cache():
+    return DatasetCache()
+
+
+def get_dataset(path=PROCESSED_CSV):
+    """Processed dataset for the current file version, loaded once per process."""
+    return _shared_cache().get(path, dataset_version(path))
+
+
+# ---------------- Term History ---------------- #
+
+@st.cache_resource(max_entries=2)
+def _history(version):
+    return history.load(version[0])
+
+
+def get_history(directory=history.HISTORY_DIR):
+    """Indexed term history for the current store version (None when no term is stored)."""
+    version = history.store_version(directory)
+    return None if version is None else _history(version)
@@ -1,68 +1,235 @@
+import argparse
+import contextlib
+import os
+
+import numpy as np
 import pandas as pd
 
-# Load dataset
-df = pd.read_csv("data/student_performance.csv")
+import aggregates
+import schema
+import storage
+from instrumentation import stage
+from grading import DEFAULT_CONFIG, classify
+from paths import RAW_CSV
+
+INPUT_PATH = RAW_CSV
+OUTPUT_PATH = storage.PROCESSED_CSV
 
-print("\n✅ Dataset Loaded Successfully")
+subjects = schema.SUBJECTS
 
 # ---------------- Data Cleaning ---------------- #
 
-# Check missing values
-if df.isnull().sum().sum() > 0:
-    print("⚠ Missing values detected. Filling with column mean.")
-    df.fillna(df.mean(numeric_only=True), inplace=True)
+def validate(df, fill_values=None):
+    """Fill missing marks, clip marks/attendance to 0–100; returns (df, ValidationReport)."""
+    # Fill missing values with the (dataset-wide) column mean
+    if fill_values is not None and len(fill_values) > 0:
+        df = df.fillna(fill_values)
 
-# Validate marks range (0–100)
-subjects = ["Maths", "Science", "English"]
-for col in subjects:
-    df[col] = df[col].clip(0, 100)
+    # Validate marks and attendance range (0–100), all columns at once
+    return schema.validate(df)
 
-# Attendance validation
-df["Attendance"] = df["Attendance"].clip(0, 100)
 
-print("✅ Data Validation Completed")
+def report_invalid(report):
+    if len(report.rows):
+        print(f"⚠ {report.summary()}")
 
 # ---------------- Feature Engineering ---------------- #
 
-# Total and Percentage
-df["Total"] = df[subjects].sum(axis=1)
-df["Percentage"] = (df["Total"] / 300) * 100
-
-# Grade Logic
-def assign_grade(p):
-    if p >= 85:
-        return "A"
-    elif p >= 70:
-        return "B"
-    elif p >= 55:
-        return "C"
-    elif p >= 40:
-        return "D"
-    else:
-        return "F"
-
-df["Grade"] = df["Percentage"].apply(assign_grade)
-
-# Risk Level Detection
-def risk_level(row):
-    if row["Percentage"] < 40 or row["Attendance"] < 60:
-        return "High Risk"
-    elif row["Percentage"] < 60:
-        return "Medium Risk"
+def add_features(df, config=DEFAULT_CONFIG):
+    # Total and Percentage (float64 math whatever the stored mark dtype, so
+    # grade boundaries do not move with float32 marks)
+    marks = df[subjects]
+    if not all(pd.api.types.is_integer_dtype(t) for t in marks.dtypes):
+        marks = marks.astype("float64")
+    df["Total"] = marks.sum(axis=1)
+    df["Percentage"] = (df["Total"] / 300) * 100
+
+    # Grade and Risk Level (vectorized, thresholds from GradingConfig)
+    df = classify(df, config)
+
+    # Attendance Impact Score
+    df["AttendanceImpact"] = df["Attendance"].astype("float64") * 0.3 + df["Percentage"] * 0.7
+
+    return df
+
+# ---------------- In-memory Mode ---------------- #
+
+def preprocess(df, config=DEFAULT_CONFIG):
+    fill_values = None
+    if df[schema.MARK_COLUMNS].isnull().sum().sum() > 0:
+        print("⚠ Missing values detected. Filling with column mean.")
+        fill_values = df.mean(numeric_only=True)
+
+    float_cols = schema.float_columns(df)
+    df, report = validate(df, fill_values)
+    df = schema.cast_marks(df, float_cols)
+    report_invalid(report)
+    print("✅ Data Validation Completed")
+
+    return add_features(df, config)
+
+# ---------------- Streaming Mode ---------------- #
+
+def scan_column_stats(path, chunksize):
+    """First pass: running sums/counts per numeric column.
+
+    Also records which mark columns have missing or fractional values
+    anywhere (schema.float_columns), so every streamed chunk is cast the same
+    way and the output matches the in-memory run.
+    """
+    sums = pd.Series(dtype="float64")
+    counts = pd.Series(dtype="int64")
+    has_missing = False
+    float_cols = set()
+
+    for chunk in schema.read_csv(path, chunksize=chunksize):
+        numeric = chunk.select_dtypes("number").astype("float64")  # float32 sums drift on big files
+        sums = sums.add(numeric.sum(), fill_value=0)
+        counts = counts.add(numeric.count(), fill_value=0)
+
+        has_missing = has_missing or chunk[schema.MARK_COLUMNS].isnull().to_numpy().any()
+        float_cols.update(schema.float_columns(chunk))
+
+    means = sums / counts
+    return means, has_missing, sorted(float_cols)
+
+
+def preprocess_streaming(input_path, output_path, chunksize, config=DEFAULT_CONFIG,
+                         columnar_path=None, store=None):
+    means, has_missing, float_cols = scan_column_stats(input_path, chunksize)
+
+    fill_values = None
+    if has_missing:
+        print("⚠ Missing values detected. Filling with column mean.")
+        fill_values = means
+
+    rows = 0
+    first = None
+    report = schema.ValidationReport(np.array([], dtype="int64"))
+    with contextlib.ExitStack() as stack:
+        columnar = None
+        if columnar_path is not None:
+            columnar = stack.enter_context(storage.ColumnarWriter(columnar_path))
+
+        for i, chunk in enumerate(schema.read_csv(input_path, chunksize=chunksize)):
+            chunk, chunk_report = validate(chunk, fill_values)
+            report = report.merge(chunk_report)
+            chunk = add_features(schema.cast_marks(chunk, float_cols), config)
+            chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            if columnar is not None:
+                columnar.write(chunk)
+            if store is not None:
+                store.update(chunk)
+
+            rows += len(chunk)
+            if first is None:
+                first = chunk.head()
+
+    report_invalid(report)
+    print("✅ Data Validation Completed")
+    return rows, first
+
+# ---------------- Append Mode ---------------- #
+
+def append_batch(input_path, output_path, config=DEFAULT_CONFIG):
+    """Process a new batch and add it to an existing processed dataset.
+
+    Missing values are filled with the running column means from the
+    aggregate store, which is then updated with the batch only. A Parquet
+    copy next to the output that was up to date gets the batch too.
+    """
+    parquet_path = os.path.splitext(output_path)[0] + ".parquet"
+    parquet_fresh = storage.parquet_is_fresh(output_path, parquet_path)
+    store = aggregates.load_or_build(output_path)
+    df = schema.read_csv(input_path)
+    if df[schema.MARK_COLUMNS].isnull().sum().sum() > 0:
+        print("⚠ Missing values detected. Filling with running column mean.")
+
+    means = store.mean()
+    float_cols = schema.float_columns(df)
+    df, report = validate(df, means[schema.MARK_COLUMNS])
+    df = add_features(schema.cast_marks(df, float_cols), config)
+    report_invalid(report)
+    print("✅ Data Validation Completed")
+
+    aggregates.append_rows(df, output_path, store=store)
+    if parquet_fresh:
+        storage.append_processed(df, parquet_path)
+    return len(df), df.head()
+
+# ---------------- Main ---------------- #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean and enrich the student dataset.")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the input in chunks of this many rows (bounded memory).",
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Add the input batch to the existing processed dataset instead of rebuilding it.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.append:
+        with stage("preprocess.append", memory=True) as s:
+            rows, sample = append_batch(args.input, args.output)
+            s.rows = rows
+        print(f"\n🚀 Appended {rows} rows to {args.output}")
+        print(f"📈 Aggregate store updated: {aggregates.store_path(args.output)}")
+        parquet_path = os.path.splitext(args.output)[0] + ".parquet"
+        if storage.parquet_is_fresh(args.output, parquet_path):
+            print(f"📦 Columnar copy updated: {parquet_path}")
+        print("\n📊 Sample Processed Data:\n")
+        print(sample)
+        return
+
+    # Typed columnar copy next to the CSV (skipped when pyarrow is missing)
+    columnar_path = None
+    if storage.pq is not None:
+        columnar_path = os.path.splitext(args.output)[0] + ".parquet"
+
+    if args.chunksize:
+        print(f"\n✅ Streaming dataset in chunks of {args.chunksize} rows")
+        store = aggregates.AggregateStore()
+        with stage("preprocess.streaming", memory=True) as s:
+            rows, sample = preprocess_streaming(
+                args.input, args.output, args.chunksize, columnar_path=columnar_path, store=store
+            )
+            s.rows = rows
     else:
-        return "Low Risk"
-
-df["RiskLevel"] = df.apply(risk_level, axis=1)
-
-# Attendance Impact Score
-df["AttendanceImpact"] = df["Attendance"] * 0.3 + df["Percentage"] * 0.7
-
-# Save processed dataset
-output_path = "outputs/processed_student_data.csv"
-df.to_csv(output_path, index=False)
-
-print(f"\n🚀 Preprocessing Completed!")
-print(f"📂 Processed file saved at: {output_path}")
-
-print("\n📊 Sample Processed Data:\n")
-print(df.head())
+        with stage("preprocess.load", memory=True) as s:
+            df = schema.read_csv(args.input)
+            s.rows = len(df)
+        print("\n✅ Dataset Loaded Successfully")
+        with stage("preprocess.clean_features", rows=len(df), memory=True):
+            df = preprocess(df)
+        with stage("preprocess.save", rows=len(df), memory=True):
+            df.to_csv(args.output, index=False)
+            if columnar_path is not None:
+                storage.write_processed(df, columnar_path)
+        with stage("preprocess.aggregate", rows=len(df), memory=True):
+            store = aggregates.AggregateStore.from_frame(df)
+        rows, sample = len(df), df.head()
+
+    # Summary state for O(batch) updates with --append
+    store.source = aggregates.dataset_source(args.output)
+    aggregates.save(store, aggregates.store_path(args.output))
+
+    print(f"\n🚀 Preprocessing Completed! ({rows} rows)")
+    print(f"📂 Processed file saved at: {args.output}")
+    if columnar_path is not None:
+        print(f"📦 Columnar copy saved at: {columnar_path}")
+    print(f"📈 Aggregate store saved at: {aggregates.store_path(args.output)}")
+
+    print("\n📊 Sample Processed Data:\n")
+    print(sample)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import os
+import time
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+import model_registry
+from model_registry import MODEL_DIR
+from risk_pipeline import RAW_FEATURES
+
+GRID_STEP = 5          # marks/attendance between grid points (0, 5, ..., 100)
+PREDICT_BATCH = 200_000
+
+# ---------------- Precomputed Surface ---------------- #
+
+def grid_axis(step=GRID_STEP):
+    axis = np.arange(0, 101, step)
+    return axis if axis[-1] == 100 else np.append(axis, 100)
+
+
+class DecisionSurface(NamedTuple):
+    """predict_proba of a fitted pipeline over the 4-D slider grid.
+
+    `probabilities[i, j, k, l]` holds the class probabilities for
+    (axis[i], axis[j], axis[k], axis[l]) in RAW_FEATURES order, as float16.
+    """
+    classes: np.ndarray
+    axis: np.ndarray
+    probabilities: np.ndarray
+
+    def predict_proba(self, maths, science, english, attendance):
+        """Probabilities at the nearest grid point (O(1))."""
+        point = np.clip([maths, science, english, attendance], 0, 100)
+        index = np.abs(point[:, None] - self.axis[None, :]).argmin(axis=1)
+        return self.probabilities[tuple(index)].astype("float64")
+
+    def predict(self, *inputs):
+        return self.classes[self.predict_proba(*inputs).argmax()]
+
+
+def compute_surface(pipeline, step=GRID_STEP):
+    axis = grid_axis(step)
+    grid = np.stack(np.meshgrid(axis, axis, axis, axis, indexing="ij"), axis=-1).reshape(-1, 4)
+    probabilities = np.concatenate([
+        pipeline.predict_proba(pd.DataFrame(grid[i:i + PREDICT_BATCH], columns=RAW_FEATURES))
+        for i in range(0, len(grid), PREDICT_BATCH)
+    ])
+    shape = (len(axis),) * 4 + (len(pipeline.classes_),)
+    return DecisionSurface(np.asarray(pipeline.classes_), axis, probabilities.astype("float16").reshape(shape))
+
+# ---------------- Persistence ---------------- #
+
+def surface_path(data_hash, step=GRID_STEP, model_dir=MODEL_DIR):
+    # Same version key as the registry model it was computed from
+    return os.path.join(model_dir, f"risk_surface_{data_hash}_step{step}.npz")
+
+
+def save_surface(surface, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, classes=surface.classes.astype(str), axis=surface.axis,
+                 probabilities=surface.probabilities)
+    os.replace(tmp_path, path)
+
+
+def load_surface(path):
+    with np.load(path, allow_pickle=False) as data:
+        return DecisionSurface(data["classes"].astype(object), data["axis"], data["probabilities"])
+
+
+def load_or_compute(bundle, step=GRID_STEP, model_dir=MODEL_DIR, force=False):
+    """Lookup table for a model bundle, computed the first time its version is seen."""
+    path = surface_path(bundle["data_hash"], step, model_dir)
+    if os.path.exists(path) and not force:
+        return load_surface(path)
+    surface = compute_surface(bundle["pipeline"], step)
+    save_surface(surface, path)
+    return surface
+
+# ---------------- Verification ---------------- #
+
+def verify(surface, pipeline, samples=2000, seed=42):
+    """Compare lookups with live inference.
+
+    On grid points the lookup must equal predict_proba (up to float16);
+    between grid points it reports how often the predicted class agrees.
+    """
+    rng = np.random.default_rng(seed)
+    axis = surface.axis
+
+    on_grid = axis[rng.integers(0, len(axis), size=(samples, 4))]
+    off_grid = rng.integers(0, 101, size=(samples, 4))
+
+    report = {}
+    for name, points in (("grid", on_grid), ("random", off_grid)):
+        live = pipeline.predict_proba(pd.DataFrame(points, columns=RAW_FEATURES))
+        looked_up = np.array([surface.predict_proba(*p) for p in points])
+        report[name] = {
+            "max_abs_diff": float(np.abs(live - looked_up).max()),
+            "class_agreement": float((live.argmax(axis=1) == looked_up.argmax(axis=1)).mean()),
+        }
+    return report
+
+# ---------------- Main ---------------- #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the risk model's decision surface for instant lookups.")
+    parser.add_argument("--step", type=int, default=GRID_STEP, help="Grid spacing in marks")
+    parser.add_argument("--samples", type=int, default=2000, help="Points checked against live inference")
+    args = parser.parse_args(argv)
+
+    bundle = model_registry.load_or_train()
+    start = time.perf_counter()
+    surface = compute_surface(bundle["pipeline"], args.step)
+    path = surface_path(bundle["data_hash"], args.step)
+    save_surface(surface, path)
+    print(f"\n✅ {surface.probabilities[..., 0].size:,} grid points evaluated in "
+          f"{time.perf_counter() - start:.2f}s ({surface.probabilities.nbytes / 2**20:.1f} MB)")
+    print(f"📂 Surface saved at: {path}")
+
+    report = verify(surface, bundle["pipeline"], args.samples)
+    for name, r in report.items():
+        print(f"🔍 {name:<7} points: max |Δp| = {r['max_abs_diff']:.4f}, "
+              f"same class {r['class_agreement'] * 100:.1f}%")
+
+    point = [70, 70, 70, 80]
+    start = time.perf_counter()
+    for _ in range(1000):
+        surface.predict_proba(*point)
+    lookup = (time.perf_counter() - start) / 1000
+    start = time.perf_counter()
+    bundle["pipeline"].predict_proba(pd.DataFrame([point], columns=RAW_FEATURES))
+    live = time.perf_counter() - start
+    print(f"⏱ Single prediction: lookup {lookup * 1e6:.0f}µs vs live model {live * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+# ---------------- Grading Config ---------------- #
+
+@dataclass(frozen=True)
+class GradingConfig:
+    # (grade, minimum percentage), best grade first
+    grade_thresholds: tuple = (("A", 85), ("B", 70), ("C", 55), ("D", 40))
+    fail_grade: str = "F"
+
+    # Risk Level rules
+    high_risk_percentage: float = 40
+    high_risk_attendance: float = 60
+    medium_risk_percentage: float = 60
+    risk_labels: tuple = ("High Risk", "Medium Risk", "Low Risk")
+
+    @property
+    def grade_labels(self):
+        return tuple(g for g, _ in self.grade_thresholds) + (self.fail_grade,)
+
+
+DEFAULT_CONFIG = GradingConfig()
+
+# ---------------- Vectorized Classification ---------------- #
+
+def assign_grades(percentage, config=DEFAULT_CONFIG):
+    """Label every percentage with a grade in one pass (Categorical)."""
+    p = np.asarray(percentage, dtype="float64")
+
+    # Ascending bin edges -> label for each bin, worst grade first
+    edges = np.array([t for _, t in reversed(config.grade_thresholds)], dtype="float64")
+    labels = np.array(config.grade_labels[::-1], dtype=object)
+
+    codes = np.searchsorted(edges, p, side="right")
+    # NaN fails every ">=" check in the scalar rules, so it gets the fail grade
+    codes[np.isnan(p)] = 0
+
+    return pd.Categorical.from_codes(
+        len(labels) - 1 - codes, categories=list(config.grade_labels)
+    )
+
+
+def assign_risk_levels(percentage, attendance, config=DEFAULT_CONFIG):
+    """Label every (percentage, attendance) pair with a risk level (Categorical)."""
+    p = np.asarray(percentage, dtype="float64")
+    a = np.asarray(attendance, dtype="float64")
+    high, medium, low = config.risk_labels
+
+    codes = np.select(
+        [
+            (p < config.high_risk_percentage) | (a < config.high_risk_attendance),
+            p < config.medium_risk_percentage,
+        ],
+        [0, 1],
+        default=2,
+    )
+
+    return pd.Categorical.from_codes(codes, categories=[high, medium, low])
+
+
+def classify(df, config=DEFAULT_CONFIG):
+    """Add Grade and RiskLevel columns computed from Percentage/Attendance."""
+    df["Grade"] = assign_grades(df["Percentage"], config)
+    df["RiskLevel"] = assign_risk_levels(df["Percentage"], df["Attendance"], config)
+    return df
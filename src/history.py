@@ -0,0 +1,288 @@
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+import schema
+import storage
+from instrumentation import stage
+from paths import OUTPUT_DIR
+from schema import MARK_COLUMNS, SUBJECTS
+
+HISTORY_DIR = os.path.join(OUTPUT_DIR, "history")
+MANIFEST_NAME = "terms.json"
+
+COLUMNS = ["RollNo", "Name"] + MARK_COLUMNS + ["Total", "Percentage", "Grade", "RiskLevel", "Result"]
+TREND_COLUMNS = SUBJECTS + ["Attendance", "Percentage"]  # Percentage == average mark
+TERM_PATTERN = re.compile(r"^[\w.-]+$")
+DELTA_DECIMALS = 4  # float32 scores: 66.666664 - 56.666668 is a 10-point change, not 10.0000038
+
+# ---------------- Term Partitions ---------------- #
+# One file per term (Parquet when pyarrow is installed, CSV otherwise), rows
+# sorted by RollNo. terms.json lists the terms in chronological order: the
+# order they were added, a re-added term keeping its place.
+
+def load_manifest(directory=HISTORY_DIR):
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)["terms"]
+
+
+def save_manifest(entries, directory=HISTORY_DIR):
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"terms": entries}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def store_version(directory=HISTORY_DIR):
+    """Cache key of the store: the manifest's mtime and size (it is rewritten on
+    every add); None when no term is stored."""
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return (directory, stat.st_mtime_ns, stat.st_size)
+
+
+def _write_partition(df, directory, term):
+    filename = f"term={term}.parquet" if storage.pq is not None else f"term={term}.csv"
+    path = os.path.join(directory, filename)
+    tmp_path = f"{path}.tmp"
+    if storage.pq is not None:
+        storage.write_processed(df, tmp_path)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return filename
+
+
+def read_term(entry, directory=HISTORY_DIR):
+    path = os.path.join(directory, entry["file"])
+    if path.endswith(".parquet"):
+        return schema.conform(storage.pq.read_table(path).to_pandas())
+    return schema.read_csv(path)
+
+
+def add_term(term, df, directory=HISTORY_DIR):
+    """Store one term's rows (raw or processed) as its own partition.
+
+    Raw exports are cleaned and graded like data_preprocessing does. Returns
+    the partition's manifest entry.
+    """
+    if not TERM_PATTERN.match(term):
+        raise ValueError(f"Term label {term!r} may only contain letters, digits, '.', '_' and '-'")
+
+    if "Percentage" not in df:
+        from data_preprocessing import preprocess
+
+        df = preprocess(df)
+
+    missing = df["RollNo"].isna()
+    if missing.any():
+        print(f"⚠ {missing.sum()} row(s) without a RollNo skipped")
+        df = df[~missing]
+    # One row per student and term: a later row for the same RollNo wins
+    duplicated = df["RollNo"].duplicated(keep="last")
+    if duplicated.any():
+        print(f"⚠ {duplicated.sum()} duplicate RollNo row(s) replaced by the later row")
+        df = df[~duplicated]
+
+    df = df[COLUMNS].astype({"RollNo": "int64"}).sort_values("RollNo", kind="stable")
+    os.makedirs(directory, exist_ok=True)
+    entry = {"term": term, "rows": len(df), "file": _write_partition(df.reset_index(drop=True), directory, term)}
+
+    entries = load_manifest(directory)
+    positions = [i for i, e in enumerate(entries) if e["term"] == term]
+    if positions:
+        entries[positions[0]] = entry
+    else:
+        entries.append(entry)
+    save_manifest(entries, directory)
+    return entry
+
+# ---------------- Term Index ---------------- #
+
+class DeltaIndex:
+    """Term-over-term change of one column, for the students present in both
+    terms, sorted by change so a threshold query is a binary search."""
+
+    def __init__(self, delta, rows, previous):
+        self.delta = delta        # ascending: biggest drops first
+        self.rows = rows          # table positions in the later term
+        self.previous = previous  # table positions of the same students in the earlier term
+
+    def below(self, value):
+        """Indices of the entries with delta < value."""
+        return np.arange(np.searchsorted(self.delta, value, side="left"))
+
+    def above(self, value):
+        """Indices of the entries with delta > value, biggest first."""
+        return np.arange(len(self.delta) - 1, np.searchsorted(self.delta, value, side="right") - 1, -1)
+
+
+class TermHistory:
+    """Every stored term in one table, indexed for per-student and per-term queries.
+
+    The table is term-major (each term a contiguous slice, sorted by RollNo),
+    and a stable argsort by RollNo gives the student-major order: a student's
+    history is the slice between two binary searches, already in term order.
+    Term-over-term deltas are computed on first use per (term, column) and
+    kept sorted, so "dropped more than N points" is another binary search.
+    """
+
+    def __init__(self, terms, frames):
+        self.terms = list(terms)
+        self.offsets = np.concatenate([[0], np.cumsum([len(f) for f in frames])])
+        table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
+        codes = np.repeat(np.arange(len(self.terms)), np.diff(self.offsets))
+        table.insert(0, "Term", pd.Categorical.from_codes(codes, categories=self.terms))
+        # The same names repeat every term; as a categorical a lookup gathers
+        # integer codes instead of slicing a multi-chunk Arrow string column
+        table["Name"] = table["Name"].astype("category")
+        self.table = table
+
+        rolls = table["RollNo"].to_numpy(dtype="int64")
+        self.order = np.argsort(rolls, kind="stable")
+        self.rolls = rolls[self.order]
+        self._deltas = {}
+
+        passed = (table["Result"] == "Pass").astype("float64") * 100
+        self.trend = table[TREND_COLUMNS].astype("float64").groupby(table["Term"], observed=False).mean()
+        self.trend["PassRate"] = passed.groupby(table["Term"], observed=False).mean()
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def students(self):
+        return int(np.count_nonzero(np.diff(self.rolls))) + 1 if len(self.rolls) else 0
+
+    def term(self, term):
+        """One term's rows (sorted by RollNo)."""
+        i = self.terms.index(term)
+        return self.table.iloc[self.offsets[i]:self.offsets[i + 1]]
+
+    def student(self, roll_no):
+        """A student's rows in term order (empty when the RollNo is unknown)."""
+        start = np.searchsorted(self.rolls, roll_no, side="left")
+        stop = np.searchsorted(self.rolls, roll_no, side="right")
+        return self.table.iloc[self.order[start:stop]]
+
+    def previous_term(self, term):
+        i = self.terms.index(term)
+        if i == 0:
+            raise ValueError(f"'{term}' is the first stored term: there is no earlier term to compare with")
+        return self.terms[i - 1]
+
+    def deltas(self, term, column="Percentage"):
+        """DeltaIndex of `column` from the term before `term` to `term`."""
+        key = (term, column)
+        if key not in self._deltas:
+            i = self.terms.index(self.previous_term(term))
+            before = slice(self.offsets[i], self.offsets[i + 1])
+            after = slice(self.offsets[i + 1], self.offsets[i + 2])
+            # Both slices are sorted by RollNo: match them with one vectorized binary search
+            rolls = self.table["RollNo"].to_numpy()
+            before_rolls, after_rolls = rolls[before], rolls[after]
+            pos = np.minimum(np.searchsorted(before_rolls, after_rolls), max(len(before_rolls) - 1, 0))
+            matched = np.flatnonzero(before_rolls[pos] == after_rolls) if len(before_rolls) else np.array([], int)
+
+            values = self.table[column]
+            delta = np.round(values.iloc[after].to_numpy(dtype="float64")[matched]
+                             - values.iloc[before].to_numpy(dtype="float64")[pos[matched]], DELTA_DECIMALS)
+            ranked = np.argsort(delta, kind="stable")
+            self._deltas[key] = DeltaIndex(delta[ranked], after.start + matched[ranked],
+                                           before.start + pos[matched][ranked])
+        return self._deltas[key]
+
+    def _changes(self, index, selected, column):
+        previous = self.table[column].iloc[index.previous[selected]].to_numpy()
+        rows = self.table.iloc[index.rows[selected]][["RollNo", "Name", "Grade", "RiskLevel", column]]
+        return rows.assign(Previous=previous, Delta=index.delta[selected]).reset_index(drop=True)
+
+    def drops(self, threshold, term=None, column="Percentage"):
+        """Students whose `column` fell by more than `threshold` since the previous term, biggest drop first."""
+        term = term or self.terms[-1]
+        index = self.deltas(term, column)
+        return self._changes(index, index.below(-threshold), column)
+
+    def gains(self, threshold, term=None, column="Percentage"):
+        """Students whose `column` rose by more than `threshold` since the previous term, biggest gain first."""
+        term = term or self.terms[-1]
+        index = self.deltas(term, column)
+        return self._changes(index, index.above(threshold), column)
+
+
+def load(directory=HISTORY_DIR):
+    """TermHistory of every stored term."""
+    entries = load_manifest(directory)
+    with stage("history.load", memory=True) as s:
+        frames = [read_term(entry, directory) for entry in entries]
+        history = TermHistory([entry["term"] for entry in entries], frames)
+        s.rows = len(history)
+    return history
+
+# ---------------- Main ---------------- #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Store term snapshots and query students' history across terms.")
+    parser.add_argument("--dir", default=HISTORY_DIR, help="History store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Store a term (raw export or processed CSV)")
+    add.add_argument("term", help="Term label, e.g. 2025-T1 (terms are ordered as added)")
+    add.add_argument("input", help="CSV with the columns of data/student_performance.csv")
+
+    commands.add_parser("terms", help="List the stored terms with their cohort averages")
+
+    student = commands.add_parser("student", help="One student's marks in every term")
+    student.add_argument("roll_no", type=int)
+
+    drops = commands.add_parser("drops", help="Students whose marks dropped since the previous term")
+    drops.add_argument("--threshold", type=float, default=10.0, help="Points lost (default: 10)")
+    drops.add_argument("--term", help="Later term of the pair (default: the latest)")
+    drops.add_argument("--column", default="Percentage", choices=TREND_COLUMNS)
+    drops.add_argument("--limit", type=int, default=20, help="Rows printed")
+    args = parser.parse_args(argv)
+
+    if args.command == "add":
+        with stage("history.add", memory=True) as s:
+            entry = add_term(args.term, schema.read_csv(args.input), args.dir)
+            s.rows = entry["rows"]
+        print(f"\n✅ Term {entry['term']} stored: {entry['rows']:,} students ({os.path.join(args.dir, entry['file'])})")
+        return
+
+    history = load(args.dir)
+    if not history.terms:
+        raise SystemExit(f"❌ No terms stored in {args.dir}. Add one with: python src/history.py add <TERM> <CSV>")
+
+    if args.command == "terms":
+        print(f"\n📚 {len(history.terms)} term(s), {history.students:,} students, {len(history):,} rows\n")
+        print(history.trend.round(2))
+    elif args.command == "student":
+        rows = history.student(args.roll_no)
+        if rows.empty:
+            raise SystemExit(f"❌ No student with RollNo {args.roll_no}")
+        print(f"\n🧑‍🎓 {rows['Name'].iloc[-1]} (RollNo {args.roll_no})\n")
+        print(rows.drop(columns=["RollNo", "Name"]).to_string(index=False))
+    else:
+        term = args.term or history.terms[-1]
+        if term not in history.terms[1:]:
+            raise SystemExit(f"❌ --term must be a stored term after the first: {', '.join(history.terms[1:]) or '(none)'}")
+        with stage("history.drops") as s:
+            result = history.drops(args.threshold, term, args.column)
+            s.rows = len(result)
+        print(f"\n📉 {len(result):,} student(s) lost more than {args.threshold:g} {args.column} points "
+              f"from {history.previous_term(term)} to {term}\n")
+        print(result.head(args.limit).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
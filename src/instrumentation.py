@@ -0,0 +1,255 @@
+import atexit
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from paths import OUTPUT_DIR
+
+# Where stage records go; SPA_METRICS=0 keeps them in memory only.
+METRICS_DIR = os.environ.get("SPA_METRICS_DIR", os.path.join(OUTPUT_DIR, "metrics"))
+ENABLED = os.environ.get("SPA_METRICS", "1") != "0"
+# Stage names (regex) to profile, e.g. SPA_PROFILE="analysis\..*"; SPA_PROFILER=pyinstrument
+PROFILE = os.environ.get("SPA_PROFILE", "")
+PROFILER = os.environ.get("SPA_PROFILER", "cprofile")
+
+STAGES_FILE = "stages.jsonl"
+PROMETHEUS_FILE = "metrics.prom"
+RECENT_SIZE = 200
+SAMPLE_INTERVAL = 0.005
+FLUSH_EVERY = 50        # buffered records written together...
+FLUSH_SECONDS = 10.0    # ...or once the oldest has waited this long
+MAX_LOG_BYTES = 10 * 2**20  # stages.jsonl is rotated to stages.jsonl.1 past this size
+
+_recent = deque(maxlen=RECENT_SIZE)
+_latest = {}  # stage -> last record, for the Prometheus snapshot
+_pending = []  # records not yet appended to stages.jsonl
+_last_flush = time.monotonic()
+_lock = threading.Lock()
+
+# ---------------- Measurement ---------------- #
+
+def rss_mb():
+    """Current resident set size (Linux /proc; 0 elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return 0.0
+
+
+class _PeakSampler:
+    # Polls RSS in a background thread; per-stage peaks, unlike ru_maxrss
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start = self.peak = rss_mb()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self):
+        self._done.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_mb())
+        return self.peak
+
+
+class Stage:
+    """Mutable record handed to the `with` block (set `rows` once known)."""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.record = None
+
+
+@contextmanager
+def _profiled(name):
+    if not PROFILE or not re.fullmatch(PROFILE, name):
+        yield
+        return
+
+    os.makedirs(os.path.join(METRICS_DIR, "profiles"), exist_ok=True)
+    base = os.path.join(METRICS_DIR, "profiles", f"{name}-{datetime.now():%Y%m%d-%H%M%S}")
+    if PROFILER == "pyinstrument":
+        from pyinstrument import Profiler
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(f"{base}.html", "w") as f:
+                f.write(profiler.output_html())
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(f"{base}.prof")
+
+
+@contextmanager
+def stage(name, rows=None, memory=False):
+    """Time a pipeline stage: wall/CPU seconds, rows processed and (with
+    memory=True) peak RSS, sampled by a background thread.
+
+        with stage("preprocess.load", memory=True) as s:
+            df = pd.read_csv(path)
+            s.rows = len(df)
+    """
+    current = Stage(name, rows)
+    sampler = _PeakSampler() if memory else None
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        with _profiled(name):
+            yield current
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        peak = sampler.stop() if sampler else None
+        current.record = record(name, wall, cpu, current.rows, peak, peak - sampler.start if sampler else None)
+
+
+@contextmanager
+def timed(name, rows=None):
+    """Wall time only, kept in memory (recent()): for per-interaction dashboard paths."""
+    current = Stage(name, rows)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        wall = time.perf_counter() - start
+        current.record = {"stage": name, "pid": os.getpid(), "wall_seconds": round(wall, 6), "rows": current.rows}
+        _recent.append(current.record)
+
+
+def record(name, wall_seconds, cpu_seconds=None, rows=None, peak_rss_mb=None, peak_rss_increase_mb=None):
+    """Store one stage measurement (also usable for timings taken elsewhere, e.g. in workers)."""
+    entry = {
+        "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "pid": os.getpid(),
+        "stage": name,
+        "wall_seconds": round(wall_seconds, 6),
+        "cpu_seconds": None if cpu_seconds is None else round(cpu_seconds, 6),
+        "rows": rows,
+        "rows_per_second": round(rows / wall_seconds, 1) if rows and wall_seconds > 0 else None,
+        "peak_rss_mb": None if peak_rss_mb is None else round(peak_rss_mb, 1),
+        "peak_rss_increase_mb": None if peak_rss_increase_mb is None else round(peak_rss_increase_mb, 1),
+    }
+    with _lock:
+        _recent.append(entry)
+        _latest[name] = entry
+        if ENABLED:
+            _pending.append(entry)
+            due = len(_pending) >= FLUSH_EVERY or time.monotonic() - _last_flush >= FLUSH_SECONDS
+    if ENABLED and due:
+        flush()
+    return entry
+
+# ---------------- Output ---------------- #
+
+def flush():
+    """Append buffered records to stages.jsonl and rewrite metrics.prom.
+
+    Runs on its own every FLUSH_EVERY records or FLUSH_SECONDS, and at exit.
+    Worker processes exit without atexit handlers: call it before returning.
+    """
+    global _last_flush
+    with _lock:
+        entries = _pending[:]
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not entries:
+        return
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, STAGES_FILE)
+        if os.path.exists(path) and os.path.getsize(path) > MAX_LOG_BYTES:
+            os.replace(path, f"{path}.1")  # keep one older file, drop the rest
+        with open(path, "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        _write_prometheus()
+    except OSError:
+        pass  # metrics must never break the pipeline
+
+
+atexit.register(flush)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def prometheus_text(entries=None):
+    """Latest value per stage in the Prometheus text exposition format."""
+    entries = _latest.values() if entries is None else entries
+    metrics = [
+        ("spa_stage_wall_seconds", "wall_seconds", "Wall-clock time of the last run of a stage"),
+        ("spa_stage_cpu_seconds", "cpu_seconds", "CPU time of the last run of a stage"),
+        ("spa_stage_rows", "rows", "Rows processed by the last run of a stage"),
+        ("spa_stage_peak_rss_mb", "peak_rss_mb", "Peak resident memory during the last run of a stage"),
+    ]
+    lines = []
+    for metric, key, help_text in metrics:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+        for entry in entries:
+            if entry.get(key) is not None:
+                lines.append(f'{metric}{{stage="{_label(entry["stage"])}"}} {entry[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def _write_prometheus():
+    # Merge with stages recorded by other processes (e.g. the nightly scripts)
+    path = os.path.join(METRICS_DIR, PROMETHEUS_FILE)
+    latest = {entry["stage"]: entry for entry in read_recent()}
+    latest.update(_latest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(prometheus_text(latest.values()))
+    os.replace(tmp_path, path)
+
+# ---------------- Reading ---------------- #
+
+def recent():
+    """Records from this process, oldest first."""
+    with _lock:
+        return list(_recent)
+
+
+def _tail(path, limit):
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        # Read from the end so a long-lived log stays cheap to inspect
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(size - limit * 400, 0))
+        lines = f.read().decode("utf-8", errors="replace").splitlines()
+    entries = []
+    for line in lines[-limit:]:
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue  # partial first line after seeking
+    return entries
+
+
+def read_recent(limit=RECENT_SIZE, metrics_dir=None):
+    """Last `limit` records written by any process, oldest first."""
+    path = os.path.join(metrics_dir or METRICS_DIR, STAGES_FILE)
+    entries = _tail(path, limit)
+    if len(entries) < limit:  # just rotated: the rest is in the previous file
+        entries = _tail(f"{path}.1", limit - len(entries)) + entries
+    return entries
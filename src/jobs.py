@@ -0,0 +1,297 @@
+import dataclasses
+import functools
+import itertools
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import instrumentation
+from paths import OUTPUT_DIR
+from storage import PROCESSED_CSV
+
+JOBS_DIR = os.path.join(OUTPUT_DIR, "jobs")
+# Worker processes behind the dashboard; override with SPA_JOB_WORKERS.
+WORKERS = int(os.environ.get("SPA_JOB_WORKERS", "0")) or min(2, os.cpu_count() or 1)
+KEEP_FINISHED = 20  # finished jobs listed before the oldest are forgotten (with their files)
+
+# ---------------- Worker Side ---------------- #
+# Jobs run in separate processes, so fitting a forest or scoring a file never
+# holds the GIL of the Streamlit server. Progress travels back on a queue.
+
+_progress = None
+_job_id = None
+
+
+def _init_worker(queue):
+    global _progress
+    _progress = queue
+
+
+def report(fraction=None, message=""):
+    """Progress of the running job: fraction done (None if unknown) and a status line.
+
+    A no-op outside a job worker, so tasks can be called directly too.
+    """
+    if _progress is not None and _job_id is not None:
+        _progress.put((_job_id, fraction, message))
+
+
+def _run(job_id, task, args, kwargs):
+    global _job_id
+    _job_id = job_id
+    report(0.0, "Started")
+    try:
+        with instrumentation.stage(f"jobs.{task.__name__}", memory=True):
+            return task(*args, **kwargs)
+    finally:
+        _job_id = None
+        instrumentation.flush()  # pool workers exit without running atexit
+
+# ---------------- Job Manager ---------------- #
+
+@contextmanager
+def _without_main_script():
+    # `streamlit run` executes app.py as __main__, and a spawned process
+    # re-runs __main__'s file on start-up: every worker would run the
+    # dashboard. Workers are started inside submit(), so hide it there.
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+@dataclasses.dataclass
+class Job:
+    id: int
+    name: str
+    key: tuple = None      # jobs with the same key are not queued twice
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    progress: float = 0.0
+    message: str = ""
+    submitted: float = dataclasses.field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+    result: object = None
+    error: str = None
+    files: tuple = ()       # outputs deleted when the job is forgotten
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    @property
+    def seconds(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobManager:
+    """Process pool plus a thread-safe registry of submitted jobs.
+
+    One instance is shared by every dashboard session (st.cache_resource).
+    Workers use the spawn start method: forking the multi-threaded Streamlit
+    server could copy locks held by other threads into the child.
+    """
+
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._queue = self._context.Queue()
+        self._pool = None
+        self._jobs = {}
+        self._futures = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        _remove_files(_stale_files())
+        threading.Thread(target=self._listen, name="job-progress", daemon=True).start()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(self.workers, mp_context=self._context,
+                                   initializer=_init_worker, initargs=(self._queue,))
+
+    def submit(self, name, task, *args, key=None, files=(), **kwargs):
+        """Queue task(*args, **kwargs) in a worker; returns its Job.
+
+        `task` must be a module-level function (it is pickled by reference).
+        While a job with the same `key` is queued or running, that job is
+        returned instead of starting another one. `files` are the job's
+        outputs, deleted once the job is forgotten.
+        """
+        with self._lock:
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and not job.done:
+                        return dataclasses.replace(job)
+
+            job = Job(next(self._ids), name, key, files=tuple(files))
+            if self._pool is None:
+                self._pool = self._new_pool()
+            with _without_main_script():
+                try:
+                    future = self._pool.submit(_run, job.id, task, args, kwargs)
+                except BrokenProcessPool:
+                    # A worker died (e.g. killed for memory): later jobs get a fresh pool
+                    self._pool = self._new_pool()
+                    future = self._pool.submit(_run, job.id, task, args, kwargs)
+            self._jobs[job.id] = job
+            self._futures[job.id] = future
+            self._forget_old()
+            snapshot = dataclasses.replace(job)
+        # Outside the lock: the callback runs right away if the future is already done
+        future.add_done_callback(functools.partial(self._finished, job))
+        return snapshot
+
+    def get(self, job_id):
+        """Snapshot of one job (None once forgotten)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else dataclasses.replace(job)
+
+    def jobs(self):
+        """Snapshots of the known jobs, newest first."""
+        with self._lock:
+            return [dataclasses.replace(job) for job in reversed(self._jobs.values())]
+
+    def latest(self, key):
+        """Snapshot of the newest job submitted with `key`, in any state (None if there is none)."""
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.key == key:
+                    return dataclasses.replace(job)
+        return None
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started yet; True if it was cancelled."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        return future is not None and future.cancel()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _finished(self, job, future):
+        with self._lock:
+            job.finished = time.time()
+            self._futures.pop(job.id, None)
+            if future.cancelled():
+                job.status = "cancelled"
+            elif future.exception() is not None:
+                exc = future.exception()
+                job.status, job.error = "failed", f"{type(exc).__name__}: {exc}"
+            else:
+                job.status, job.result, job.progress = "done", future.result(), 1.0
+
+    def _listen(self):
+        while True:
+            job_id, fraction, message = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.done:
+                    continue  # late message from a finished job
+                if job.status == "queued":
+                    job.status, job.started = "running", time.time()
+                if fraction is not None:
+                    job.progress = fraction
+                job.message = message
+
+    def _forget_old(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(len(finished) - KEEP_FINISHED, 0)]:
+            _remove_files(self._jobs.pop(job_id).files)
+
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _stale_files():
+    # Left in JOBS_DIR by an earlier server: no job of this manager refers to them
+    if not os.path.isdir(JOBS_DIR):
+        return []
+    return [entry.path for entry in os.scandir(JOBS_DIR) if entry.is_file()]
+
+# ---------------- Tasks ---------------- #
+# Module-level functions, so spawned workers can import them by name. Each
+# returns something small (paths, counts): models and frames stay on disk.
+
+def _count_rows(path):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, "rb") as f:
+        return max(sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b"")) - 1, 0)
+
+
+def risk_model_version(data_path=PROCESSED_CSV):
+    """(dataset hash, model mtime, surface mtime) once both files exist, else None.
+
+    Used as the dashboard's cache key, so a retrain is picked up on the next rerun.
+    """
+    import decision_surface
+    import model_registry
+
+    data_hash = model_registry.dataset_hash(data_path)
+    files = [model_registry.model_path(data_hash), decision_surface.surface_path(data_hash)]
+    if not all(os.path.exists(path) for path in files):
+        return None
+    return (data_hash, *(os.stat(path).st_mtime_ns for path in files))
+
+
+def train_risk_model(data_path=PROCESSED_CSV, force=False):
+    """Fit (or load) the dashboard's risk model and precompute its decision surface."""
+    import decision_surface
+    import model_registry
+
+    report(0.05, "Fitting the risk model" if force else "Loading or fitting the risk model")
+    bundle = model_registry.load_or_train(data_path, force=force)
+    report(0.75, "Precomputing the prediction lookup table")
+    decision_surface.load_or_compute(bundle, force=force)
+    return {"data_hash": bundle["data_hash"], "path": model_registry.model_path(bundle["data_hash"])}
+
+
+def score_file(input_path, output_path, batch_size=100_000, delete_input=False):
+    """Batch scoring with the registry model; returns (rows, seconds, output_path).
+
+    delete_input removes input_path afterwards, whether scoring succeeded or
+    not (the dashboard's copy of an upload).
+    """
+    import batch_score
+
+    try:
+        total = _count_rows(input_path)
+        report(0.0, f"Scoring {total:,} rows")
+        rows, seconds = batch_score.score_file(
+            input_path, output_path, batch_size,
+            progress=lambda done: report(done / max(total, 1), f"{done:,} of {total:,} rows scored"))
+    finally:
+        if delete_input:
+            _remove_files([input_path])
+    return rows, seconds, output_path
+
+
+def rebuild_aggregates(csv_path=PROCESSED_CSV):
+    """Recompute the aggregate store from the processed CSV; returns the rows covered."""
+    import aggregates
+
+    total = _count_rows(csv_path)
+    store = aggregates.build(
+        csv_path, progress=lambda done: report(done / max(total, 1), f"{done:,} of {total:,} rows folded in"))
+    aggregates.save(store, aggregates.store_path(csv_path))
+    return store.count
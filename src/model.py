@@ -1,32 +1,62 @@
+import argparse
+
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.metrics import accuracy_score
 
-# Load dataset
-df = pd.read_csv("data/student_performance.csv")
+import schema
+from instrumentation import stage
+from paths import RAW_CSV
+
+FEATURES = ["Maths", "Science", "English", "Attendance"]
+TARGET = "Result"
+
+
+def train(df, seed=42):
+    """Fit the Pass/Fail decision tree; returns (model, held-out accuracy)."""
+    # Features and target
+    X = df[FEATURES]
+    y = df[TARGET]
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=seed
+    )
+
+    # Train model
+    with stage("model.train", rows=len(X_train), memory=True):
+        model = DecisionTreeClassifier()
+        model.fit(X_train, y_train)
+
+    # Test model
+    with stage("model.evaluate", rows=len(X_test), memory=True):
+        predictions = model.predict(X_test)
+        accuracy = accuracy_score(y_test, predictions)
+
+    return model, accuracy
+
 
-# Features and target
-X = df[["Maths", "Science", "English", "Attendance"]]
-y = df["Result"]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the Pass/Fail decision tree on the raw dataset.")
+    parser.add_argument("--input", default=RAW_CSV)
+    args = parser.parse_args(argv)
 
-# Split data
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+    # Load dataset
+    with stage("model.load", memory=True) as s:
+        df = schema.read_csv(args.input)
+        s.rows = len(df)
 
-# Train model
-model = DecisionTreeClassifier()
-model.fit(X_train, y_train)
+    model, accuracy = train(df)
+    print("✅ Model Accuracy:", accuracy)
 
-# Test model
-predictions = model.predict(X_test)
-accuracy = accuracy_score(y_test, predictions)
+    # Predict new student
+    new_student = pd.DataFrame([[60, 55, 58, 70]], columns=FEATURES)  # example data
+    result = model.predict(new_student)
 
-print("✅ Model Accuracy:", accuracy)
+    print("🎯 Prediction for new student:", result[0])
+    return accuracy
 
-# Predict new student
-new_student = [[60, 55, 58, 70]]  # example data
-result = model.predict(new_student)
 
-print("🎯 Prediction for new student:", result[0])
\ No newline at end of file
+if __name__ == "__main__":
+    main()
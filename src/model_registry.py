@@ -0,0 +1,81 @@
+import functools
+import hashlib
+import os
+
+from risk_pipeline import RAW_FEATURES, TARGET, make_pipeline
+from paths import OUTPUT_DIR
+from storage import PROCESSED_CSV, load_processed
+
+MODEL_DIR = os.path.join(OUTPUT_DIR, "models")
+
+# ---------------- Dataset Versioning ---------------- #
+
+@functools.lru_cache(maxsize=16)
+def _file_hash(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def dataset_hash(path=PROCESSED_CSV):
+    """Content hash of the training data (re-read only when the file changes)."""
+    stat = os.stat(path)
+    return _file_hash(path, stat.st_mtime_ns, stat.st_size)
+
+# ---------------- Training ---------------- #
+
+def train_risk_model(df):
+    from sklearn.ensemble import RandomForestClassifier
+
+    pipeline = make_pipeline(RandomForestClassifier(n_estimators=100, random_state=42))
+    pipeline.fit(df[RAW_FEATURES], df[TARGET].astype(str))
+
+    return {"pipeline": pipeline, "inputs": RAW_FEATURES}
+
+# ---------------- Registry ---------------- #
+
+def model_path(data_hash, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f"risk_pipeline_{data_hash}.joblib")
+
+
+def save_model(bundle, path):
+    """Write a model bundle atomically (readers never see a partial file)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    import joblib
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_model(path):
+    import joblib  # unpickling imports the sklearn modules the model needs
+
+    return joblib.load(path)
+
+
+def load_or_train(data_path=PROCESSED_CSV, model_dir=MODEL_DIR, force=False):
+    """Return the fitted risk model for the current dataset version.
+
+    The fitted pipeline (derived features, scaler, forest) is persisted under
+    the dataset's content hash, so training only happens the first time a
+    dataset version is seen (or when `force` is set).
+    """
+    data_hash = dataset_hash(data_path)
+    path = model_path(data_hash, model_dir)
+
+    if os.path.exists(path) and not force:
+        return load_model(path)
+
+    df = load_processed(
+        columns=RAW_FEATURES + [TARGET],
+        csv_path=data_path,
+        parquet_path=os.path.splitext(data_path)[0] + ".parquet",
+    )
+    bundle = train_risk_model(df)
+    bundle["data_hash"] = data_hash
+    save_model(bundle, path)
+
+    return bundle
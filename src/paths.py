@@ -0,0 +1,9 @@
+import os
+
+# Every default path is anchored here, so the scripts, the dashboard and the
+# pipeline runner work from any working directory.
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, "outputs")
+
+RAW_CSV = os.path.join(DATA_DIR, "student_performance.csv")
@@ -0,0 +1,336 @@
+import argparse
+import ast
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, NamedTuple
+
+import instrumentation
+from paths import OUTPUT_DIR, PROJECT_ROOT, RAW_CSV
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(OUTPUT_DIR, "cache")
+
+# ---------------- Stages ---------------- #
+# Each stage runs in a worker process and returns the files it produced. Heavy
+# modules are imported inside the stage, so a fully cached run stays cheap.
+
+def run_preprocess(workers):
+    import aggregates
+    import data_preprocessing
+    import storage
+
+    data_preprocessing.main(["--input", RAW_CSV, "--output", storage.PROCESSED_CSV])
+    outputs = [storage.PROCESSED_CSV, aggregates.store_path(storage.PROCESSED_CSV)]
+    if storage.pq is not None:
+        outputs.append(storage.PROCESSED_PARQUET)
+    return outputs
+
+
+def run_analysis(workers):
+    import analysis
+
+    analysis.main(["--workers", str(workers)])
+    charts = [os.path.join(analysis.CHART_DIR, chart.filename) for chart in analysis.CHARTS.values()]
+    return [analysis.REPORT_PATH, *charts, os.path.join(analysis.CHART_DIR, analysis.MANIFEST_NAME)]
+
+
+def run_rain_model(workers):
+    import rain_model
+
+    rain_model.main(["--workers", str(workers)])
+    return [rain_model.BEST_MODEL_PATH]
+
+
+def run_risk_model(workers):
+    # Warm the dashboard's registry model and its precomputed decision surface
+    import decision_surface
+    import model_registry
+
+    bundle = model_registry.load_or_train()
+    decision_surface.load_or_compute(bundle)
+    return [model_registry.model_path(bundle["data_hash"]), decision_surface.surface_path(bundle["data_hash"])]
+
+
+def run_baseline(workers):
+    import model
+
+    model.main([])
+    return []
+
+
+class Step(NamedTuple):
+    run: Callable
+    deps: tuple = ()    # upstream stages whose outputs this stage reads
+    inputs: tuple = ()  # files read from outside the pipeline
+    code: tuple = ()    # modules (and their local imports) whose source is part of the cache key
+
+
+STEPS = {
+    "preprocess": Step(run_preprocess, inputs=(RAW_CSV,), code=("data_preprocessing",)),
+    "analysis": Step(run_analysis, deps=("preprocess",), code=("analysis",)),
+    "rain_model": Step(run_rain_model, deps=("preprocess",), code=("rain_model",)),
+    "risk_model": Step(run_risk_model, deps=("preprocess",), code=("model_registry", "decision_surface")),
+    "baseline": Step(run_baseline, inputs=(RAW_CSV,), code=("model",)),
+}
+
+
+def select(targets, steps=STEPS):
+    """Targets plus everything upstream of them, in dependency order."""
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through stage '{name}'")
+        visiting.add(name)
+        for dep in steps[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in targets or steps:
+        visit(name)
+    return order
+
+# ---------------- Cache Keys ---------------- #
+
+_digests = {}
+
+
+def file_digest(path):
+    """sha256 of a file's content (re-read only when its size or mtime changes)."""
+    stat = os.stat(path)
+    memo_key = (path, stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _digests:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _digests[memo_key] = digest.hexdigest()
+    return _digests[memo_key]
+
+
+def _local_imports(module):
+    with open(os.path.join(SRC_DIR, f"{module}.py")) as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            top = name.split(".")[0]
+            if os.path.exists(os.path.join(SRC_DIR, f"{top}.py")):
+                yield top
+
+
+def code_digest(modules):
+    """Hash of the modules' source and every src/ module they import."""
+    seen, stack = set(), list(modules)
+    while stack:
+        module = stack.pop()
+        if module not in seen:
+            seen.add(module)
+            stack.extend(_local_imports(module))
+    digest = hashlib.sha256()
+    for module in sorted(seen):
+        digest.update(module.encode())
+        digest.update(file_digest(os.path.join(SRC_DIR, f"{module}.py")).encode())
+    return digest.hexdigest()
+
+
+def stage_key(name, step, upstream):
+    """Content address of a stage run: its code, external inputs and upstream outputs."""
+    payload = {
+        "stage": name,
+        "run": inspect.getsource(step.run),
+        "code": code_digest(step.code),
+        "inputs": {os.path.relpath(p, PROJECT_ROOT): file_digest(p) for p in step.inputs},
+        "deps": {dep: [o["sha256"] for o in upstream[dep]] for dep in step.deps},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+# ---------------- Output Cache ---------------- #
+
+def _object_path(sha, cache_dir):
+    return os.path.join(cache_dir, "objects", sha[:2], sha)
+
+
+def _record_path(name, key, cache_dir):
+    return os.path.join(cache_dir, "stages", name, f"{key}.json")
+
+
+def store(name, key, paths, seconds, cache_dir=CACHE_DIR):
+    """Copy a stage's outputs into the object store and record them under its key."""
+    outputs = []
+    for path in paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Stage '{name}' did not produce {path}")
+        sha = file_digest(path)
+        obj = _object_path(sha, cache_dir)
+        if not os.path.exists(obj):
+            os.makedirs(os.path.dirname(obj), exist_ok=True)
+            shutil.copy2(path, f"{obj}.tmp")
+            os.replace(f"{obj}.tmp", obj)
+        stat = os.stat(path)
+        outputs.append({
+            "path": os.path.relpath(path, PROJECT_ROOT),
+            "sha256": sha,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        })
+
+    record_path = _record_path(name, key, cache_dir)
+    os.makedirs(os.path.dirname(record_path), exist_ok=True)
+    with open(f"{record_path}.tmp", "w") as f:
+        json.dump({"stage": name, "key": key, "seconds": round(seconds, 3), "outputs": outputs}, f, indent=2)
+    os.replace(f"{record_path}.tmp", record_path)
+    return outputs
+
+
+class OutputsChanged(Exception):
+    """A stage's outputs were changed outside the pipeline (e.g. by --append)."""
+
+
+def _is_current(output, path):
+    if not os.path.exists(path):
+        return False
+    stat = os.stat(path)
+    if (stat.st_size, stat.st_mtime_ns) == (output["size"], output["mtime_ns"]):
+        return True
+    return file_digest(path) == output["sha256"]
+
+
+def restore(name, key, cache_dir=CACHE_DIR):
+    """Outputs of an earlier run with this key, put back on disk; None on a cache miss.
+
+    Only missing outputs are restored. An output that exists with other
+    content was changed on purpose (an appended batch, an edit), so it is
+    never overwritten: OutputsChanged is raised instead.
+    """
+    record_path = _record_path(name, key, cache_dir)
+    if not os.path.exists(record_path):
+        return None
+    with open(record_path) as f:
+        outputs = json.load(f)["outputs"]
+
+    stale = [o for o in outputs if not _is_current(o, os.path.join(PROJECT_ROOT, o["path"]))]
+    changed = [o["path"] for o in stale if os.path.exists(os.path.join(PROJECT_ROOT, o["path"]))]
+    if changed:
+        raise OutputsChanged(f"{', '.join(changed)} changed since the cached run")
+    if not all(os.path.exists(_object_path(o["sha256"], cache_dir)) for o in stale):
+        return None
+    for output in stale:
+        # copy2 keeps the original mtime, so freshness checks (Parquet vs CSV,
+        # the aggregate store's source stamp) see the same ordering as before
+        path = os.path.join(PROJECT_ROOT, output["path"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copy2(_object_path(output["sha256"], cache_dir), f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+    print(f"♻️  {name}: up to date" + (f" (restored {len(stale)} file(s) from cache)" if stale else ""))
+    return outputs
+
+# ---------------- Runner ---------------- #
+
+def _execute(name, workers):
+    start = time.perf_counter()
+    with instrumentation.stage(f"pipeline.{name}", memory=True):
+        paths = STEPS[name].run(workers)
+    instrumentation.flush()  # runs in a pool worker: no atexit
+    return paths, time.perf_counter() - start
+
+
+def run(targets=None, workers=None, force=False, cache_dir=CACHE_DIR):
+    """Run the selected stages (and their upstream) in dependency order.
+
+    Stages whose dependencies are done run concurrently in a process pool;
+    a stage whose key is already in the cache is restored instead of run,
+    and fails if its outputs were changed outside the pipeline.
+    Returns {stage: "cached" | "ran" | "failed" | "skipped"}.
+    """
+    order = select(targets)
+    workers = workers or os.cpu_count() or 1
+    # Stages that parallelise internally share the cores with the other running stages
+    inner_workers = max(1, (os.cpu_count() or 1) // workers)
+
+    status, upstream, keys, running = {}, {}, {}, {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while len(status) < len(order):
+            for name in order:
+                step = STEPS[name]
+                if name in status or name in running.values():
+                    continue
+                upstream_status = [status.get(dep) for dep in step.deps]
+                if any(state in ("failed", "skipped") for state in upstream_status):
+                    status[name] = "skipped"
+                    print(f"⏭ {name}: skipped (upstream stage failed)")
+                    continue
+                if not all(state in ("cached", "ran") for state in upstream_status):
+                    continue
+
+                keys[name] = stage_key(name, step, upstream)
+                try:
+                    outputs = None if force else restore(name, keys[name], cache_dir)
+                except OutputsChanged as exc:
+                    status[name] = "failed"
+                    print(f"⚠ {name}: {exc}; not overwriting. Run with --force to rebuild it.")
+                    continue
+                if outputs is not None:
+                    upstream[name] = outputs
+                    status[name] = "cached"
+                else:
+                    print(f"🚀 {name}: running")
+                    running[pool.submit(_execute, name, inner_workers)] = name
+
+            if not running:
+                continue  # new cache hits may have unblocked more stages
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    paths, seconds = future.result()
+                    upstream[name] = store(name, keys[name], paths, seconds, cache_dir)
+                    status[name] = "ran"
+                    print(f"✅ {name}: finished in {seconds:.2f}s")
+                except Exception as exc:
+                    status[name] = "failed"
+                    print(f"❌ {name}: {type(exc).__name__}: {exc}")
+    return status
+
+# ---------------- Main ---------------- #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the preprocessing, analysis and model stages as one pipeline.")
+    parser.add_argument("stages", nargs="*", metavar="STAGE",
+                        help=f"Stages to bring up to date, with their upstream (default: all of {', '.join(STEPS)})")
+    parser.add_argument("--workers", type=int, default=None, help="Stages run at the same time (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Run every selected stage even when cached")
+    parser.add_argument("--clear-cache", action="store_true", help=f"Delete {CACHE_DIR} first")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.stages if name not in STEPS]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STEPS)})")
+
+    if args.clear_cache:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    start = time.perf_counter()
+    status = run(args.stages, args.workers, args.force)
+
+    print(f"\n📋 Pipeline finished in {time.perf_counter() - start:.2f}s")
+    for name, state in status.items():
+        print(f"   {name:<12}{state}")
+    if any(state in ("failed", "skipped") for state in status.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,225 @@
-import pandas as pd
+import argparse
+import os
+import time
+from multiprocessing import Pool
 
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+import numpy as np
+
+from sklearn.base import clone
+from sklearn.model_selection import KFold, StratifiedKFold
 from sklearn.metrics import accuracy_score, classification_report
 
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.neighbors import KNeighborsClassifier
 
-# Load processed data
-df = pd.read_csv("outputs/processed_student_data.csv")
-
-print("\n✅ Processed Dataset Loaded")
-
-# Select features and target
-features = [
-    "Maths",
-    "Science",
-    "English",
-    "Attendance",
-    "Percentage",
-    "AttendanceImpact"
-]
-
-X = df[features]
-y = df["RiskLevel"]
-
-# Encode target labels
-encoder = LabelEncoder()
-y = encoder.fit_transform(y)
-
-# Scale features
-scaler = StandardScaler()
-X = scaler.fit_transform(X)
+from model_registry import MODEL_DIR, dataset_hash, save_model
+from risk_pipeline import RAW_FEATURES, TARGET, fit_in_batches, make_pipeline, supports_partial_fit
+from instrumentation import stage
+from storage import PROCESSED_CSV, load_processed
 
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+BEST_MODEL_PATH = os.path.join(MODEL_DIR, "best_model.joblib")
 
 # ---------------- Models ---------------- #
 
-models = {
-    "Logistic Regression": LogisticRegression(max_iter=1000),
-    "Random Forest": RandomForestClassifier(n_estimators=100),
-    "KNN": KNeighborsClassifier(n_neighbors=5)
-}
-
-results = {}
-
-print("\n🚀 Training Models...\n")
-
-for name, model in models.items():
-    model.fit(X_train, y_train)
-    preds = model.predict(X_test)
-    acc = accuracy_score(y_test, preds)
-    results[name] = acc
-
-    print(f"📌 {name} Accuracy: {acc:.2f}")
-    print(classification_report(y_test, preds))
-
-# Best Model Selection
-best_model_name = max(results, key=results.get)
-print(f"\n🏆 Best Model: {best_model_name}")
-
+def make_candidates():
+    # Every candidate is a full pipeline, so scaling is refit inside each fold
+    return {
+        "Logistic Regression": make_pipeline(LogisticRegression(max_iter=1000)),
+        "Random Forest": make_pipeline(RandomForestClassifier(n_estimators=100, random_state=42)),
+        "KNN": make_pipeline(KNeighborsClassifier(n_neighbors=5)),
+        "SGD (log loss)": make_pipeline(SGDClassifier(loss="log_loss", random_state=42)),
+    }
+
+# ---------------- Cross-validation Tasks ---------------- #
+
+_worker_data = None
+
+
+def _init_worker(X, y):
+    # Each worker receives the data once instead of once per (model, fold) task
+    global _worker_data
+    _worker_data = (X, y)
+
+
+def evaluate_fold(name, estimator, fold, train_idx, test_idx, data=None):
+    X, y = _worker_data if data is None else data
+    model = clone(estimator)
+    try:
+        start = time.perf_counter()
+        model.fit(X.iloc[train_idx], y[train_idx])
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        preds = model.predict(X.iloc[test_idx])
+        predict_seconds = time.perf_counter() - start
+    except ValueError as e:  # e.g. KNN with fewer training rows than neighbours
+        return {"name": name, "fold": fold, "error": str(e)}
+
+    return {
+        "name": name,
+        "fold": fold,
+        "accuracy": accuracy_score(y[test_idx], preds),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+        "test_idx": test_idx,
+        "preds": preds,
+    }
+
+
+def make_folds(y, n_folds):
+    # Stratify when every class has enough rows for the requested folds
+    smallest_class = np.unique(y, return_counts=True)[1].min()
+    if smallest_class >= n_folds:
+        splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
+    else:
+        splitter = KFold(n_splits=min(n_folds, len(y)), shuffle=True, random_state=42)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def cross_validate_candidates(X, y, candidates, n_folds=5, workers=1, time_budget=None):
+    """Fit every (candidate, fold) pair, fanned out over a process pool.
+
+    With a time budget, the fits run in worker processes even for workers=1,
+    and the pool is terminated when the budget is spent: fits still running
+    are killed rather than left to finish in the background. Candidates with
+    unfinished folds are left out of the comparison.
+    Returns (results, finished_in_budget).
+    """
+    folds = make_folds(y, n_folds)
+    tasks = [
+        (name, estimator, fold, train_idx, test_idx)
+        for name, estimator in candidates.items()
+        for fold, (train_idx, test_idx) in enumerate(folds)
+    ]
+    if workers <= 1 and time_budget is None:
+        return [evaluate_fold(*task, data=(X, y)) for task in tasks], True
+
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    pool = Pool(max(workers, 1), initializer=_init_worker, initargs=(X, y))
+    try:
+        handles = [pool.apply_async(evaluate_fold, task) for task in tasks]
+        for handle in handles:
+            handle.wait(None if deadline is None else max(deadline - time.perf_counter(), 0))
+            if not handle.ready():  # budget spent
+                break
+        results = [handle.get() for handle in handles if handle.ready()]
+        return results, len(results) == len(tasks)
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def summarize(results, candidates, n_folds):
+    summary = {}
+    for name in candidates:
+        runs = [r for r in results if r["name"] == name]
+        errors = [r["error"] for r in runs if "error" in r]
+        ok = [r for r in runs if "error" not in r]
+        summary[name] = {
+            "complete": len(ok) == n_folds,
+            "errors": errors,
+            "folds": len(ok),
+            "accuracy_mean": float(np.mean([r["accuracy"] for r in ok])) if ok else float("nan"),
+            "accuracy_std": float(np.std([r["accuracy"] for r in ok])) if ok else float("nan"),
+            "fit_seconds": sum(r["fit_seconds"] for r in ok),
+            "predict_seconds": sum(r["predict_seconds"] for r in ok),
+        }
+    return summary
+
+# ---------------- Main ---------------- #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare risk-level models with k-fold cross-validation.")
+    parser.add_argument("--input", default=PROCESSED_CSV, help="Processed dataset (CSV path)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Stop cross-validation after this many seconds, killing unfinished fits")
+    parser.add_argument("--output", default=BEST_MODEL_PATH, help="Where to save the winning model")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Refit the winner in batches of this many rows when it supports partial_fit")
+    args = parser.parse_args(argv)
+
+    # Load processed data (only the columns the models use)
+    with stage("rain_model.load", memory=True) as s:
+        df = load_processed(
+            columns=RAW_FEATURES + [TARGET],
+            csv_path=args.input,
+            parquet_path=os.path.splitext(args.input)[0] + ".parquet",
+        )
+        s.rows = len(df)
+
+    print("\n✅ Processed Dataset Loaded")
+
+    # Raw inputs only: derived features and scaling live inside each pipeline
+    X = df[RAW_FEATURES]
+    y = df[TARGET].astype(str).to_numpy()
+
+    candidates = make_candidates()
+    n_folds = len(make_folds(y, args.folds))
+
+    print(f"\n🚀 Cross-validating {len(candidates)} models x {n_folds} folds "
+          f"with {args.workers} worker(s)...\n")
+
+    with stage("rain_model.cross_validate", rows=len(X), memory=True) as s:
+        results, finished = cross_validate_candidates(
+            X, y, candidates, args.folds, args.workers, args.time_budget
+        )
+    elapsed = s.record["wall_seconds"]
+    if not finished:
+        print(f"⏱ Time budget of {args.time_budget:.1f}s reached; unfinished models are skipped.\n")
+
+    summary = summarize(results, candidates, n_folds)
+    for name, s in summary.items():
+        if s["errors"]:
+            print(f"⚠ {name} failed: {s['errors'][0]}")
+            continue
+        if not s["complete"]:
+            print(f"⏭ {name}: only {s['folds']}/{n_folds} folds finished")
+            continue
+
+        print(f"📌 {name} Accuracy: {s['accuracy_mean']:.2f} ± {s['accuracy_std']:.2f} "
+              f"(fit {s['fit_seconds']:.2f}s, predict {s['predict_seconds']:.3f}s)")
+
+        # Report on the out-of-fold predictions
+        runs = [r for r in results if r["name"] == name]
+        test_idx = np.concatenate([r["test_idx"] for r in runs])
+        preds = np.concatenate([r["preds"] for r in runs])
+        print(classification_report(y[test_idx], preds, zero_division=0))
+
+    print(f"⏱ Model comparison wall time: {elapsed:.2f}s")
+
+    # Best Model Selection
+    eligible = {name: s["accuracy_mean"] for name, s in summary.items() if s["complete"] and not s["errors"]}
+    if not eligible:
+        print("\n❌ No model finished cross-validation; nothing saved.")
+        return
+
+    best_model_name = max(eligible, key=eligible.get)
+    print(f"\n🏆 Best Model: {best_model_name}")
+
+    # Refit the winner on all rows and persist it
+    best_model = clone(candidates[best_model_name])
+    with stage("rain_model.refit", rows=len(X), memory=True):
+        if args.batch_size and supports_partial_fit(best_model):
+            def batches():
+                for start in range(0, len(X), args.batch_size):
+                    yield X.iloc[start:start + args.batch_size], y[start:start + args.batch_size]
+
+            fit_in_batches(best_model, batches, classes=np.unique(y))
+        else:
+            best_model.fit(X, y)
+
+    save_model({
+        "name": best_model_name,
+        "pipeline": best_model,
+        "inputs": RAW_FEATURES,
+        "data_hash": dataset_hash(args.input),
+        "cv_summary": summary,
+    }, args.output)
+    print(f"📂 Best model saved at: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+SUBJECTS = ["Maths", "Science", "English"]
+RAW_FEATURES = SUBJECTS + ["Attendance"]
+FEATURES = RAW_FEATURES + ["Percentage", "AttendanceImpact"]
+TARGET = "RiskLevel"
+
+# ---------------- Derived Features ---------------- #
+
+def add_derived_features(X):
+    """Raw marks/attendance -> model features (same formulas as preprocessing)."""
+    if not isinstance(X, pd.DataFrame):
+        X = pd.DataFrame(X, columns=RAW_FEATURES)
+    percentage = (X[SUBJECTS].sum(axis=1) / 300) * 100
+    return X[RAW_FEATURES].assign(
+        Percentage=percentage,
+        AttendanceImpact=X["Attendance"] * 0.3 + percentage * 0.7,
+    )
+
+
+def _feature_names(transformer, input_features):
+    return np.array(FEATURES, dtype=object)
+
+# ---------------- Pipeline ---------------- #
+
+def make_pipeline(classifier):
+    """Derived features -> scaling -> classifier, fitted and saved as one object.
+
+    The pipeline takes the raw columns (RAW_FEATURES), so scaling statistics
+    are learned from whatever rows it is fitted on (e.g. the training fold).
+    """
+    # sklearn takes ~1.5s to import; callers that only need the feature
+    # helpers (batch scoring, the dashboard) should not pay for it up front
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+    return Pipeline([
+        ("features", FunctionTransformer(add_derived_features, feature_names_out=_feature_names)),
+        ("scale", StandardScaler()),
+        ("model", classifier),
+    ])
+
+
+def supports_partial_fit(pipeline):
+    return hasattr(pipeline.named_steps["model"], "partial_fit")
+
+
+def partial_fit(pipeline, X, y, classes):
+    """Online update from one batch (scaling statistics keep running)."""
+    features = pipeline.named_steps["features"].fit_transform(X)
+    scaler = pipeline.named_steps["scale"].partial_fit(features)
+    pipeline.named_steps["model"].partial_fit(scaler.transform(features), y, classes=classes)
+    return pipeline
+
+
+def fit_in_batches(pipeline, batches, classes):
+    """Fit a partial_fit-capable pipeline without loading the training set at once.
+
+    `batches` is a callable returning a fresh iterator of (X, y) batches. The
+    first pass learns the scaling statistics, the second trains the classifier
+    on data scaled with the final statistics (as a full-data fit would).
+    """
+    if not supports_partial_fit(pipeline):
+        raise TypeError(f"{type(pipeline.named_steps['model']).__name__} does not support partial_fit")
+
+    derive = pipeline.named_steps["features"]
+    scaler = pipeline.named_steps["scale"]
+    model = pipeline.named_steps["model"]
+
+    for X, _ in batches():
+        scaler.partial_fit(derive.fit_transform(X))
+    for X, y in batches():
+        model.partial_fit(scaler.transform(derive.transform(X)), y, classes=classes)
+    return pipeline
@@ -0,0 +1,156 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from grading import DEFAULT_CONFIG
+
+SUBJECTS = ["Maths", "Science", "English"]
+MARK_COLUMNS = SUBJECTS + ["Attendance"]
+MARK_RANGE = (0, 100)
+
+# Declared label sets: every loader returns these columns as categoricals with
+# exactly these categories (in this order), whatever the spelling in the file.
+CATEGORIES = {
+    "Grade": list(DEFAULT_CONFIG.grade_labels),
+    "RiskLevel": list(DEFAULT_CONFIG.risk_labels),
+    "Result": ["Fail", "Pass"],
+}
+CATEGORY_COLUMNS = list(CATEGORIES)
+
+# Parse-time dtypes. Marks may be missing (raw files) or fractional (mean-filled),
+# so they are parsed as float32 and narrowed to uint8 when every value allows it.
+READ_DTYPES = {
+    **{col: "float32" for col in MARK_COLUMNS},
+    "Total": "float32",
+    "Percentage": "float32",
+    "AttendanceImpact": "float32",
+    **{col: "category" for col in CATEGORY_COLUMNS},
+}
+
+# ---------------- Dtypes ---------------- #
+
+def _narrow(values, dtype):
+    # Smallest exact integer type when the column is complete and whole-valued
+    if values.dtype == dtype:
+        return values
+    limits = np.iinfo(dtype)
+    v = values.to_numpy()
+    whole = v.dtype.kind in "iu" or (np.isfinite(v).all() and (v == np.round(v)).all())
+    if len(v) and whole and v.min() >= limits.min and v.max() <= limits.max:
+        return values.astype(dtype)
+    return values.astype("float32")
+
+
+def _labels(values, categories):
+    # Recode on the (few) distinct spellings, not on every row: "Pass " and
+    # "pass" map to "Pass"; anything unknown becomes missing.
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype("category")
+    lookup = {label.lower(): i for i, label in enumerate(categories)}
+    spelled = values.cat.categories.astype(str).str.strip().str.lower()
+    recode = np.array([lookup.get(s, -1) for s in spelled] + [-1], dtype="int64")
+    codes = recode[values.cat.codes.to_numpy()]  # code -1 (missing) hits the trailing -1
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=values.index, name=values.name)
+
+
+def normalize_labels(df):
+    """Result/Grade/RiskLevel as categoricals with the declared categories, in place."""
+    for col, categories in CATEGORIES.items():
+        if col in df:
+            df[col] = _labels(df[col], categories)
+    return df
+
+
+def conform(df):
+    """Declared dtypes, in place: uint8/float32 marks, float32 derived scores,
+    uint16 totals and categoricals with normalized labels."""
+    for col in MARK_COLUMNS:
+        if col in df:
+            df[col] = _narrow(df[col], "uint8")
+    if "Total" in df:
+        df["Total"] = _narrow(df["Total"], "uint16")
+    for col in ("Percentage", "AttendanceImpact"):
+        if col in df:
+            df[col] = df[col].astype("float32")
+    return normalize_labels(df)
+
+
+def float_columns(df):
+    """Mark columns with missing or fractional values (stored as float32, not uint8)."""
+    # NaN != NaN, so one comparison catches both
+    return [c for c in MARK_COLUMNS if c in df and (df[c] != df[c].round()).any()]
+
+
+def cast_marks(df, float_cols):
+    """Fix mark dtypes for a whole dataset: float32 for `float_cols`, uint8 otherwise.
+
+    Streaming runs decide `float_cols` in a first pass, so every chunk (and the
+    in-memory run) writes the same representation.
+    """
+    for col in MARK_COLUMNS:
+        if col in df:
+            df[col] = df[col].astype("float32" if col in float_cols else "uint8")
+    return df
+
+
+def read_csv(path, columns=None, chunksize=None):
+    """pd.read_csv with the declared dtypes (an iterator of frames with chunksize)."""
+    reader = pd.read_csv(path, usecols=columns, dtype=READ_DTYPES, chunksize=chunksize)
+    if chunksize is not None:
+        return (conform(chunk) for chunk in reader)
+    df = conform(reader)
+    return df if columns is None or callable(columns) else df[list(columns)]
+
+# ---------------- Validation ---------------- #
+
+class ValidationReport(NamedTuple):
+    rows: np.ndarray            # index labels of rows with at least one problem
+    out_of_range: dict = {}     # mark column -> values clipped into MARK_RANGE
+    invalid_labels: dict = {}   # label column -> values missing or not in CATEGORIES
+
+    def merge(self, other):
+        def add(a, b):
+            return {k: a.get(k, 0) + b.get(k, 0) for k in a.keys() | b.keys()}
+
+        return ValidationReport(np.concatenate([self.rows, other.rows]),
+                                add(self.out_of_range, other.out_of_range),
+                                add(self.invalid_labels, other.invalid_labels))
+
+    def summary(self, limit=10):
+        if not len(self.rows):
+            return "no invalid rows"
+        problems = [f"{col} out of range ×{n}" for col, n in sorted(self.out_of_range.items())]
+        problems += [f"{col} missing/unknown ×{n}" for col, n in sorted(self.invalid_labels.items())]
+        shown = ", ".join(str(r) for r in self.rows[:limit])
+        more = f" (+{len(self.rows) - limit} more)" if len(self.rows) > limit else ""
+        return f"{len(self.rows)} invalid row(s): {'; '.join(problems)}. Rows: {shown}{more}"
+
+
+def validate(df):
+    """Clip marks into MARK_RANGE in one vectorized pass and report bad rows.
+
+    Returns (df, ValidationReport). Missing marks are left alone (they are
+    filled or skipped by the caller); missing or unknown labels are reported.
+    Clipped columns come back as float32 (see cast_marks).
+    """
+    cols = [c for c in MARK_COLUMNS if c in df]
+    low, high = MARK_RANGE
+    values = df[cols].to_numpy(dtype="float32")
+    invalid = (values < low) | (values > high)  # NaN compares False: not a range error
+    bad = invalid.any(axis=1)
+    if bad.any():
+        clipped = np.clip(values, low, high)
+        for i, col in enumerate(cols):
+            df[col] = clipped[:, i]
+
+    invalid_labels = {}
+    for col in CATEGORY_COLUMNS:
+        if col in df:
+            missing = df[col].isna().to_numpy()
+            if missing.any():
+                invalid_labels[col] = int(missing.sum())
+                bad |= missing
+
+    out_of_range = {col: int(n) for col, n in zip(cols, invalid.sum(axis=0)) if n}
+    return df, ValidationReport(df.index.to_numpy()[bad], out_of_range, invalid_labels)
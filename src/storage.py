@@ -0,0 +1,126 @@
+import os
+
+import pandas as pd
+
+import schema
+from paths import OUTPUT_DIR
+from schema import MARK_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, the CSV files stay the fallback
+    pa = None
+    pq = None
+
+PROCESSED_CSV = os.path.join(OUTPUT_DIR, "processed_student_data.csv")
+PROCESSED_PARQUET = os.path.join(OUTPUT_DIR, "processed_student_data.parquet")
+
+# ---------------- Typed Columnar Layout ---------------- #
+
+def to_columnar(df):
+    """Compact dtypes for storage: small ints for marks, categories for labels.
+
+    Unlike schema.conform, float marks stay float (as float32): streamed chunks
+    must all match the first chunk's Parquet schema.
+    """
+    df = df.copy()
+    for col in MARK_COLUMNS:
+        if col in df:
+            df[col] = df[col].astype("uint8" if pd.api.types.is_integer_dtype(df[col]) else "float32")
+    if "Total" in df and pd.api.types.is_integer_dtype(df["Total"]):
+        df["Total"] = df["Total"].astype("uint16")
+    for col in ("Percentage", "AttendanceImpact"):
+        if col in df:
+            df[col] = df[col].astype("float32")
+    return schema.normalize_labels(df)
+
+
+def _to_table(df, schema=None):
+    table = pa.Table.from_pandas(to_columnar(df), preserve_index=False)
+    if schema is None:
+        return table.replace_schema_metadata(None)
+    return table.replace_schema_metadata(None).cast(schema)
+
+
+class ColumnarWriter:
+    """Append processed chunks to one Parquet file (used by streaming mode)."""
+
+    def __init__(self, path=PROCESSED_PARQUET):
+        self.path = path
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        if self._writer is None:
+            table = _to_table(df)
+            self._schema = table.schema
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        else:
+            table = _to_table(df, self._schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_processed(df, path=PROCESSED_PARQUET):
+    if pq is None:
+        return None
+    pq.write_table(_to_table(df), path)
+    return path
+
+
+def append_processed(df, path=PROCESSED_PARQUET):
+    """Add processed rows at the end of the Parquet copy; returns its path.
+
+    Parquet files cannot be appended to in place, so the existing row groups
+    are copied one at a time (bounded memory) into a new file that then
+    replaces the old one. Column types are widened when the batch needs it,
+    e.g. float marks arriving in a file of integer marks.
+    """
+    if pq is None or not os.path.exists(path):
+        return None
+    source = pq.ParquetFile(path)
+    batch = _to_table(df[source.schema_arrow.names])
+    target = pa.unify_schemas([source.schema_arrow, batch.schema], promote_options="permissive")
+
+    tmp = path + ".tmp"
+    with pq.ParquetWriter(tmp, target) as writer:
+        for i in range(source.num_row_groups):
+            writer.write_table(source.read_row_group(i).cast(target))
+        writer.write_table(batch.cast(target))
+    os.replace(tmp, path)
+    return path
+
+# ---------------- Loader ---------------- #
+
+def parquet_is_fresh(csv_path, parquet_path):
+    if pq is None or not os.path.exists(parquet_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+
+
+def load_processed(columns=None, memory_map=True,
+                   csv_path=PROCESSED_CSV, parquet_path=PROCESSED_PARQUET):
+    """Load the processed dataset, reading only the requested columns.
+
+    Uses the Parquet artifact when pyarrow is installed and the file is at
+    least as new as the CSV; otherwise falls back to parsing the CSV. Either
+    way the columns come back with the declared dtypes (see schema.conform).
+    """
+    if parquet_is_fresh(csv_path, parquet_path):
+        table = pq.read_table(parquet_path, columns=columns, memory_map=memory_map)
+        return schema.conform(table.to_pandas())
+
+    return schema.read_csv(csv_path, columns)
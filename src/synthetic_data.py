@@ -0,0 +1,100 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from paths import DATA_DIR
+
+SUBJECTS = ["Maths", "Science", "English"]
+COLUMNS = ["RollNo", "Name"] + SUBJECTS + ["Attendance", "Result"]
+PASS_AVERAGE = 40
+CHUNK_ROWS = 1_000_000  # fixed, so a (rows, seed) pair always gives the same file
+
+FIRST_NAMES = np.array([
+    "Amit", "Riya", "Rahul", "Neha", "Arjun", "Sneha", "Karan", "Pooja", "Vikram", "Ananya",
+    "Rohan", "Priya", "Aditya", "Kavya", "Siddharth", "Isha", "Manish", "Divya", "Nikhil", "Meera",
+    "Yash", "Tanvi", "Harsh", "Shreya", "Varun", "Aditi", "Kunal", "Nisha", "Omkar", "Sakshi",
+])
+LAST_NAMES = np.array([
+    "Sharma", "Patil", "Kulkarni", "Deshmukh", "Joshi", "Mehta", "Iyer", "Nair", "Reddy", "Gupta",
+    "Singh", "Verma", "Jadhav", "Pawar", "Shinde", "Rao", "Das", "Khan", "Bose", "Chavan",
+])
+
+# ---------------- Cohort Model ---------------- #
+
+def _chunk(rng, start, rows, missing_rate):
+    # One latent ability drives all three subjects (pairwise r ≈ 0.77) and
+    # attendance (r ≈ 0.35); each subject also has its own per-student aptitude.
+    ability = rng.normal(0, 1, rows)
+    marks = {}
+    for subject, mean in zip(SUBJECTS, (64, 67, 69)):
+        aptitude = rng.normal(0, 0.55, rows)
+        marks[subject] = np.clip(mean + 14 * (ability + aptitude) / 1.14, 0, 100).round()
+
+    attendance = np.clip(80 + 9 * ability + rng.normal(0, 17, rows), 0, 100).round()
+    # Chronic absentees: a small group far below the rest
+    absent = rng.random(rows) < 0.03
+    attendance[absent] = rng.integers(10, 50, absent.sum())
+
+    average = sum(marks.values()) / 3
+    df = pd.DataFrame({
+        "RollNo": np.arange(start + 1, start + rows + 1),
+        "Name": pd.Series(FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), rows)])
+                + " " + LAST_NAMES[rng.integers(0, len(LAST_NAMES), rows)],
+        **{s: m.astype("int64") for s, m in marks.items()},
+        "Attendance": attendance.astype("int64"),
+        "Result": np.where(average >= PASS_AVERAGE, "Pass", "Fail"),
+    })
+
+    # Optional gaps, so the cleaning stage has missing values to impute
+    if missing_rate:
+        for col in SUBJECTS + ["Attendance"]:
+            df[col] = df[col].astype("float64").mask(rng.random(rows) < missing_rate)
+    return df
+
+
+def generate_chunks(rows, seed=42, missing_rate=0.0):
+    """Yield the synthetic cohort in CHUNK_ROWS-sized DataFrames (bounded memory).
+
+    rows=0 yields one empty frame, so callers still get the columns and dtypes.
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, max(rows, 1), CHUNK_ROWS):
+        yield _chunk(rng, start, min(CHUNK_ROWS, rows - start), missing_rate)
+
+
+def generate(rows, seed=42, missing_rate=0.0):
+    """Synthetic raw dataset with the same columns as data/student_performance.csv."""
+    chunks = list(generate_chunks(rows, seed, missing_rate))
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+def write_csv(path, rows, seed=42, missing_rate=0.0):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    for i, chunk in enumerate(generate_chunks(rows, seed, missing_rate)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return path
+
+# ---------------- Main ---------------- #
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic student cohort (raw CSV schema).")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--missing-rate", type=float, default=0.0,
+                        help="Fraction of marks/attendance values left empty")
+    parser.add_argument("--output", default=None, help="CSV path (default: data/synthetic_<rows>.csv)")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join(DATA_DIR, f"synthetic_{args.rows}.csv")
+    start = time.perf_counter()
+    write_csv(output, args.rows, args.seed, args.missing_rate)
+
+    print(f"\n✅ {args.rows:,} synthetic students written in {time.perf_counter() - start:.2f}s")
+    print(f"📂 Saved at: {output}")
+
+
+if __name__ == "__main__":
+    main()
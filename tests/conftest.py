@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# src/ holds flat scripts that import each other by bare name
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
@@ -0,0 +1,15 @@
+"""Dashboard chart tables."""
+import numpy as np
+
+import schema
+from dashboard_charts import chart_tables
+from data_preprocessing import preprocess
+from paths import RAW_CSV
+
+
+def test_result_counts_leave_out_missing_results():
+    df = preprocess(schema.read_csv(RAW_CSV))
+    df.loc[1, "Result"] = np.nan
+    counts = chart_tables(df)["result_counts"].set_index("Result")["Students"]
+    assert counts.to_dict() == df["Result"].dropna().astype(str).value_counts().to_dict()
+    assert counts.sum() == len(df) - 1
@@ -0,0 +1,34 @@
+"""Data tab index: filters and sorts over the processed dataset."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import schema
+from dashboard_data import DataFilter, DataIndex
+from data_preprocessing import preprocess
+from paths import RAW_CSV
+
+
+@pytest.fixture
+def df():
+    return preprocess(schema.read_csv(RAW_CSV))
+
+
+@pytest.mark.parametrize("column", ["Grade", "RiskLevel", "Result", "Maths", "Name"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_sort_with_a_missing_value(df, column, ascending):
+    df.loc[2, column] = np.nan if column != "Name" else None
+    index = DataIndex(df)
+    order = index.query(DataFilter(sort_by=column, ascending=ascending))
+
+    assert sorted(order) == list(range(len(df)))
+    assert order[-1] == 2  # missing last, in both directions
+    expected = df[column].drop(2).sort_values(ascending=ascending, kind="stable")
+    assert list(order[:-1]) == list(expected.index)
+
+
+def test_categories_sort_in_declared_order(df):
+    index = DataIndex(df)
+    order = index.query(DataFilter(sort_by="Grade"))
+    codes = pd.Categorical(df["Grade"]).codes[order]
+    assert list(codes) == sorted(codes)
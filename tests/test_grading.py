@@ -0,0 +1,98 @@
+"""Parity of the vectorized grading with the original per-row rules."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from grading import DEFAULT_CONFIG, assign_grades, assign_risk_levels, classify
+
+# ---------------- Reference (original per-row rules) ---------------- #
+
+def assign_grade(p):
+    if p >= 85:
+        return "A"
+    elif p >= 70:
+        return "B"
+    elif p >= 55:
+        return "C"
+    elif p >= 40:
+        return "D"
+    else:
+        return "F"
+
+
+def risk_level(row):
+    if row["Percentage"] < 40 or row["Attendance"] < 60:
+        return "High Risk"
+    elif row["Percentage"] < 60:
+        return "Medium Risk"
+    else:
+        return "Low Risk"
+
+# ---------------- Inputs ---------------- #
+
+THRESHOLDS = [85, 70, 60, 55, 40]
+EDGE_VALUES = sorted({v for t in THRESHOLDS for v in (t - 0.01, t, t + 0.01)} | {0, 100})
+NAN = float("nan")
+
+
+def edge_frame():
+    """Every edge percentage paired with every edge attendance (and NaN on both sides)."""
+    values = EDGE_VALUES + [NAN]
+    p, a = np.meshgrid(values, values + [59.99, 60, 60.01])
+    return pd.DataFrame({"Percentage": p.ravel(), "Attendance": a.ravel()})
+
+
+def random_frame(rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Percentage": rng.uniform(0, 100, rows).round(2),
+        "Attendance": rng.uniform(0, 100, rows).round(2),
+    })
+    df.loc[rng.random(rows) < 0.02, "Percentage"] = NAN
+    return df
+
+
+FRAMES = {"edges": edge_frame(), "random": random_frame()}
+
+# ---------------- Parity ---------------- #
+
+@pytest.mark.parametrize("name", FRAMES)
+def test_grades_match_reference(name):
+    df = FRAMES[name]
+    expected = [assign_grade(p) for p in df["Percentage"]]
+    assert list(assign_grades(df["Percentage"])) == expected
+
+
+@pytest.mark.parametrize("name", FRAMES)
+def test_risk_levels_match_reference(name):
+    df = FRAMES[name]
+    expected = df.apply(risk_level, axis=1).tolist()
+    assert list(assign_risk_levels(df["Percentage"], df["Attendance"])) == expected
+
+
+@pytest.mark.parametrize("name", FRAMES)
+def test_classify_matches_reference(name):
+    df = classify(FRAMES[name].copy())
+    assert df["Grade"].tolist() == [assign_grade(p) for p in df["Percentage"]]
+    assert df["RiskLevel"].tolist() == df.apply(risk_level, axis=1).tolist()
+
+
+@pytest.mark.parametrize("p", EDGE_VALUES + [NAN])
+def test_single_values(p):
+    assert assign_grades([p])[0] == assign_grade(p)
+    for a in (59.99, 60, 60.01, NAN):
+        assert assign_risk_levels([p], [a])[0] == risk_level({"Percentage": p, "Attendance": a})
+
+# ---------------- Categories ---------------- #
+
+def test_categories_and_order():
+    df = classify(FRAMES["edges"].copy())
+    assert list(df["Grade"].cat.categories) == ["A", "B", "C", "D", "F"]
+    assert list(df["RiskLevel"].cat.categories) == ["High Risk", "Medium Risk", "Low Risk"]
+    assert list(DEFAULT_CONFIG.grade_labels) == ["A", "B", "C", "D", "F"]
+    assert list(DEFAULT_CONFIG.risk_labels) == ["High Risk", "Medium Risk", "Low Risk"]
+
+
+def test_empty_input():
+    assert len(assign_grades([])) == 0
+    assert list(assign_risk_levels([], []).categories) == list(DEFAULT_CONFIG.risk_labels)
@@ -0,0 +1,71 @@
+"""Fast paths against the reference computation they replace, on a tiny synthetic cohort."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregates
+import compiled_forest
+import decision_surface
+import model_registry
+import schema
+import storage
+import synthetic_data
+from data_preprocessing import preprocess, preprocess_streaming
+
+ROWS = 2000
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return synthetic_data.generate(ROWS, seed=7, missing_rate=0.02)
+
+
+@pytest.fixture(scope="module")
+def pipeline(raw):
+    return model_registry.train_risk_model(preprocess(raw.copy()))["pipeline"]
+
+# ---------------- Streamed Preprocessing (user-002) ---------------- #
+
+def test_streaming_matches_in_memory(raw, tmp_path):
+    raw_csv, streamed_csv = tmp_path / "raw.csv", tmp_path / "streamed.csv"
+    raw.to_csv(raw_csv, index=False)
+    store = aggregates.AggregateStore()
+    rows, _ = preprocess_streaming(raw_csv, streamed_csv, chunksize=300,
+                                   columnar_path=tmp_path / "streamed.parquet", store=store)
+
+    # Compared as saved and read back, as every consumer of the processed CSV sees it
+    in_memory = preprocess(schema.read_csv(raw_csv))
+    in_memory.to_csv(tmp_path / "in_memory.csv", index=False)
+    expected = schema.read_csv(tmp_path / "in_memory.csv")
+    assert rows == len(expected)
+    pd.testing.assert_frame_equal(schema.read_csv(streamed_csv), expected)
+    parquet = storage.load_processed(csv_path=streamed_csv, parquet_path=tmp_path / "streamed.parquet")
+    pd.testing.assert_frame_equal(parquet, expected, check_dtype=False)
+
+    reference = aggregates.AggregateStore.from_frame(in_memory)
+    assert store.count == reference.count
+    np.testing.assert_allclose(store.sums, reference.sums)
+    assert store.label_counts == reference.label_counts
+
+# ---------------- Compiled Forest (user-023) ---------------- #
+
+def test_compiled_forest_matches_sklearn(pipeline):
+    forest = compiled_forest.compile_model(pipeline)
+    for name, r in compiled_forest.verify(forest, pipeline, samples=500).items():
+        assert r["identical"], f"{name} inputs differ by up to {r['max_abs_diff']:.2e}"
+
+
+def test_compiled_forest_routes_missing_values(pipeline):
+    X = np.array([[70, np.nan, 60, 80], [np.nan, np.nan, np.nan, 50]], dtype="float64")
+    forest = compiled_forest.compile_model(pipeline)
+    expected = pipeline.predict_proba(pd.DataFrame(X, columns=compiled_forest.RAW_FEATURES))
+    assert np.array_equal(forest.predict_proba(X), expected)
+
+# ---------------- Decision Surface (user-015) ---------------- #
+
+def test_surface_matches_model_on_grid_points(pipeline):
+    surface = decision_surface.compute_surface(pipeline, step=20)
+    report = decision_surface.verify(surface, pipeline, samples=500)
+    # Stored as float16: about 3 significant digits
+    assert report["grid"]["max_abs_diff"] < 1e-3
+    assert report["grid"]["class_agreement"] == 1.0
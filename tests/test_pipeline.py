@@ -0,0 +1,60 @@
+"""Pipeline cache: outputs changed outside the pipeline are never rolled back."""
+import os
+import shutil
+
+import pytest
+
+import aggregates
+import data_preprocessing
+import instrumentation
+import pipeline
+import storage
+from paths import RAW_CSV
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """The preprocess stage with every path inside tmp_path."""
+    raw = tmp_path / "data" / "student_performance.csv"
+    raw.parent.mkdir()
+    shutil.copy(RAW_CSV, raw)
+    (tmp_path / "outputs").mkdir()
+    monkeypatch.setattr(pipeline, "PROJECT_ROOT", str(tmp_path))
+    monkeypatch.setattr(pipeline, "RAW_CSV", str(raw))
+    monkeypatch.setattr(pipeline, "STEPS", {"preprocess": pipeline.STEPS["preprocess"]._replace(inputs=(str(raw),))})
+    monkeypatch.setattr(storage, "PROCESSED_CSV", str(tmp_path / "outputs" / "processed.csv"))
+    monkeypatch.setattr(storage, "PROCESSED_PARQUET", str(tmp_path / "outputs" / "processed.parquet"))
+    monkeypatch.setattr(instrumentation, "ENABLED", False)
+    return tmp_path
+
+
+def run(project, force=False):
+    return pipeline.run(["preprocess"], workers=1, force=force, cache_dir=str(project / "cache"))
+
+
+def test_append_then_pipeline_run_keeps_the_appended_rows(project):
+    assert run(project) == {"preprocess": "ran"}
+    csv = storage.PROCESSED_CSV
+    data_preprocessing.main(["--input", pipeline.RAW_CSV, "--output", csv, "--append"])
+    with open(csv) as f:
+        appended = f.read()
+    store = aggregates.load(aggregates.store_path(csv))
+
+    assert run(project) == {"preprocess": "failed"}
+    with open(csv) as f:
+        assert f.read() == appended
+    assert aggregates.load(aggregates.store_path(csv)).count == store.count == 16
+
+    assert run(project, force=True) == {"preprocess": "ran"}
+    assert aggregates.load(aggregates.store_path(csv)).count == 8
+
+
+def test_missing_outputs_are_restored(project):
+    assert run(project) == {"preprocess": "ran"}
+    with open(storage.PROCESSED_CSV) as f:
+        expected = f.read()
+    os.remove(storage.PROCESSED_CSV)
+
+    assert run(project) == {"preprocess": "cached"}
+    with open(storage.PROCESSED_CSV) as f:
+        assert f.read() == expected
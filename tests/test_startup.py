@@ -0,0 +1,19 @@
+"""Entry points keep heavy modules out of their startup imports (see benchmarks/bench_startup.py).
+
+Only the lazy-import rule is enforced here: the time budgets depend on the
+machine, so bench_startup.py reports them without failing.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from bench_startup import BUDGETS, check, measure  # noqa: E402
+
+
+@pytest.mark.parametrize("entry", BUDGETS)
+def test_entry_point_keeps_heavy_imports_lazy(entry):
+    _, loaded = check(entry, *measure(entry, repeat=1))
+    assert not loaded, f"{entry} imports {', '.join(loaded)} at startup (should be lazy)"